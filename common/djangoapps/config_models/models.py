@@ -1,6 +1,10 @@
 """
 Django Model baseclass for database-backed configuration.
 """
+from copy import deepcopy
+from time import time
+
+from django.conf import settings
 from django.db import connection, models
 from django.contrib.auth.models import User
 from django.core.cache import caches, InvalidCacheBackendError
@@ -8,12 +12,95 @@ from django.utils.translation import ugettext_lazy as _
 
 from rest_framework.utils import model_meta
 
+from request_cache import get_cache
+
 
 try:
     cache = caches['configuration']  # pylint: disable=invalid-name
 except InvalidCacheBackendError:
     from django.core.cache import cache
 
+# The key of the generation of all configuration, which is changed whenever
+# a configuration entry is saved.
+GENERATION_CACHE_KEY = 'configuration/generation'
+
+# Configuration read from the cache by this process, by cache key, as
+# (generation, expiry time, value) tuples, and the latest generation seen.
+_LOCAL_CACHE = {}
+_LOCAL_CACHE_GENERATION = {'generation': None}
+
+
+def _local_cache_timeout():
+    """
+    Return the number of seconds configuration is cached in process, or 0 if it isn't.
+    """
+    return getattr(settings, 'CONFIGURATION_MODEL_LOCAL_CACHE_TIMEOUT', 0)
+
+
+def _current_generation():
+    """
+    Return the generation of all configuration, reading it from the cache
+    at most once per request.
+    """
+    request_cache = get_cache('config_models')
+    generation = request_cache.get('generation')
+    if generation is None:
+        generation = cache.get(GENERATION_CACHE_KEY)
+        if generation is None:
+            generation = int(time() * 1000)
+            if not cache.add(GENERATION_CACHE_KEY, generation, None):
+                generation = cache.get(GENERATION_CACHE_KEY, generation)
+        request_cache['generation'] = generation
+
+        # Forget configuration cached for previous generations.
+        if generation != _LOCAL_CACHE_GENERATION['generation']:
+            _LOCAL_CACHE.clear()
+            _LOCAL_CACHE_GENERATION['generation'] = generation
+    return generation
+
+
+def _next_generation():
+    """
+    Change the generation of all configuration, so that every process
+    stops using the configuration it cached.
+    """
+    try:
+        generation = cache.incr(GENERATION_CACHE_KEY)
+    except ValueError:
+        # The generation isn't cached.  Start from the current time, so as not to
+        # reuse a generation that processes may have cached configuration for.
+        generation = int(time() * 1000)
+        cache.set(GENERATION_CACHE_KEY, generation, None)
+    get_cache('config_models')['generation'] = generation
+
+
+def _cache_get(key):
+    """
+    Return the value cached for `key`, from this process if possible.
+    """
+    timeout = _local_cache_timeout()
+    if timeout:
+        generation = _current_generation()
+        entry = _LOCAL_CACHE.get(key)
+        if entry is not None and entry[0] == generation and entry[1] > time():
+            # Callers may modify the configuration they get (e.g. to save a new entry).
+            return deepcopy(entry[2])
+
+    value = cache.get(key)
+    if timeout and value is not None:
+        _LOCAL_CACHE[key] = (generation, time() + timeout, deepcopy(value))
+    return value
+
+
+def _cache_set(key, value, timeout):
+    """
+    Cache `value` for `key` for `timeout` seconds, and in this process.
+    """
+    cache.set(key, value, timeout)
+    local_timeout = _local_cache_timeout()
+    if local_timeout:
+        _LOCAL_CACHE[key] = (_current_generation(), time() + min(local_timeout, timeout), deepcopy(value))
+
 
 class ConfigurationModelManager(models.Manager):
     """
@@ -102,6 +189,7 @@ class ConfigurationModel(models.Model):
         cache.delete(self.cache_key_name(*[getattr(self, key) for key in self.KEY_FIELDS]))
         if self.KEY_FIELDS:
             cache.delete(self.key_values_cache_key_name())
+        _next_generation()
 
     @classmethod
     def cache_key_name(cls, *args):
@@ -122,7 +210,7 @@ class ConfigurationModel(models.Model):
         from the database, or by creating a new empty entry (which is not
         persisted).
         """
-        cached = cache.get(cls.cache_key_name(*args))
+        cached = _cache_get(cls.cache_key_name(*args))
         if cached is not None:
             return cached
 
@@ -132,7 +220,7 @@ class ConfigurationModel(models.Model):
         except IndexError:
             current = cls(**key_dict)
 
-        cache.set(cls.cache_key_name(*args), current, cls.cache_timeout)
+        _cache_set(cls.cache_key_name(*args), current, cls.cache_timeout)
         return current
 
     @classmethod
@@ -173,11 +261,11 @@ class ConfigurationModel(models.Model):
         assert not kwargs, "'flat' is the only kwarg accepted"
         key_fields = key_fields or cls.KEY_FIELDS
         cache_key = cls.key_values_cache_key_name(*key_fields)
-        cached = cache.get(cache_key)
+        cached = _cache_get(cache_key)
         if cached is not None:
             return cached
         values = list(cls.objects.values_list(*key_fields, flat=flat).order_by().distinct())
-        cache.set(cache_key, values, cls.cache_timeout)
+        _cache_set(cache_key, values, cls.cache_timeout)
         return values
 
     def fields_equal(self, instance, fields_to_ignore=("id", "change_date", "changed_by")):
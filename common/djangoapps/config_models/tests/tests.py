@@ -7,6 +7,7 @@ import ddt
 from django.contrib.auth.models import User
 from django.db import models
 from django.test import TestCase
+from django.test.utils import override_settings
 from rest_framework.test import APIRequestFactory
 
 from freezegun import freeze_time
@@ -14,6 +15,7 @@ from freezegun import freeze_time
 from mock import patch, Mock
 from config_models.models import ConfigurationModel
 from config_models.views import ConfigurationModelCurrentAPIView
+from request_cache.middleware import RequestCache
 
 
 class ExampleConfig(ConfigurationModel):
@@ -180,6 +182,46 @@ class ConfigurationModelTests(TestCase):
         )
 
 
+@override_settings(CONFIGURATION_MODEL_LOCAL_CACHE_TIMEOUT=60)
+@patch('config_models.models.cache')
+class LocalCacheConfigurationModelTests(TestCase):
+    """
+    Tests of caching ConfigurationModel entries in process
+    """
+    def setUp(self):
+        super(LocalCacheConfigurationModelTests, self).setUp()
+        self.user = User()
+        self.user.save()
+        RequestCache.clear_request_cache()
+        self.addCleanup(RequestCache.clear_request_cache)
+
+    def test_current_cached_in_process(self, mock_cache):
+        mock_cache.get.return_value = None
+        mock_cache.incr.side_effect = [1, 2]
+        ExampleConfig(changed_by=self.user, string_field='first').save()
+
+        first = ExampleConfig.current()
+        with self.assertNumQueries(0):
+            cached = ExampleConfig.current()
+        self.assertEquals(cached.string_field, 'first')
+        self.assertIsNot(cached, first)
+
+        # Saving a new entry invalidates the entries cached in process
+        ExampleConfig(changed_by=self.user, string_field='second').save()
+        self.assertEquals(ExampleConfig.current().string_field, 'second')
+
+    def test_generation_read_once_per_request(self, mock_cache):
+        mock_cache.get.return_value = None
+        mock_cache.add.return_value = True
+
+        ExampleConfig.current()
+        ExampleConfig.current()
+        generation_reads = [
+            call for call in mock_cache.get.call_args_list if call[0][0] == 'configuration/generation'
+        ]
+        self.assertEquals(len(generation_reads), 1)
+
+
 class ExampleKeyedConfig(ConfigurationModel):
     """
     Test model for testing ``ConfigurationModels`` with keyed configuration.
@@ -6,6 +6,10 @@ This API is exposed via the middleware(emabargo/middileware.py) layer but may be
 
 """
 import logging
+from collections import OrderedDict
+from threading import Lock
+
+import dogstats_wrapper as dog_stats_api
 import pygeoip
 
 from django.core.cache import cache
@@ -20,6 +24,14 @@ from embargo.models import CountryAccessRule, RestrictedCourse
 
 log = logging.getLogger(__name__)
 
+# GeoIP database readers, by database path, shared by all requests served by this process.
+_GEOIP_READERS = {}
+_GEOIP_READERS_LOCK = Lock()
+
+# The country codes of recently looked up IP addresses, least recently used first.
+_COUNTRY_CODES_BY_IP = OrderedDict()
+_COUNTRY_CODES_BY_IP_LOCK = Lock()
+
 
 def redirect_if_blocked(course_key, access_point='enrollment', **kwargs):
     """Redirect if the user does not have access to the course. In case of blocked if access_point
@@ -170,10 +182,57 @@ def _country_code_from_ip(ip_addr):
         str: A 2-letter country code.
 
     """
+    max_size = getattr(settings, 'EMBARGO_IP_COUNTRY_CACHE_SIZE', 0)
+    if max_size:
+        with _COUNTRY_CODES_BY_IP_LOCK:
+            country_code = _COUNTRY_CODES_BY_IP.pop(ip_addr, None)
+            if country_code is not None:
+                _COUNTRY_CODES_BY_IP[ip_addr] = country_code
+        dog_stats_api.increment(
+            'embargo.ip_country_cache',
+            tags=[u'result:{}'.format('miss' if country_code is None else 'hit')]
+        )
+        if country_code is not None:
+            return country_code
+
     if ip_addr.find(':') >= 0:
-        return pygeoip.GeoIP(settings.GEOIPV6_PATH).country_code_by_addr(ip_addr)
+        country_code = _geoip_reader(settings.GEOIPV6_PATH).country_code_by_addr(ip_addr)
     else:
-        return pygeoip.GeoIP(settings.GEOIP_PATH).country_code_by_addr(ip_addr)
+        country_code = _geoip_reader(settings.GEOIP_PATH).country_code_by_addr(ip_addr)
+
+    if max_size:
+        with _COUNTRY_CODES_BY_IP_LOCK:
+            _COUNTRY_CODES_BY_IP[ip_addr] = country_code
+            while len(_COUNTRY_CODES_BY_IP) > max_size:
+                _COUNTRY_CODES_BY_IP.popitem(last=False)
+    return country_code
+
+
+def _geoip_reader(path):
+    """
+    Return the GeoIP reader for the database at `path`.
+
+    The database is memory-mapped once per process, so that lookups
+    don't seek and read the file under a lock.
+    """
+    reader = _GEOIP_READERS.get(path)
+    if reader is None:
+        with _GEOIP_READERS_LOCK:
+            reader = _GEOIP_READERS.get(path)
+            if reader is None:
+                # Bypass pygeoip's own instance cache, which would hand back
+                # a reader opened elsewhere without memory-mapping.
+                reader = pygeoip.GeoIP(path, pygeoip.MMAP_CACHE, cache=False)
+                _GEOIP_READERS[path] = reader
+    return reader
+
+
+def clear_ip_country_cache():
+    """
+    Forget the country codes of recently looked up IP addresses.
+    """
+    with _COUNTRY_CODES_BY_IP_LOCK:
+        _COUNTRY_CODES_BY_IP.clear()
 
 
 def get_embargo_response(request, course_id, user):
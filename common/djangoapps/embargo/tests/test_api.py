@@ -227,6 +227,21 @@ class EmbargoCheckAccessApiTests(ModuleStoreTestCase):
 
         self.assertTrue(result, msg="User should have access because the user is staff.")
 
+    @override_settings(EMBARGO_IP_COUNTRY_CACHE_SIZE=1)
+    def test_ip_country_cache(self):
+        self.addCleanup(embargo_api.clear_ip_country_cache)
+        with mock.patch.object(pygeoip.GeoIP, 'country_code_by_addr') as mock_ip:
+            mock_ip.return_value = 'US'
+            self.assertEqual(embargo_api._country_code_from_ip('1.2.3.4'), 'US')  # pylint: disable=protected-access
+            self.assertEqual(embargo_api._country_code_from_ip('1.2.3.4'), 'US')  # pylint: disable=protected-access
+            self.assertEqual(mock_ip.call_count, 1)
+
+            # The least recently used address is evicted once the cache is full.
+            mock_ip.return_value = 'IR'
+            self.assertEqual(embargo_api._country_code_from_ip('::1'), 'IR')  # pylint: disable=protected-access
+            self.assertEqual(embargo_api._country_code_from_ip('1.2.3.4'), 'IR')  # pylint: disable=protected-access
+            self.assertEqual(mock_ip.call_count, 3)
+
     @contextmanager
     def _mock_geoip(self, country_code):
         with mock.patch.object(pygeoip.GeoIP, 'country_code_by_addr') as mock_ip:
@@ -5,6 +5,7 @@ from django.contrib.staticfiles.storage import staticfiles_storage
 from django.contrib.staticfiles import finders
 from django.conf import settings
 
+from request_cache import get_cache
 from static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore import ModuleStoreEnum
@@ -14,6 +15,11 @@ from opaque_keys.edx.locator import AssetLocator
 
 log = logging.getLogger(__name__)
 XBLOCK_STATIC_RESOURCE_PREFIX = '/static/xblock'
+COURSE_URL_PREFIX = '/course/'
+JUMP_TO_ID_URL_PREFIX = '/jump_to_id/'
+
+# Compiled url replacement regexes, by prefix.
+_URL_REPLACE_REGEXES = {}
 
 
 def _url_replace_regex(prefix):
@@ -32,6 +38,27 @@ def _url_replace_regex(prefix):
         """.format(prefix=prefix)
 
 
+def _compiled_url_replace_regex(prefix):
+    """
+    Return the compiled `_url_replace_regex` for `prefix`, compiling it only once.
+    """
+    regex = _URL_REPLACE_REGEXES.get(prefix)
+    if regex is None:
+        regex = _URL_REPLACE_REGEXES[prefix] = re.compile(_url_replace_regex(prefix))
+    return regex
+
+
+def _static_url_prefix(data_dir=None):
+    """
+    Return the regex matching the prefix of static urls, which aren't already
+    in `data_dir`.
+    """
+    return u'(?:{static_url}|/static/)(?!{data_dir})'.format(
+        static_url=settings.STATIC_URL,
+        data_dir=data_dir
+    )
+
+
 def try_staticfiles_lookup(path):
     """
     Try to lookup a path in staticfiles_storage.  If it fails, return
@@ -68,12 +95,22 @@ def replace_jump_to_id_urls(text, course_id, jump_to_id_base_url):
     output: <text> after the link rewriting rules are applied
     """
 
+    return _compiled_url_replace_regex(JUMP_TO_ID_URL_PREFIX).sub(
+        _jump_to_id_url_replacer(jump_to_id_base_url),
+        text
+    )
+
+
+def _jump_to_id_url_replacer(jump_to_id_base_url):
+    """
+    Return the function replacing a matched /jump_to_id/ url.
+    """
     def replace_jump_to_id_url(match):
         quote = match.group('quote')
         rest = match.group('rest')
         return "".join([quote, jump_to_id_base_url + rest, quote])
 
-    return re.sub(_url_replace_regex('/jump_to_id/'), replace_jump_to_id_url, text)
+    return replace_jump_to_id_url
 
 
 def replace_course_urls(text, course_key):
@@ -86,6 +123,13 @@ def replace_course_urls(text, course_key):
     returns: text with the links replaced
     """
 
+    return _compiled_url_replace_regex(COURSE_URL_PREFIX).sub(_course_url_replacer(course_key), text)
+
+
+def _course_url_replacer(course_key):
+    """
+    Return the function replacing a matched /course/ url.
+    """
     course_id = course_key.to_deprecated_string()
 
     def replace_course_url(match):
@@ -93,7 +137,7 @@ def replace_course_urls(text, course_key):
         rest = match.group('rest')
         return "".join([quote, '/courses/' + course_id + '/', rest, quote])
 
-    return re.sub(_url_replace_regex('/course/'), replace_course_url, text)
+    return replace_course_url
 
 
 def process_static_urls(text, replacement_function, data_dir=None):
@@ -101,6 +145,16 @@ def process_static_urls(text, replacement_function, data_dir=None):
     Run an arbitrary replacement function on any urls matching the static file
     directory
     """
+    return _compiled_url_replace_regex(_static_url_prefix(data_dir)).sub(
+        _static_url_part_extractor(replacement_function),
+        text
+    )
+
+
+def _static_url_part_extractor(replacement_function):
+    """
+    Return the function replacing a matched static url using `replacement_function`.
+    """
     def wrap_part_extraction(match):
         """
         Unwraps a match group for the captures specified in _url_replace_regex
@@ -119,14 +173,7 @@ def process_static_urls(text, replacement_function, data_dir=None):
 
         return replacement_function(original, prefix, quote, rest)
 
-    return re.sub(
-        _url_replace_regex(u'(?:{static_url}|/static/)(?!{data_dir})'.format(
-            static_url=settings.STATIC_URL,
-            data_dir=data_dir
-        )),
-        wrap_part_extraction,
-        text
-    )
+    return wrap_part_extraction
 
 
 def make_static_urls_absolute(request, html):
@@ -158,6 +205,71 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
     course_id: The course identifier used to distinguish static content for this course in studio
     static_asset_path: Path for static assets, which overrides data_directory and course_namespace, if nonempty
     """
+    return process_static_urls(
+        text,
+        _static_url_replacer(data_directory, course_id, static_asset_path),
+        data_dir=static_asset_path or data_directory
+    )
+
+
+def replace_urls(text, data_directory=None, course_id=None, static_asset_path='', jump_to_id_base_url=None):
+    """
+    Apply `replace_static_urls` and, if `course_id` and `jump_to_id_base_url`
+    are given, `replace_course_urls` and `replace_jump_to_id_urls` to `text`,
+    in a single pass.
+
+    text: The source text to do the substitution in
+    data_directory, course_id, static_asset_path: See `replace_static_urls`
+    jump_to_id_base_url: See `replace_jump_to_id_urls`
+    """
+    # The (prefix, replacement function) of each pass, in the order they'd be applied.
+    passes = [(
+        _static_url_prefix(static_asset_path or data_directory),
+        _static_url_part_extractor(_static_url_replacer(data_directory, course_id, static_asset_path)),
+    )]
+    if course_id is not None:
+        passes.append((COURSE_URL_PREFIX, _course_url_replacer(course_id)))
+        if jump_to_id_base_url is not None:
+            passes.append((JUMP_TO_ID_URL_PREFIX, _jump_to_id_url_replacer(jump_to_id_base_url)))
+    prefixes = [prefix for prefix, __ in passes]
+
+    def replace_url(match):
+        """
+        Replace a single matched url, as the pass for its prefix would have.
+        """
+        prefix = match.group('prefix')
+        index = prefixes.index(prefix) if prefix in (COURSE_URL_PREFIX, JUMP_TO_ID_URL_PREFIX) else 0
+        url = passes[index][1](match)
+
+        # The later passes would also have rewritten urls nested in this one.
+        for later_prefix, later_replacement_function in passes[index + 1:]:
+            if later_prefix in url:
+                url = _compiled_url_replace_regex(later_prefix).sub(later_replacement_function, url)
+        return url
+
+    return _compiled_url_replace_regex(u'|'.join(prefixes)).sub(replace_url, text)
+
+
+def _static_url_replacer(data_directory, course_id, static_asset_path):
+    """
+    Return the function replacing a single matched static url, for
+    `replace_static_urls`.
+
+    The urls that course asset paths resolve to are remembered for the rest
+    of the request, since resolving them checks the static files storage and
+    loads configuration for each url.
+    """
+    resolved_urls = get_cache('static_replace.resolved_urls')
+    asset_config = {}
+
+    def get_asset_config():
+        """
+        Return the asset base url and excluded extensions, loading them once.
+        """
+        if not asset_config:
+            asset_config['base_url'] = AssetBaseUrlConfig.get_base_url()
+            asset_config['excluded_exts'] = AssetExcludedExtensionsConfig.get_excluded_extensions()
+        return asset_config['base_url'], asset_config['excluded_exts']
 
     def replace_static_url(original, prefix, quote, rest):
         """
@@ -170,8 +282,24 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
         # In debug mode, if we can find the url as is,
         if settings.DEBUG and finders.find(rest, True):
             return original
+
+        if (not static_asset_path) and course_id:
+            # Remember the urls of course assets, which are the costliest to resolve.
+            base_url, excluded_exts = get_asset_config()
+            cache_key = (course_id, rest, base_url, tuple(excluded_exts))
+            url = resolved_urls.get(cache_key)
+            if url is None:
+                url = resolved_urls[cache_key] = resolve_url(prefix, rest)
+        else:
+            url = resolve_url(prefix, rest)
+        return "".join([quote, url, quote])
+
+    def resolve_url(prefix, rest):
+        """
+        Return the url that the matched path resolves to.
+        """
         # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
-        elif (not static_asset_path) and course_id:
+        if (not static_asset_path) and course_id:
             # first look in the static file pipeline and see if we are trying to reference
             # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
 
@@ -187,8 +315,7 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
             else:
                 # if not, then assume it's courseware specific content and then look in the
                 # Mongo-backed database
-                base_url = AssetBaseUrlConfig.get_base_url()
-                excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
+                base_url, excluded_exts = get_asset_config()
                 url = StaticContent.get_canonicalized_asset_path(course_id, rest, base_url, excluded_exts)
 
                 if AssetLocator.CANONICAL_NAMESPACE in url:
@@ -209,6 +336,6 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
                     rest, str(err)))
                 url = "".join([prefix, course_path])
 
-        return "".join([quote, url, quote])
+        return url
 
-    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+    return replace_static_url
@@ -9,9 +9,12 @@ from urlparse import urlparse, urlunparse, parse_qsl
 from PIL import Image
 from cStringIO import StringIO
 from nose.tools import assert_equals, assert_true, assert_false  # pylint: disable=no-name-in-module
+from request_cache.middleware import RequestCache
 from static_replace import (
     replace_static_urls,
     replace_course_urls,
+    replace_jump_to_id_urls,
+    replace_urls,
     _url_replace_regex,
     process_static_urls,
     make_static_urls_absolute
@@ -176,6 +179,49 @@ def test_static_url_with_query(mock_modulestore, mock_storage):
     assert_equals(post_text, replace_static_urls(pre_text, DATA_DIRECTORY, COURSE_KEY))
 
 
+@patch('static_replace.staticfiles_storage', autospec=True)
+@patch('static_replace.modulestore', autospec=True)
+def test_replace_urls(mock_modulestore, mock_storage):
+    """
+    Make sure that replacing all urls in a single pass gives the same result
+    as the separate replacements.
+    """
+    mock_storage.exists.return_value = False
+    mock_modulestore.return_value = Mock(MongoModuleStore)
+
+    text = (
+        '<a href="/static/file.png">a</a> <a href=\'/course/info\'>b</a> <a href="/jump_to_id/abc">c</a> '
+        '<img src="/static/file.png?raw"/> <embed src="/static/file.swf?config=/course/config.xml"/>'
+    )
+    expected = replace_jump_to_id_urls(
+        replace_course_urls(replace_static_urls(text, DATA_DIRECTORY, COURSE_KEY), COURSE_KEY),
+        COURSE_KEY,
+        '/jump_to_id_base/'
+    )
+    assert_equals(expected, replace_urls(text, DATA_DIRECTORY, COURSE_KEY, jump_to_id_base_url='/jump_to_id_base/'))
+
+
+@patch('static_replace.StaticContent', autospec=True)
+@patch('static_replace.staticfiles_storage', autospec=True)
+@patch('static_replace.AssetBaseUrlConfig.get_base_url', Mock(return_value=u''))
+@patch('static_replace.AssetExcludedExtensionsConfig.get_excluded_extensions', Mock(return_value=[]))
+def test_course_asset_urls_are_remembered(mock_storage, mock_static_content):
+    """
+    Make sure that the url of a course asset is only resolved once per request.
+    """
+    RequestCache.clear_request_cache()
+    mock_storage.exists.return_value = False
+    mock_static_content.get_canonicalized_asset_path.return_value = '/c4x/org/course/asset/file.png'
+
+    for __ in range(2):
+        assert_equals(
+            '"/c4x/org/course/asset/file.png"',
+            replace_static_urls(STATIC_SOURCE, DATA_DIRECTORY, course_id=COURSE_KEY)
+        )
+    mock_storage.exists.assert_called_once_with('file.png')
+    RequestCache.clear_request_cache()
+
+
 def test_regex():
     yes = ('"/static/foo.png"',
            '"/static/foo.png"',
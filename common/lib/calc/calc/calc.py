@@ -4,9 +4,11 @@ Parser and evaluator for FormulaResponse and NumericalResponse
 Uses pyparsing to parse. Main function as of now is evaluator().
 """
 
+from collections import OrderedDict
 import math
 import operator
 import numbers
+import threading
 import numpy
 import scipy.constants
 import functions
@@ -72,6 +74,11 @@ SUFFIXES = {
     'c': 1e-2, 'm': 1e-3, 'u': 1e-6, 'n': 1e-9, 'p': 1e-12
 }
 
+# The number of parsed and compiled expressions kept by `get_parsed_expression`.
+PARSE_CACHE_SIZE = 1024
+_PARSE_CACHE = OrderedDict()
+_PARSE_CACHE_LOCK = threading.Lock()
+
 
 class UndefinedVariable(Exception):
     """
@@ -216,6 +223,32 @@ def add_defaults(variables, functions, case_sensitive):
     return (all_variables, all_functions)
 
 
+def get_parsed_expression(math_expr, case_sensitive=False):
+    """
+    Return a `ParseAugmenter` for `math_expr` that has been parsed and compiled.
+
+    The most recently used expressions are cached, so that evaluating the same
+    expression again (e.g. for every sample of a formularesponse) doesn't parse
+    it again. The returned object must not be modified.
+    """
+    key = (math_expr, case_sensitive)
+    with _PARSE_CACHE_LOCK:
+        math_interpreter = _PARSE_CACHE.pop(key, None)
+        if math_interpreter is not None:
+            _PARSE_CACHE[key] = math_interpreter
+            return math_interpreter
+
+    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
+    math_interpreter.parse_algebra()
+    math_interpreter.compile_tree()
+
+    with _PARSE_CACHE_LOCK:
+        _PARSE_CACHE[key] = math_interpreter
+        while len(_PARSE_CACHE) > PARSE_CACHE_SIZE:
+            _PARSE_CACHE.popitem(last=False)
+    return math_interpreter
+
+
 def evaluator(variables, functions, math_expr, case_sensitive=False):
     """
     Evaluate an expression; that is, take a string of math and return a float.
@@ -224,38 +257,34 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
      python numbers.
     -Unary functions are passed as a dictionary from string to function.
     """
+    return evaluate_samples([variables], functions, math_expr, case_sensitive)[0]
+
+
+def evaluate_samples(variables_list, functions, math_expr, case_sensitive=False):
+    """
+    Evaluate an expression for each dictionary of variables in `variables_list`.
+
+    Return the list of results, in order. The expression is parsed and compiled
+    once for all of them. Otherwise, this is the same as calling `evaluator`
+    for each dictionary of variables, and raises the same exceptions.
+    """
     # No need to go further.
     if math_expr.strip() == "":
-        return float('nan')
+        return [float('nan') for _ in variables_list]
 
     # Parse the tree.
-    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
-    math_interpreter.parse_algebra()
-
-    # Get our variables together.
-    all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
+    math_interpreter = get_parsed_expression(math_expr, case_sensitive)
 
-    # ...and check them
-    math_interpreter.check_variables(all_variables, all_functions)
-
-    # Create a recursion to evaluate the tree.
-    if case_sensitive:
-        casify = lambda x: x
-    else:
-        casify = lambda x: x.lower()  # Lowercase for case insens.
+    results = []
+    for variables in variables_list:
+        # Get our variables together.
+        all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
 
-    evaluate_actions = {
-        'number': eval_number,
-        'variable': lambda x: all_variables[casify(x[0])],
-        'function': lambda x: all_functions[casify(x[0])](x[1]),
-        'atom': eval_atom,
-        'power': eval_power,
-        'parallel': eval_parallel,
-        'product': eval_product,
-        'sum': eval_sum
-    }
+        # ...and check them
+        math_interpreter.check_variables(all_variables, all_functions)
 
-    return math_interpreter.reduce_tree(evaluate_actions)
+        results.append(math_interpreter.compiled(all_variables, all_functions))
+    return results
 
 
 class ParseAugmenter(object):
@@ -275,6 +304,7 @@ class ParseAugmenter(object):
         self.case_sensitive = case_sensitive
         self.math_expr = math_expr
         self.tree = None
+        self.compiled = None
         self.variables_used = set()
         self.functions_used = set()
 
@@ -397,6 +427,60 @@ class ParseAugmenter(object):
         # Find the value of the entire tree.
         return handle_node(self.tree)
 
+    def compile_tree(self):
+        """
+        Compile `self.tree` into a function evaluating the expression.
+
+        Store in `self.compiled` a function which takes the dictionaries of all
+        variables and functions (as returned by `add_defaults`) and returns the
+        value of the expression, like evaluating the tree with `reduce_tree`
+        would, without walking the parse results again.
+        """
+        if self.case_sensitive:
+            casify = lambda x: x
+        else:
+            casify = lambda x: x.lower()  # Lowercase for case insens.
+
+        evaluate_actions = {
+            'atom': eval_atom,
+            'power': eval_power,
+            'parallel': eval_parallel,
+            'product': eval_product,
+            'sum': eval_sum
+        }
+
+        def compile_node(node):
+            """
+            Return a function computing the value of the node.
+
+            Numbers are converted and variable and function names are casified
+            now, rather than on every evaluation.
+            """
+            if not isinstance(node, ParseResults):
+                # Then treat it as a terminal node.
+                return lambda variables, functions: node
+
+            node_name = node.getName()
+            if node_name == 'number':
+                value = eval_number(node)
+                return lambda variables, functions: value
+            elif node_name == 'variable':
+                varname = casify(node[0])
+                return lambda variables, functions: variables[varname]
+            elif node_name == 'function':
+                funcname = casify(node[0])
+                compiled_arg = compile_node(node[1])
+                return lambda variables, functions: functions[funcname](compiled_arg(variables, functions))
+            elif node_name not in evaluate_actions:  # pragma: no cover
+                raise Exception(u"Unknown branch name '{}'".format(node_name))
+
+            action = evaluate_actions[node_name]
+            compiled_kids = [compile_node(k) for k in node]
+            return lambda variables, functions: action([kid(variables, functions) for kid in compiled_kids])
+
+        self.compiled = compile_node(self.tree)
+        return self.compiled
+
     def check_variables(self, valid_variables, valid_functions):
         """
         Confirm that all the variables used in the tree are valid/defined.
@@ -559,3 +559,35 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({'r1': 5}, {}, "r1+r2")
         with self.assertRaisesRegexp(calc.UndefinedVariable, 'r1 r3'):
             calc.evaluator(variables, {}, "r1*r3", case_sensitive=True)
+
+    def test_parse_cache(self):
+        """
+        Check that expressions are parsed once per case sensitivity
+        """
+        parsed = calc.get_parsed_expression("x^2 + X", case_sensitive=True)
+        self.assertIs(parsed, calc.get_parsed_expression("x^2 + X", case_sensitive=True))
+        self.assertIsNot(parsed, calc.get_parsed_expression("x^2 + X", case_sensitive=False))
+
+        # The cached expression evaluates with the given variables.
+        self.assertEqual(calc.evaluator({'x': 3, 'X': 1}, {}, "x^2 + X", case_sensitive=True), 10)
+        self.assertEqual(calc.evaluator({'x': 3}, {}, "x^2 + X"), 12)
+
+    def test_evaluate_samples(self):
+        """
+        Check that evaluating several samples gives the evaluator's results
+        """
+        expression = "a*sin(x)^2 + 5k || y - fact(n)"
+        samples = [
+            {'a': 1.5, 'x': 0.3, 'y': 2.0, 'n': 3},
+            {'a': -2.0, 'x': 4.0, 'y': 7.5, 'n': 0},
+            {'a': 0.0, 'x': 1.0, 'y': 3.0, 'n': 5},
+        ]
+        self.assertEqual(
+            calc.evaluate_samples(samples, {}, expression),
+            [calc.evaluator(variables, {}, expression) for variables in samples]
+        )
+        self.assertEqual(len(calc.evaluate_samples(samples, {}, " ")), 3)
+
+        # A sample missing a variable raises, like the evaluator does.
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'n'):
+            calc.evaluate_samples(samples + [{'a': 1, 'x': 1, 'y': 1}], {}, expression)
@@ -7,6 +7,7 @@ from . import lazymod
 from dogapi import dog_stats_api
 
 import hashlib
+import time
 
 # Establish the Python environment for Capa.
 # Capa assumes float-friendly division always.
@@ -70,6 +71,39 @@ def update_hash(hasher, obj):
         hasher.update(repr(obj))
 
 
+def _update_hash_with_files(hasher, files):
+    """
+    Update a `hashlib` hasher with a list of (filename, contents) pairs.
+
+    The contents, e.g. a course's python_lib.zip, can be large, so they are
+    fed to the hasher as they are rather than through `repr`.
+
+    """
+    for filename, contents in files:
+        if isinstance(contents, unicode):
+            contents = contents.encode('utf-8')
+        update_hash(hasher, filename)
+        hasher.update(str(len(contents)))
+        hasher.update(contents)
+
+
+def _cache_key(code, globals_dict, random_seed, python_path, extra_files):
+    """
+    Returns the key of the cached result of executing `code` with the given
+    `safe_exec` arguments.
+
+    The Python path and the extra files are part of the key, so that changing
+    a course's python_lib.zip doesn't return results computed with the old one.
+
+    """
+    md5er = hashlib.md5()
+    md5er.update(repr(code))
+    update_hash(md5er, json_safe(globals_dict))
+    update_hash(md5er, python_path or [])
+    _update_hash_with_files(md5er, extra_files or [])
+    return "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
+
+
 @dog_stats_api.timed('capa.safe_exec.time')
 def safe_exec(
     code,
@@ -80,6 +114,7 @@ def safe_exec(
     cache=None,
     slug=None,
     unsafely=False,
+    cache_errors=True,
 ):
     """
     Execute python code safely.
@@ -106,15 +141,17 @@ def safe_exec(
 
     If `unsafely` is true, then the code will actually be executed without sandboxing.
 
+    If `cache_errors` is false, then only executions that raise no exception are cached.
+
     """
     # Check the cache for a previous result.
     if cache:
-        safe_globals = json_safe(globals_dict)
-        md5er = hashlib.md5()
-        md5er.update(repr(code))
-        update_hash(md5er, safe_globals)
-        key = "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
+        key = _cache_key(code, globals_dict, random_seed, python_path, extra_files)
         cached = cache.get(key)
+        dog_stats_api.increment(
+            'capa.safe_exec.cache',
+            tags=[u'result:hit' if cached is not None else u'result:miss'],
+        )
         if cached is not None:
             # We have a cached result.  The result is a pair: the exception
             # message, if any, else None; and the resulting globals dictionary.
@@ -134,6 +171,7 @@ def safe_exec(
         exec_fn = codejail_safe_exec
 
     # Run the code!  Results are side effects in globals_dict.
+    start_time = time.time()
     try:
         exec_fn(
             code_prolog + LAZY_IMPORTS + code, globals_dict,
@@ -143,10 +181,15 @@ def safe_exec(
         emsg = e.message
     else:
         emsg = None
+    dog_stats_api.histogram(
+        'capa.safe_exec.exec_time',
+        time.time() - start_time,
+        tags=[u'unsafely:{}'.format(unsafely), u'result:{}'.format('error' if emsg else 'success')],
+    )
 
     # Put the result back in the cache.  This is complicated by the fact that
     # the globals dict might not be entirely serializable.
-    if cache:
+    if cache and (cache_errors or not emsg):
         cleaned_results = json_safe(globals_dict)
         cache.set(key, (emsg, cleaned_results))
 
@@ -166,6 +166,37 @@ class TestSafeExecCaching(unittest.TestCase):
         safe_exec(code, g, cache=DictCache(cache))
         self.assertEqual(g['a'], 17)
 
+    def test_cache_errors_disabled(self):
+        # Failed executions aren't cached when cache_errors is false, so that
+        # they are run again on the next call.
+        cache = {}
+        with self.assertRaises(SafeExecException):
+            safe_exec("1/0", {}, cache=DictCache(cache), cache_errors=False)
+        self.assertEqual(cache, {})
+
+        safe_exec("a = 17", {}, cache=DictCache(cache), cache_errors=False)
+        self.assertEqual(cache.values(), [(None, {'a': 17})])
+
+    def test_cache_key_includes_files(self):
+        # Results depend on the Python path and extra files, so changing
+        # either of them shouldn't return a result cached with the old ones.
+        pylib = os.path.dirname(__file__) + "/test_files/pylib"
+        cache = {}
+        for python_path, extra_files in [
+                ([], []),
+                ([pylib], []),
+                ([pylib], [("extra.txt", "one")]),
+                ([pylib], [("extra.txt", "two")]),
+                ([pylib], [("other.txt", "two")]),
+                ([pylib], [("extra.txt", "t"), ("wo", "")]),
+        ]:
+            safe_exec("a = 17", {}, python_path=python_path, extra_files=extra_files, cache=DictCache(cache))
+        self.assertEqual(len(cache), 6)
+
+        # The same arguments give the same key.
+        safe_exec("a = 17", {}, python_path=[pylib], extra_files=[("extra.txt", "two")], cache=DictCache(cache))
+        self.assertEqual(len(cache), 6)
+
     def test_unicode_submission(self):
         # Check that using non-ASCII unicode does not raise an encoding error.
         # Try several non-ASCII unicode characters.
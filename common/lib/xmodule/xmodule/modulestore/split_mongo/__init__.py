@@ -2,7 +2,9 @@
 General utilities
 """
 
-from collections import namedtuple
+from collections import defaultdict, namedtuple
+import re
+
 from contracts import contract, check
 from opaque_keys.edx.locator import BlockUsageLocator
 
@@ -21,3 +23,172 @@ class BlockKey(namedtuple('BlockKey', 'type id')):
 
 
 CourseEnvelope = namedtuple('CourseEnvelope', 'course_key structure')
+
+
+class StructureIndex(object):
+    """
+    Secondary indexes over the blocks of a course structure, used to find the
+    blocks which may match a search without checking every block.
+
+    Saved structures are never changed, so the indexes built for one can be
+    kept as long as the structure itself, and shared by the StructureIndexes
+    of all its copies through the `indexes` dict. Each index is built on
+    first use. Field value indexes are built from the fields saved in the
+    structure, not from the definition fields merged into loaded blocks.
+    """
+    def __init__(self, structure, indexes=None):
+        self.structure = structure
+        self.indexes = {} if indexes is None else indexes
+
+    @property
+    def block_keys_by_type(self):
+        """
+        A dict mapping block types to the keys of the blocks of that type.
+        """
+        block_keys_by_type = self.indexes.get('block_keys_by_type')
+        if block_keys_by_type is None:
+            block_keys_by_type = defaultdict(list)
+            for block_key, block_data in self.structure['blocks'].iteritems():
+                block_keys_by_type[block_data.block_type].append(block_key)
+            block_keys_by_type = self.indexes['block_keys_by_type'] = dict(block_keys_by_type)
+        return block_keys_by_type
+
+    def block_keys_by_value(self, field):
+        """
+        Return a dict mapping the values of the given settings field to the
+        keys of the blocks having that value, or containing it if the field
+        is a list.
+        """
+        block_keys_by_value = self.indexes.get(('block_keys_by_value', field))
+        if block_keys_by_value is None:
+            block_keys_by_value = defaultdict(list)
+            for block_key, block_data in self.structure['blocks'].iteritems():
+                if field in block_data.fields:
+                    for value in set(_hashable_values(block_data.fields[field])):
+                        block_keys_by_value[value].append(block_key)
+            block_keys_by_value = self.indexes[('block_keys_by_value', field)] = dict(block_keys_by_value)
+        return block_keys_by_value
+
+    @property
+    def parents(self):
+        """
+        A dict mapping block keys to the list of keys of their parents.
+        """
+        parents = self.indexes.get('parents')
+        if parents is None:
+            parents = defaultdict(list)
+            for parent_key, block_data in self.structure['blocks'].iteritems():
+                for child_key in block_data.fields.get('children', []):
+                    parents[child_key].append(parent_key)
+            parents = self.indexes['parents'] = dict(parents)
+        return parents
+
+    @property
+    def reachable_block_keys(self):
+        """
+        The set of keys of the blocks which have a path to the root of the
+        course or library, that is, which aren't orphans.
+        """
+        reachable = self.indexes.get('reachable_block_keys')
+        if reachable is None:
+            blocks = self.structure['blocks']
+            stack = [
+                block_key for block_key in blocks
+                if block_key.type in ('course', 'library') and not self.parents.get(block_key)
+            ]
+            reachable = set(stack)
+            while stack:
+                block_data = blocks.get(stack.pop())
+                if block_data is None:
+                    continue
+                for child_key in block_data.fields.get('children', []):
+                    if child_key not in reachable:
+                        reachable.add(child_key)
+                        stack.append(child_key)
+            reachable = self.indexes['reachable_block_keys'] = frozenset(reachable)
+        return reachable
+
+    def candidate_block_keys(self, qualifiers, settings):
+        """
+        Return the list of keys of the blocks which may match the given
+        get_items `qualifiers` and `settings`, or None if every block may.
+
+        Only criteria which are plain values, or `$in` lists of them, are
+        looked up in the indexes. The candidates must still be checked
+        against all of the criteria.
+        """
+        candidate_lists = []
+        block_types = _indexable_values(qualifiers.get('block_type'))
+        if block_types is not None:
+            candidate_lists.append(_union_of(self.block_keys_by_type, block_types))
+        for field, criteria in settings.iteritems():
+            values = _indexable_values(criteria)
+            if values is not None:
+                candidate_lists.append(_union_of(self.block_keys_by_value(field), values))
+
+        if not candidate_lists:
+            return None
+        candidate_lists.sort(key=len)
+        candidates = candidate_lists[0]
+        for other_candidates in candidate_lists[1:]:
+            other_candidates = set(other_candidates)
+            candidates = [block_key for block_key in candidates if block_key in other_candidates]
+        return candidates
+
+
+def _is_hashable(value):
+    """
+    Return whether the value can be used as a dict key.
+    """
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def _hashable_values(value):
+    """
+    Yield the value, or the values in it if it's a list (recursively), which
+    can be used as dict keys.
+    """
+    if isinstance(value, list):
+        for element in value:
+            for hashable_value in _hashable_values(element):
+                yield hashable_value
+    elif _is_hashable(value):
+        yield value
+
+
+def _indexable_values(criteria):
+    """
+    Return the list of values matched by get_items `criteria` if they can be
+    looked up in an index, else None.
+    """
+    if isinstance(criteria, dict):
+        if criteria.keys() == ['$in'] and isinstance(criteria['$in'], (list, tuple, set)):
+            values = list(criteria['$in'])
+            if all(_indexable_values(value) == [value] for value in values):
+                return values
+        return None
+    if criteria is None or callable(criteria) or isinstance(criteria, re._pattern_type):  # pylint: disable=protected-access
+        return None
+    if not _is_hashable(criteria):
+        return None
+    return [criteria]
+
+
+def _union_of(block_keys_by_value, values):
+    """
+    Return the keys of the blocks indexed under any of the given values.
+    """
+    if len(values) == 1:
+        return block_keys_by_value.get(values[0], [])
+    block_keys = []
+    seen = set()
+    for value in values:
+        for block_key in block_keys_by_value.get(value, []):
+            if block_key not in seen:
+                seen.add(block_key)
+                block_keys.append(block_key)
+    return block_keys
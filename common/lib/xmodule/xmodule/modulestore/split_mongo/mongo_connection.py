@@ -1,6 +1,7 @@
 """
 Segregation of pymongo functions from the data modeling mechanisms for split modulestore.
 """
+import copy
 import datetime
 import cPickle as pickle
 import math
@@ -8,13 +9,16 @@ import zlib
 import pymongo
 import pytz
 import re
+from collections import OrderedDict
 from contextlib import contextmanager
+from threading import Lock
 from time import time
 
 # Import this just to export it
 from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
 
 try:
+    from django.conf import settings
     from django.core.cache import caches, InvalidCacheBackendError
     DJANGO_AVAILABLE = True
 except ImportError:
@@ -26,6 +30,7 @@ from contracts import check, new_contract
 from mongodb_proxy import autoretry_read
 from xmodule.exceptions import HeartbeatFailure
 from xmodule.modulestore import BlockData
+from xmodule.modulestore.exceptions import ItemWriteConflictError
 from xmodule.modulestore.split_mongo import BlockKey
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
 
@@ -42,6 +47,20 @@ def get_cache(alias):
     return caches[alias]
 
 
+_LOCAL_STRUCTURE_CACHE = []
+
+
+def get_local_structure_cache():
+    """
+    Return the process-wide LocalStructureCache, or None if the
+    COURSE_STRUCTURE_LOCAL_CACHE_MAX_SIZE setting doesn't enable it.
+    """
+    if not _LOCAL_STRUCTURE_CACHE:
+        max_size = getattr(settings, 'COURSE_STRUCTURE_LOCAL_CACHE_MAX_SIZE', 0) if DJANGO_AVAILABLE else 0
+        _LOCAL_STRUCTURE_CACHE.append(LocalStructureCache(max_size) if max_size else None)
+    return _LOCAL_STRUCTURE_CACHE[0]
+
+
 def round_power_2(value):
     """
     Return value rounded up to the nearest power of 2.
@@ -223,6 +242,90 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+class LocalStructureCache(object):
+    """
+    A size-bounded, least-recently-used, in-process cache of pickled course
+    structures, keyed by structure id. It sits in front of the django cache
+    used by CourseStructureCache, so a process doesn't fetch and decompress
+    the same structure for every request.
+
+    Structures are pickled rather than kept as objects, since their blocks
+    are changed in place while loading (e.g. by merging in definition fields)
+    and every caller must get its own copy. The indexes built over each
+    structure (see StructureIndex) are kept alongside it.
+    """
+    def __init__(self, max_size):
+        """
+        Arguments:
+            max_size (int): The maximum total size, in bytes, of the pickled
+                structures held by the cache. The least recently used ones
+                are evicted once this size is exceeded.
+        """
+        self.max_size = max_size
+        self._size = 0
+        self._entries = OrderedDict()
+        self._indexes = {}
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        """
+        The total size, in bytes, of the pickled structures in the cache.
+        """
+        return self._size
+
+    def get(self, key):
+        """
+        Return the pickled structure with the given id, or None.
+        """
+        with self._lock:
+            pickled_data = self._entries.pop(key, None)
+            if pickled_data is not None:
+                # Re-insert the entry as the most recently used one.
+                self._entries[key] = pickled_data
+            return pickled_data
+
+    def set(self, key, pickled_data):
+        """
+        Store the pickled structure with the given id.
+        """
+        with self._lock:
+            previous_data = self._entries.pop(key, None)
+            if previous_data is not None:
+                self._size -= len(previous_data)
+            if len(pickled_data) > self.max_size:
+                self._indexes.pop(key, None)
+                return
+            self._entries[key] = pickled_data
+            self._size += len(pickled_data)
+            while self._size > self.max_size:
+                evicted_key, evicted_data = self._entries.popitem(last=False)
+                self._size -= len(evicted_data)
+                self._indexes.pop(evicted_key, None)
+
+    def indexes_for(self, key):
+        """
+        Return the dict of the indexes kept alongside the structure with the
+        given id, or None if the structure isn't cached.
+        """
+        with self._lock:
+            if key not in self._entries:
+                return None
+            return self._indexes.setdefault(key, {})
+
+    def clear(self):
+        """
+        Remove all structures from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._indexes.clear()
+            self._size = 0
+
+
 class CourseStructureCache(object):
     """
     Wrapper around django cache object to cache course structure objects.
@@ -233,11 +336,14 @@ class CourseStructureCache(object):
     """
     def __init__(self):
         self.cache = None
+        self.local_cache = None
         if DJANGO_AVAILABLE:
             try:
                 self.cache = get_cache('course_structure_cache')
             except InvalidCacheBackendError:
                 pass
+            else:
+                self.local_cache = get_local_structure_cache()
 
     def get(self, key, course_context=None):
         """Pull the compressed, pickled struct data from cache and deserialize."""
@@ -245,17 +351,27 @@ class CourseStructureCache(object):
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
-            compressed_pickled_data = self.cache.get(key)
-            tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
+            pickled_data = None
+            if self.local_cache is not None:
+                pickled_data = self.local_cache.get(key)
+                tagger.tag(from_local_cache=str(pickled_data is not None).lower())
+                tagger.measure('local_cache_size', self.local_cache.size)
 
-            if compressed_pickled_data is None:
-                # Always log cache misses, because they are unexpected
-                tagger.sample_rate = 1
-                return None
+            if pickled_data is None:
+                compressed_pickled_data = self.cache.get(key)
+                tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
 
-            tagger.measure('compressed_size', len(compressed_pickled_data))
+                if compressed_pickled_data is None:
+                    # Always log cache misses, because they are unexpected
+                    tagger.sample_rate = 1
+                    return None
+
+                tagger.measure('compressed_size', len(compressed_pickled_data))
+
+                pickled_data = zlib.decompress(compressed_pickled_data)
+                if self.local_cache is not None:
+                    self.local_cache.set(key, pickled_data)
 
-            pickled_data = zlib.decompress(compressed_pickled_data)
             tagger.measure('uncompressed_size', len(pickled_data))
 
             return pickle.loads(pickled_data)
@@ -276,6 +392,108 @@ class CourseStructureCache(object):
             # Stuctures are immutable, so we set a timeout of "never"
             self.cache.set(key, compressed_pickled_data, None)
 
+            if self.local_cache is not None:
+                self.local_cache.set(key, pickled_data)
+
+
+class CourseIndexCache(object):
+    """
+    Process-local cache of course index documents, keyed by (org, course, run).
+
+    Unlike structures, course indexes change whenever a course is edited.
+    Every index written records its version (its last_update) in the
+    shared `version_cache`, and a cached index is only used while its
+    version is the recorded one, so changes made by any process invalidate
+    it. Entries also expire after `timeout` seconds, which bounds how stale
+    they can be if the version cache isn't available or loses the version.
+
+    Entries are copied in and out, since callers modify the indexes they get.
+    """
+    def __init__(self, timeout, version_cache=None):
+        self.timeout = timeout
+        self.version_cache = version_cache
+        self._entries = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def _key(key_or_index):
+        """
+        Return the cache key of a course key or course index document.
+        """
+        if isinstance(key_or_index, dict):
+            return tuple(key_or_index[key_attr] for key_attr in ('org', 'course', 'run'))
+        return tuple(getattr(key_or_index, key_attr) for key_attr in ('org', 'course', 'run'))
+
+    @classmethod
+    def _version_key(cls, key_or_index):
+        """
+        Return the key of the version of a course index in the version cache.
+        """
+        return u'course_index_version/{}'.format(u'/'.join(cls._key(key_or_index)))
+
+    @staticmethod
+    def _version(course_index):
+        """
+        Return the version of a course index document.
+        """
+        return unicode(course_index.get('last_update'))
+
+    def get(self, course_key):
+        """
+        Return a copy of the cached index for `course_key`, or None if it isn't
+        cached, has expired or isn't the current version.
+        """
+        with self._lock:
+            entry = self._entries.get(self._key(course_key))
+        if entry is None:
+            return None
+        expires, course_index = entry
+        if expires < time():
+            return None
+        if self.version_cache is not None:
+            if self.version_cache.get(self._version_key(course_key)) != self._version(course_index):
+                return None
+        return copy.deepcopy(course_index)
+
+    def set(self, course_key, course_index):
+        """
+        Cache a copy of `course_index`, which was just read, for `course_key`.
+        """
+        if self.version_cache is not None:
+            # Only record the version if it isn't already, since the index
+            # may have been updated since it was read.
+            self.version_cache.add(self._version_key(course_key), self._version(course_index), None)
+        entry = (time() + self.timeout, copy.deepcopy(course_index))
+        with self._lock:
+            self._entries[self._key(course_key)] = entry
+
+    def updated(self, course_index):
+        """
+        Record that `course_index` was written, invalidating the cached
+        copies of its previous versions in every process.
+        """
+        if self.version_cache is not None:
+            self.version_cache.set(self._version_key(course_index), self._version(course_index), None)
+        with self._lock:
+            self._entries.pop(self._key(course_index), None)
+
+    def delete(self, key_or_index):
+        """
+        Remove the index for the given course key or course index from the
+        cache of every process.
+        """
+        if self.version_cache is not None:
+            self.version_cache.delete(self._version_key(key_or_index))
+        with self._lock:
+            self._entries.pop(self._key(key_or_index), None)
+
+    def clear(self):
+        """
+        Remove all indexes from the cache of this process.
+        """
+        with self._lock:
+            self._entries.clear()
+
 
 class MongoConnection(object):
     """
@@ -283,10 +501,13 @@ class MongoConnection(object):
     """
     def __init__(
         self, db, collection, host, port=27017, tz_aware=True, user=None, password=None,
-        asset_collection=None, retry_wait_time=0.1, **kwargs
+        asset_collection=None, retry_wait_time=0.1, course_index_cache_timeout=0, **kwargs
     ):
         """
         Create & open the connection, authenticate, and provide pointers to the collections
+
+        If `course_index_cache_timeout` is set, course indexes are cached in
+        this process for up to that many seconds, or until they are changed.
         """
         # Set a write concern of 1, which makes writes complete successfully to the primary
         # only before returning. Also makes pymongo report write errors.
@@ -302,6 +523,16 @@ class MongoConnection(object):
         self.structures = self.database[collection + '.structures']
         self.definitions = self.database[collection + '.definitions']
 
+        self.course_index_cache = None
+        if course_index_cache_timeout:
+            version_cache = None
+            if DJANGO_AVAILABLE:
+                try:
+                    version_cache = get_cache('course_structure_cache')
+                except InvalidCacheBackendError:
+                    pass
+            self.course_index_cache = CourseIndexCache(course_index_cache_timeout, version_cache)
+
     def heartbeat(self):
         """
         Check that the db is reachable.
@@ -426,11 +657,21 @@ class MongoConnection(object):
             tagger.measure("blocks", len(structure["blocks"]))
             self.structures.insert(structure_to_mongo(structure, course_context))
 
-    def get_course_index(self, key, ignore_case=False):
+    def get_course_index(self, key, ignore_case=False, use_cache=True):
         """
         Get the course_index from the persistence mechanism whose id is the given key
+
+        If `use_cache` is False, the index is read from the db even if it is
+        cached, e.g. when it is going to be updated.
         """
-        with TIMER.timer("get_course_index", key):
+        with TIMER.timer("get_course_index", key) as tagger:
+            cacheable = self.course_index_cache is not None and not ignore_case
+            if cacheable and use_cache:
+                course_index = self.course_index_cache.get(key)
+                tagger.tag(from_cache=str(course_index is not None).lower())
+                if course_index is not None:
+                    return course_index
+
             if ignore_case:
                 query = {
                     key_attr: re.compile(u'^{}$'.format(re.escape(getattr(key, key_attr))), re.IGNORECASE)
@@ -441,7 +682,10 @@ class MongoConnection(object):
                     key_attr: getattr(key, key_attr)
                     for key_attr in ('org', 'course', 'run')
                 }
-            return self.course_index.find_one(query)
+            course_index = self.course_index.find_one(query)
+            if cacheable and course_index is not None:
+                self.course_index_cache.set(key, course_index)
+            return course_index
 
     def find_matching_course_indexes(self, branch=None, search_targets=None, org_target=None, course_context=None):
         """
@@ -475,6 +719,8 @@ class MongoConnection(object):
         with TIMER.timer("insert_course_index", course_context):
             course_index['last_update'] = datetime.datetime.now(pytz.utc)
             self.course_index.insert(course_index)
+            if self.course_index_cache is not None:
+                self.course_index_cache.updated(course_index)
 
     def update_course_index(self, course_index, from_index=None, course_context=None):
         """
@@ -497,7 +743,17 @@ class MongoConnection(object):
                     'run': course_index['run'],
                 }
             course_index['last_update'] = datetime.datetime.now(pytz.utc)
-            self.course_index.update(query, course_index, upsert=False,)
+            result = self.course_index.update(query, course_index, upsert=False,)
+            if from_index and result['n'] == 0:
+                # The index changed since from_index was read, so the changes
+                # based on it would overwrite those of another writer.
+                if self.course_index_cache is not None:
+                    self.course_index_cache.delete(course_index)
+                raise ItemWriteConflictError(
+                    u'The index of {} was changed since it was read'.format(course_context or from_index['_id'])
+                )
+            if self.course_index_cache is not None:
+                self.course_index_cache.updated(course_index)
 
     def delete_course_index(self, course_key):
         """
@@ -508,7 +764,10 @@ class MongoConnection(object):
                 key_attr: getattr(course_key, key_attr)
                 for key_attr in ('org', 'course', 'run')
             }
-            return self.course_index.remove(query)
+            result = self.course_index.remove(query)
+            if self.course_index_cache is not None:
+                self.course_index_cache.delete(course_key)
+            return result
 
     def get_definition(self, key, course_context=None):
         """
@@ -583,6 +842,9 @@ class MongoConnection(object):
         """
         connection = self.database.connection
 
+        if self.course_index_cache is not None:
+            self.course_index_cache.clear()
+
         if database:
             connection.drop_database(self.database.name)
         elif collections:
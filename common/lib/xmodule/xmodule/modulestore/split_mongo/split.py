@@ -82,8 +82,8 @@ from xmodule.modulestore import (
 
 from ..exceptions import ItemNotFoundError
 from .caching_descriptor_system import CachingDescriptorSystem
-from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, DuplicateKeyError
-from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
+from xmodule.modulestore.split_mongo.mongo_connection import CourseStructureCache, MongoConnection, DuplicateKeyError
+from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope, StructureIndex
 from xmodule.modulestore.store_utilities import DETACHED_XBLOCK_TYPES
 from xmodule.error_module import ErrorDescriptor
 from collections import defaultdict
@@ -230,7 +230,9 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
         """
         Begin a bulk write operation on course_key.
         """
-        bulk_write_record.initial_index = self.db_connection.get_course_index(course_key)
+        # The index is read from the db rather than the course index cache,
+        # since it is what the index is updated from when the operation ends.
+        bulk_write_record.initial_index = self.db_connection.get_course_index(course_key, use_cache=False)
         # Ensure that any edits to the index don't pollute the initial_index
         bulk_write_record.index = copy.deepcopy(bulk_write_record.initial_index)
         bulk_write_record.course_key = course_key
@@ -655,14 +657,16 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                  default_class=None,
                  error_tracker=null_error_tracker,
                  i18n_service=None, fs_service=None, user_service=None,
-                 services=None, signal_handler=None, **kwargs):
+                 services=None, signal_handler=None, course_index_cache_timeout=0, **kwargs):
         """
         :param doc_store_config: must have a host, db, and collection entries. Other common entries: port, tz_aware.
+        :param course_index_cache_timeout: if set, the number of seconds course indexes read from the db
+            may be cached in this process. Changes made by other processes may be missed for that long.
         """
 
         super(SplitMongoModuleStore, self).__init__(contentstore, **kwargs)
 
-        self.db_connection = MongoConnection(**doc_store_config)
+        self.db_connection = MongoConnection(course_index_cache_timeout=course_index_cache_timeout, **doc_store_config)
 
         if default_class is not None:
             module_path, __, class_name = default_class.rpartition('.')
@@ -814,8 +818,32 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 del self.request_cache.data.setdefault('course_cache', {})[course_version_guid]
             except KeyError:
                 pass
+            self.request_cache.data.setdefault('structure_indexes', {}).pop(course_version_guid, None)
         else:
             self.request_cache.data['course_cache'] = {}
+            self.request_cache.data['structure_indexes'] = {}
+
+    def _get_structure_index(self, course_entry):
+        """
+        Return the StructureIndex for the structure of the given course entry.
+
+        Indexes are kept alongside the structure in the process' structure
+        cache, or if it isn't cached there, for the rest of the request. They
+        aren't kept for structures which haven't been saved yet, since those
+        may still change.
+        """
+        structure = course_entry.structure
+        bulk_write_record = self._get_bulk_ops_record(course_entry.course_key)
+        if bulk_write_record.active and structure['_id'] not in bulk_write_record.structures_in_db:
+            return StructureIndex(structure)
+
+        local_structure_cache = CourseStructureCache().local_cache
+        indexes = None
+        if local_structure_cache is not None:
+            indexes = local_structure_cache.indexes_for(structure['_id'])
+        if indexes is None and self.request_cache is not None:
+            indexes = self.request_cache.data.setdefault('structure_indexes', {}).setdefault(structure['_id'], {})
+        return StructureIndex(structure, indexes)
 
     def _lookup_course(self, course_key, head_validation=True):
         """
@@ -1209,20 +1237,18 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         if 'children' in qualifiers:
             settings['children'] = qualifiers.pop('children')
 
-        # No need of these caches unless include_orphans is set to False
-        path_cache = None
-        parents_cache = None
-
-        if not include_orphans:
-            path_cache = {}
-            parents_cache = self.build_block_key_to_parents_mapping(course.structure)
+        structure_index = self._get_structure_index(course)
+        blocks = course.structure['blocks']
+        block_ids = structure_index.candidate_block_keys(qualifiers, settings)
+        if block_ids is None:
+            block_ids = blocks.iterkeys()
 
-        for block_id, value in course.structure['blocks'].iteritems():
-            if _block_matches_all(value):
+        for block_id in block_ids:
+            if _block_matches_all(blocks[block_id]):
                 if not include_orphans:
                     if (  # pylint: disable=bad-continuation
                         block_id.type in DETACHED_XBLOCK_TYPES or
-                        self.has_path_to_root(block_id, course, path_cache, parents_cache)
+                        block_id in structure_index.reachable_block_keys
                     ):
                         items.append(block_id)
                 else:
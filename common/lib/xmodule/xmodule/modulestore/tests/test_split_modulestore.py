@@ -29,9 +29,11 @@ from ccx_keys.locator import CCXBlockUsageLocator
 from xmodule.modulestore.inheritance import InheritanceMixin
 from xmodule.x_module import XModuleMixin
 from xmodule.fields import Date, Timedelta
+from xmodule.modulestore.split_mongo.mongo_connection import LocalStructureCache
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.test_modulestore import check_has_course_method
-from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey, StructureIndex
 from xmodule.modulestore.tests.factories import check_mongo_calls
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 from xmodule.modulestore.tests.utils import mock_tab_from_json
@@ -963,6 +965,24 @@ class TestCourseStructureCache(SplitModuleTest):
         # now make sure that you get the same structure
         self.assertEqual(cached_structure, not_cached_structure)
 
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_local_structure_cache')
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_local_cache(self, mock_get_cache, mock_get_local_cache):
+        mock_get_cache.return_value = self.cache
+        mock_get_local_cache.return_value = LocalStructureCache(100 * 1024 * 1024)
+
+        with check_mongo_calls(1):
+            not_cached_structure = self._get_structure(self.new_course)
+
+        # the structure is still cached in process once the django cache is cleared
+        self.cache.clear()
+        with check_mongo_calls(0):
+            cached_structure = self._get_structure(self.new_course)
+
+        # each call returns its own copy of the structure
+        self.assertEqual(cached_structure, not_cached_structure)
+        self.assertIsNot(cached_structure, self._get_structure(self.new_course))
+
     @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
     def test_course_structure_cache_no_cache_configured(self, mock_get_cache):
         mock_get_cache.side_effect = InvalidCacheBackendError
@@ -1196,6 +1216,8 @@ class SplitModuleItemTests(SplitModuleTest):
         self.assertEqual(len(matches), 3)
         matches = modulestore().get_items(locator, qualifiers={'category': 'garbage'})
         self.assertEqual(len(matches), 0)
+        matches = modulestore().get_items(locator, qualifiers={'category': {'$in': ['chapter', 'course']}})
+        self.assertEqual(len(matches), 4)
         matches = modulestore().get_items(locator, qualifiers={'name': 'chapter1'})
         self.assertEqual(len(matches), 1)
         matches = modulestore().get_items(locator, qualifiers={'name': ['chapter1', 'chapter2']})
@@ -2206,6 +2228,83 @@ class TestPublish(SplitModuleTest):
         self.assertEqual(source_block_keys, dest_block_keys)
 
 
+class TestStructureIndex(unittest.TestCase):
+    """
+    Test the indexes used by get_items to find candidate blocks.
+    """
+    def setUp(self):
+        super(TestStructureIndex, self).setUp()
+        self.course = BlockKey('course', 'course')
+        self.chapter = BlockKey('chapter', 'chapter')
+        self.problem = BlockKey('problem', 'problem')
+        self.orphan = BlockKey('problem', 'orphan')
+        self.orphan_child = BlockKey('html', 'orphan_child')
+        blocks = {
+            self.course: {'children': [self.chapter]},
+            self.chapter: {'children': [self.problem], 'display_name': 'Chapter', 'group_access': {1: [1]}},
+            self.problem: {'display_name': 'Problem', 'tags': ['a', ['b']]},
+            self.orphan: {'display_name': 'Problem', 'children': [self.orphan_child]},
+            self.orphan_child: {},
+        }
+        self.index = StructureIndex({
+            'blocks': {
+                block_key: BlockData(block_type=block_key.type, fields=fields)
+                for block_key, fields in blocks.iteritems()
+            }
+        })
+
+    def test_candidates_by_type(self):
+        self.assertItemsEqual(
+            self.index.candidate_block_keys({'block_type': 'problem'}, {}),
+            [self.problem, self.orphan]
+        )
+        self.assertItemsEqual(
+            self.index.candidate_block_keys({'block_type': {'$in': ['course', 'chapter']}}, {}),
+            [self.course, self.chapter]
+        )
+        self.assertEqual(self.index.candidate_block_keys({'block_type': 'garbage'}, {}), [])
+
+    def test_candidates_by_settings(self):
+        self.assertItemsEqual(
+            self.index.candidate_block_keys({'block_type': 'problem'}, {'display_name': 'Problem'}),
+            [self.problem, self.orphan]
+        )
+        self.assertEqual(
+            self.index.candidate_block_keys({'block_type': 'chapter'}, {'display_name': 'Problem'}),
+            []
+        )
+        self.assertEqual(self.index.candidate_block_keys({}, {'children': self.problem}), [self.chapter])
+        self.assertEqual(self.index.candidate_block_keys({}, {'tags': 'b'}), [self.problem])
+
+    def test_unindexed_criteria(self):
+        for criteria in [
+                re.compile('Prob'),
+                lambda value: True,
+                {'$exists': True},
+                {'$nin': ['Problem']},
+                {'$in': [re.compile('Prob')]},
+                None,
+        ]:
+            self.assertIsNone(self.index.candidate_block_keys({}, {'display_name': criteria}))
+            self.assertIsNone(self.index.candidate_block_keys({'block_type': criteria}, {}))
+
+    def test_reachable_block_keys(self):
+        self.assertEqual(self.index.reachable_block_keys, {self.course, self.chapter, self.problem})
+        self.assertEqual(self.index.parents[self.orphan_child], [self.orphan])
+
+    def test_shared_indexes(self):
+        self.index.candidate_block_keys({'block_type': 'problem'}, {'display_name': 'Problem'})
+        self.index.reachable_block_keys  # pylint: disable=pointless-statement
+
+        # Another copy of the structure uses the indexes built over the first.
+        other_index = StructureIndex({'blocks': {}}, self.index.indexes)
+        self.assertItemsEqual(
+            other_index.candidate_block_keys({'block_type': 'problem'}, {'display_name': 'Problem'}),
+            [self.problem, self.orphan]
+        )
+        self.assertEqual(other_index.reachable_block_keys, {self.course, self.chapter, self.problem})
+
+
 class TestSchema(SplitModuleTest):
     """
     Test the db schema (and possibly eventually migrations?)
@@ -132,6 +132,11 @@ class TestBulkWriteMixinClosed(TestBulkWriteMixin):
             course_context=self.course_key,
         )
 
+    def test_initial_index_not_cached(self):
+        # The index that the index is updated from is read from the db
+        self.bulk._begin_bulk_operation(self.course_key)
+        self.assertConnCalls(call.get_course_index(self.course_key, use_cache=False))
+
     def test_write_structure_on_close(self):
         self.conn.get_course_index.return_value = None
         self.bulk._begin_bulk_operation(self.course_key)
@@ -1,7 +1,11 @@
 """ Test the behavior of split_mongo/MongoConnection """
+import datetime
 import unittest
-from mock import patch
-from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection
+from django.core.cache.backends.locmem import LocMemCache
+from mock import patch, Mock
+from opaque_keys.edx.locator import CourseLocator
+from xmodule.modulestore.exceptions import ItemWriteConflictError
+from xmodule.modulestore.split_mongo.mongo_connection import CourseIndexCache, LocalStructureCache, MongoConnection
 from xmodule.exceptions import HeartbeatFailure
 
 
@@ -17,3 +21,154 @@ class TestHeartbeatFailureException(unittest.TestCase):
 
             with self.assertRaises(HeartbeatFailure):
                 useless_conn.heartbeat()
+
+
+class TestCourseIndexCache(unittest.TestCase):
+    """ Test the process-local cache of course indexes """
+    def setUp(self):
+        super(TestCourseIndexCache, self).setUp()
+        self.course_key = CourseLocator('org', 'course', 'run')
+        self.course_index = {'org': 'org', 'course': 'course', 'run': 'run', 'versions': {'draft-branch': 1}}
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.time')
+    def test_expiry(self, mock_time):
+        cache = CourseIndexCache(10)
+        mock_time.return_value = 100
+        self.assertIsNone(cache.get(self.course_key))
+        cache.set(self.course_key, self.course_index)
+
+        mock_time.return_value = 110
+        self.assertEqual(cache.get(self.course_key), self.course_index)
+        mock_time.return_value = 111
+        self.assertIsNone(cache.get(self.course_key))
+
+    def test_copies(self):
+        cache = CourseIndexCache(10)
+        cache.set(self.course_key, self.course_index)
+        self.course_index['versions']['draft-branch'] = 2
+        cache.get(self.course_key)['versions']['draft-branch'] = 3
+        self.assertEqual(cache.get(self.course_key)['versions'], {'draft-branch': 1})
+
+    def test_delete(self):
+        cache = CourseIndexCache(10)
+        cache.set(self.course_key, self.course_index)
+        cache.delete(self.course_index)
+        self.assertIsNone(cache.get(self.course_key))
+
+    def test_version_invalidation(self):
+        version_cache = LocMemCache('course_index_version', {})
+        cache = CourseIndexCache(10, version_cache)
+        other_process_cache = CourseIndexCache(10, version_cache)
+        self.course_index['last_update'] = datetime.datetime(2016, 6, 1)
+        cache.set(self.course_key, self.course_index)
+        self.assertEqual(cache.get(self.course_key), self.course_index)
+
+        # An update made by another process invalidates the index.
+        other_process_cache.updated(dict(self.course_index, last_update=datetime.datetime(2016, 6, 2)))
+        self.assertIsNone(cache.get(self.course_key))
+
+        # The index read before the update doesn't become current again.
+        cache.set(self.course_key, self.course_index)
+        self.assertIsNone(cache.get(self.course_key))
+
+    def create_connection(self):
+        """
+        Return a MongoConnection caching course indexes, whose course index
+        collection is a mock.
+        """
+        with patch('mongodb_proxy.MongoProxy'):
+            with patch(
+                'xmodule.modulestore.split_mongo.mongo_connection.get_cache',
+                return_value=LocMemCache('course_index_version', {})
+            ):
+                conn = MongoConnection('useless', 'useless', 'useless', course_index_cache_timeout=10)
+        conn.course_index = Mock()
+        return conn
+
+    @patch('pymongo.MongoClient')
+    @patch('pymongo.database.Database')
+    def test_connection_caching(self, *calls):
+        # pylint: disable=W0613
+        conn = self.create_connection()
+        conn.course_index.find_one.return_value = self.course_index
+
+        self.assertEqual(conn.get_course_index(self.course_key), self.course_index)
+        self.assertEqual(conn.get_course_index(self.course_key), self.course_index)
+        self.assertEqual(conn.course_index.find_one.call_count, 1)
+
+        # Queries ignoring case aren't cached.
+        conn.get_course_index(self.course_key, ignore_case=True)
+        self.assertEqual(conn.course_index.find_one.call_count, 2)
+
+        # Reads bypassing the cache refresh it.
+        conn.get_course_index(self.course_key, use_cache=False)
+        self.assertEqual(conn.course_index.find_one.call_count, 3)
+        conn.get_course_index(self.course_key)
+        self.assertEqual(conn.course_index.find_one.call_count, 3)
+
+        # Updating the index invalidates it.
+        updated_index = dict(self.course_index)
+        conn.update_course_index(updated_index)
+        conn.course_index.find_one.return_value = updated_index
+        self.assertEqual(conn.get_course_index(self.course_key), updated_index)
+        self.assertEqual(conn.get_course_index(self.course_key), updated_index)
+        self.assertEqual(conn.course_index.find_one.call_count, 4)
+
+    @patch('pymongo.MongoClient')
+    @patch('pymongo.database.Database')
+    def test_update_conflict(self, *calls):
+        # pylint: disable=W0613
+        conn = self.create_connection()
+        from_index = dict(self.course_index, _id=1, last_update=datetime.datetime(2016, 6, 1))
+        conn.course_index.update.return_value = {'n': 0}
+        with self.assertRaises(ItemWriteConflictError):
+            conn.update_course_index(dict(self.course_index), from_index=from_index)
+
+        conn.course_index.update.return_value = {'n': 1}
+        conn.update_course_index(dict(self.course_index), from_index=from_index)
+
+
+class TestLocalStructureCache(unittest.TestCase):
+    """ Test the in-process LRU of pickled structures """
+    def test_get_and_set(self):
+        cache = LocalStructureCache(10)
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', 'aaaa')
+        self.assertEqual(cache.get('a'), 'aaaa')
+        cache.set('a', 'aa')
+        self.assertEqual(cache.get('a'), 'aa')
+        self.assertEqual(cache.size, 2)
+
+    def test_eviction(self):
+        cache = LocalStructureCache(10)
+        cache.set('a', 'aaaa')
+        cache.set('b', 'bbbb')
+        # Using 'a' makes 'b' the least recently used structure.
+        cache.get('a')
+        cache.set('c', 'cccc')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'aaaa')
+        self.assertEqual(cache.get('c'), 'cccc')
+        self.assertEqual(cache.size, 8)
+
+        # Structures larger than the cache aren't kept.
+        cache.set('d', 'd' * 11)
+        self.assertIsNone(cache.get('d'))
+        self.assertEqual(len(cache), 2)
+
+        cache.clear()
+        self.assertEqual((len(cache), cache.size), (0, 0))
+
+    def test_indexes(self):
+        cache = LocalStructureCache(10)
+        self.assertIsNone(cache.indexes_for('a'))
+        cache.set('a', 'aaaa')
+        cache.indexes_for('a')['index'] = 'value'
+        self.assertEqual(cache.indexes_for('a'), {'index': 'value'})
+
+        # The indexes are evicted with their structure.
+        cache.set('b', 'bbbb')
+        cache.set('c', 'cccc')
+        self.assertIsNone(cache.indexes_for('a'))
+        cache.set('a', 'aaaa')
+        self.assertEqual(cache.indexes_for('a'), {})
@@ -2,6 +2,8 @@
 Models for bulk email
 """
 import logging
+from string import Formatter
+
 import markupsafe
 
 from django.conf import settings
@@ -18,7 +20,7 @@ from student.roles import CourseStaffRole, CourseInstructorRole
 
 from xmodule_django.models import CourseKeyField
 
-from util.keyword_substitution import substitute_keywords_with_data
+from util.keyword_substitution import anonymous_id_from_user_id, substitute_keywords_with_data
 from util.query import use_read_replica_if_available
 
 log = logging.getLogger(__name__)
@@ -332,6 +334,155 @@ class CourseEmailTemplate(models.Model):
                 context[key] = markupsafe.escape(value)
         return CourseEmailTemplate._render(self.html_template, htmltext, context)
 
+    def compile_plaintext(self, plaintext, context):
+        """
+        Return a CompiledEmailTemplate rendering the plain text email message
+        of each recipient, like `render_plaintext` would.
+
+        `context` holds the values that are the same for all recipients.
+        """
+        return CompiledEmailTemplate(self.plain_template, plaintext, context)
+
+    def compile_htmltext(self, htmltext, context):
+        """
+        Return a CompiledEmailTemplate rendering the HTML email message of
+        each recipient, like `render_htmltext` would.
+
+        `context` holds the values that are the same for all recipients.
+        """
+        return CompiledEmailTemplate(self.html_template, htmltext, context, escape=True)
+
+
+class CompiledEmailTemplate(object):
+    """
+    A course email template and message body, rendered once for all of the
+    recipients of a subtask.
+
+    The values of the recipient fields ('name', 'email' and 'user_id') are
+    left as placeholders, and only the lines holding them are completed and
+    wrapped for each recipient.  When the template uses a recipient field
+    in a way a placeholder can't stand for (e.g. with a format spec), or a
+    recipient's values could change how the message is rendered, messages
+    are rendered from scratch instead.
+    """
+    RECIPIENT_FIELDS = ('name', 'email', 'user_id')
+    PLACEHOLDER = u'\ue000{}\ue000'
+    ANONYMOUS_USER_ID = 'anonymous_user_id'
+
+    def __init__(self, format_string, message_body, context, escape=False):
+        self.format_string = format_string
+        self.message_body = message_body
+        self.escape = escape
+        self.context = self._escaped(context)
+        self._needs_anonymous_user_id = False
+        # A list of (line, has_placeholders) pairs, or None if the message
+        # can't be compiled.
+        self._lines = self._compile() if self._can_compile() else None
+
+    def _escaped(self, context):
+        """
+        Return a copy of `context`, with string values HTML-escaped if needed.
+        """
+        context = dict(context)
+        if self.escape:
+            for key, value in context.iteritems():
+                if isinstance(value, basestring):
+                    context[key] = markupsafe.escape(value)
+        return context
+
+    def _placeholder(self, field):
+        """
+        Return the placeholder for the given recipient field.
+        """
+        return self.PLACEHOLDER.format(field)
+
+    def _can_compile(self):
+        """
+        Return whether recipient fields are only used as plain replacement
+        fields in the template, and placeholders can't be confused with
+        other text.
+        """
+        marker = self.PLACEHOLDER[0]
+        if marker in self.format_string or marker in self.message_body:
+            return False
+        if any(isinstance(value, basestring) and marker in value for value in self.context.itervalues()):
+            return False
+        for __, field_name, format_spec, conversion in Formatter().parse(self.format_string):
+            if field_name is None:
+                continue
+            base_name = field_name.partition('.')[0].partition('[')[0]
+            if base_name in self.RECIPIENT_FIELDS and (
+                    field_name != base_name or format_spec or conversion not in (None, 's')
+            ):
+                return False
+        return True
+
+    def _compile(self):
+        """
+        Render the message with placeholders for the recipient fields, and
+        return its lines, wrapping those without placeholders.
+        """
+        context = dict(self.context)
+        for field in self.RECIPIENT_FIELDS:
+            context[field] = self._placeholder(field)
+
+        # Substitute all %%-encoded keywords in the message body, leaving the
+        # anonymous user id, which needs a query per recipient, for later.
+        message_body = self.message_body
+        if 'course_id' in context:
+            if context.get('course_title') is not None and '%%USER_ID%%' in message_body:
+                self._needs_anonymous_user_id = True
+                message_body = message_body.replace('%%USER_ID%%', self._placeholder(self.ANONYMOUS_USER_ID))
+            message_body = substitute_keywords_with_data(message_body, context)
+
+        result = self.format_string.format(**context)
+        message_body_tag = COURSE_EMAIL_MESSAGE_BODY_TAG.format()
+        result = result.replace(message_body_tag, message_body, 1)
+
+        lines = []
+        for line in result.split('\n'):
+            if self.PLACEHOLDER[0] in line:
+                lines.append((line, True))
+            else:
+                lines.append((wrap_message(line), False))
+        return lines
+
+    def render(self, recipient_context):
+        """
+        Return the message for the recipient described by `recipient_context`,
+        which holds the values of the recipient fields.
+        """
+        values = self._escaped(recipient_context)
+        if self._lines is None or not self._can_substitute(values):
+            context = dict(self.context, **values)
+            return CourseEmailTemplate._render(self.format_string, self.message_body, context)
+
+        if self._needs_anonymous_user_id:
+            values[self.ANONYMOUS_USER_ID] = anonymous_id_from_user_id(values['user_id'])
+
+        rendered_lines = []
+        for line, has_placeholders in self._lines:
+            if has_placeholders:
+                for field, value in values.iteritems():
+                    line = line.replace(self._placeholder(field), unicode(value))
+                line = wrap_message(line)
+            rendered_lines.append(line)
+        return u'\n'.join(rendered_lines)
+
+    def _can_substitute(self, values):
+        """
+        Return whether the recipient's values can't change how the rest of
+        the message is rendered, i.e. they hold no placeholder, keyword or
+        message body tag.
+        """
+        message_body_tag = COURSE_EMAIL_MESSAGE_BODY_TAG.format()
+        for value in values.itervalues():
+            if isinstance(value, basestring) and (
+                    self.PLACEHOLDER[0] in value or '%%' in value or message_body_tag in value
+            ):
+                return False
+        return True
+
 
 class CourseAuthorization(models.Model):
     """
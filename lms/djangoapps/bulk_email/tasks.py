@@ -8,7 +8,7 @@ import json
 import logging
 import random
 import re
-from time import sleep
+from time import sleep, time
 
 import dogstats_wrapper as dog_stats_api
 from smtplib import SMTPServerDisconnected, SMTPDataError, SMTPConnectError, SMTPException
@@ -32,6 +32,7 @@ from celery.exceptions import RetryTaskError  # pylint: disable=no-name-in-modul
 
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.mail import EmailMultiAlternatives, get_connection
 from django.core.mail.message import forbid_multi_line_headers
 from django.core.urlresolvers import reverse
@@ -410,6 +411,27 @@ def _get_source_address(course_id, course_title, truncate=True):
     return from_addr
 
 
+def _wait_for_send_slot(max_sends_per_second):
+    """
+    Block until a message can be sent without exceeding `max_sends_per_second`.
+
+    Sends are counted per second in the cache, so that the limit is shared
+    by all of the workers sending bulk email.
+    """
+    while True:
+        now = time()
+        key = 'bulk_email.sends.{}'.format(int(now))
+        cache.add(key, 0, timeout=2)
+        try:
+            num_sends = cache.incr(key)
+        except ValueError:
+            # The key expired or was evicted in the meantime; don't wait on it.
+            return
+        if num_sends <= max_sends_per_second:
+            return
+        sleep(1 - (now % 1))
+
+
 def _send_course_email(entry_id, email_id, to_list, global_email_context, subtask_status):
     """
     Performs the email sending task.
@@ -488,9 +510,14 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
         connection = get_connection()
         connection.open()
 
-        # Define context values to use in all course emails:
+        # Define context values to use in all course emails, and compile
+        # the templates once for all recipients of this subtask:
         email_context = {'name': '', 'email': ''}
         email_context.update(global_email_context)
+        email_context['user_id'] = None
+        email_context['course_id'] = course_email.course_id
+        plaintext_template = course_email_template.compile_plaintext(course_email.text_message, email_context)
+        html_template = course_email_template.compile_htmltext(course_email.html_message, email_context)
 
         while to_list:
             # Update context with user-specific values from the user at the end of the list.
@@ -501,14 +528,15 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
             recipient_num += 1
             current_recipient = to_list[-1]
             email = current_recipient['email']
-            email_context['email'] = email
-            email_context['name'] = current_recipient['profile__name']
-            email_context['user_id'] = current_recipient['pk']
-            email_context['course_id'] = course_email.course_id
+            recipient_context = {
+                'email': email,
+                'name': current_recipient['profile__name'],
+                'user_id': current_recipient['pk'],
+            }
 
-            # Construct message content using templates and context:
-            plaintext_msg = course_email_template.render_plaintext(course_email.text_message, email_context)
-            html_msg = course_email_template.render_htmltext(course_email.html_message, email_context)
+            # Construct message content using the compiled templates:
+            plaintext_msg = plaintext_template.render(recipient_context)
+            html_msg = html_template.render(recipient_context)
 
             # Create email:
             email_msg = EmailMultiAlternatives(
@@ -520,12 +548,14 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
             )
             email_msg.attach_alternative(html_msg, 'text/html')
 
-            # Throttle if we have gotten the rate limiter.  This is not very high-tech,
-            # but if a task has been retried for rate-limiting reasons, then we sleep
-            # for a period of time between all emails within this task.  Choice of
-            # the value depends on the number of workers that might be sending email in
-            # parallel, and what the SES throttle rate is.
-            if subtask_status.retried_nomax > 0:
+            # Throttle if configured to, using a send rate shared by all workers.
+            # Otherwise, if a task has been retried for rate-limiting reasons, then
+            # we sleep for a period of time between all emails within this task.
+            # Choice of the value depends on the number of workers that might be
+            # sending email in parallel, and what the SES throttle rate is.
+            if settings.BULK_EMAIL_MAX_SENDS_PER_SECOND:
+                _wait_for_send_slot(settings.BULK_EMAIL_MAX_SENDS_PER_SECOND)
+            elif subtask_status.retried_nomax > 0:
                 sleep(settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS)
 
             try:
@@ -190,6 +190,69 @@ class CourseEmailTemplateTest(TestCase):
         self.assertIn(context['course_title'], message)
         self.assertIn(context['name'], message)
 
+    def _assert_compiled_renders_match(self, message_body, global_context, recipient_context):
+        """
+        Assert that the compiled templates render the same messages as
+        `render_plaintext` and `render_htmltext`.
+        """
+        template = CourseEmailTemplate.get_template()
+        context = dict(global_context, **recipient_context)
+        self.assertEqual(
+            template.compile_plaintext(message_body, global_context).render(recipient_context),
+            template.render_plaintext(message_body, dict(context)),
+        )
+        self.assertEqual(
+            template.compile_htmltext(message_body, global_context).render(recipient_context),
+            template.render_htmltext(message_body, dict(context)),
+        )
+
+    def test_compiled_render(self):
+        global_context = self._get_sample_html_context()
+        global_context['course_id'] = "course-v1:edx+100+1"
+        compiled = CourseEmailTemplate.get_template().compile_plaintext("My new plain text.", global_context)
+        for recipient_context in (
+                {'name': "Ann", 'email': 'ann@test.com', 'user_id': 1},
+                {'name': "Bob", 'email': 'bob@test.com', 'user_id': 2},
+        ):
+            self._assert_compiled_renders_match(
+                "Dear %%USER_FULLNAME%%, thanks for enrolling in %%COURSE_DISPLAY_NAME%%.",
+                global_context,
+                recipient_context,
+            )
+            self.assertIn(recipient_context['email'], compiled.render(recipient_context))
+
+    def test_compiled_render_xss(self):
+        global_context = self._add_xss_fields(self._get_sample_html_context())
+        recipient_context = {
+            'name': global_context.pop('name'),
+            'email': 'your-email@test.com',
+            'user_id': global_context.pop('user_id'),
+        }
+        self._assert_compiled_renders_match(
+            "Dear %%USER_FULLNAME%%, thanks for enrolling in %%COURSE_DISPLAY_NAME%%.",
+            global_context,
+            recipient_context,
+        )
+
+    def test_compiled_render_long_lines(self):
+        global_context = self._get_sample_html_context()
+        global_context['course_id'] = "course-v1:edx+100+1"
+        recipient_context = {'name': "Ann " * 300, 'email': 'ann@test.com', 'user_id': 1}
+        self._assert_compiled_renders_match(
+            "Dear %%USER_FULLNAME%%,\n" + "text " * 300, global_context, recipient_context
+        )
+
+    def test_compiled_render_falls_back(self):
+        global_context = self._get_sample_html_context()
+        global_context['course_id'] = "course-v1:edx+100+1"
+        # A name holding a keyword can't simply be substituted into the message.
+        recipient_context = {'name': "%%COURSE_DISPLAY_NAME%%", 'email': 'ann@test.com', 'user_id': 1}
+        self._assert_compiled_renders_match(
+            "Dear %%USER_FULLNAME%%, thanks for enrolling in %%COURSE_DISPLAY_NAME%%.",
+            global_context,
+            recipient_context,
+        )
+
 
 @attr('shard_1')
 class CourseAuthorizationTest(TestCase):
@@ -4,12 +4,15 @@ by the individual custom courses feature.
 """
 import json
 import logging
+from time import time
 
+from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
 
 import request_cache
 
-from courseware.field_overrides import FieldOverrideProvider
+from courseware.field_overrides import FieldOverrideProvider, clear_inherited_overrides
 from opaque_keys.edx.keys import CourseKey, UsageKey
 from ccx_keys.locator import CCXLocator, CCXBlockUsageLocator
 
@@ -18,6 +21,11 @@ from lms.djangoapps.ccx.models import CcxFieldOverride, CustomCourseForEdX
 
 log = logging.getLogger(__name__)
 
+# Overrides read within this many seconds of a change to a CCX's overrides
+# aren't cached, since the change may not have been committed yet when they
+# were read.
+UNSETTLED_OVERRIDES_VERSION_AGE = 60
+
 
 class CustomCoursesForEdxOverrideProvider(FieldOverrideProvider):
     """
@@ -120,22 +128,75 @@ def _get_overrides_for_ccx(ccx):
     overrides_cache = request_cache.get_cache('ccx-overrides')
 
     if ccx not in overrides_cache:
-        overrides = {}
-        query = CcxFieldOverride.objects.filter(
-            ccx=ccx,
-        )
-
-        for override in query:
-            block_overrides = overrides.setdefault(override.location, {})
-            block_overrides[override.field] = json.loads(override.value)
-            block_overrides[override.field + "_id"] = override.id
-            block_overrides[override.field + "_instance"] = override
+        timeout = getattr(settings, 'CCX_OVERRIDES_CACHE_TIMEOUT', 0)
+        cache_key = overrides = None
+        if timeout:
+            version = _get_overrides_version(ccx)
+            cache_key = u'ccx.overrides.{}.{}'.format(ccx.id, version)
+            overrides = cache.get(cache_key)
+            if time() * 1000 - version < UNSETTLED_OVERRIDES_VERSION_AGE * 1000:
+                cache_key = None
+
+        if overrides is None:
+            overrides = {}
+            query = CcxFieldOverride.objects.filter(
+                ccx=ccx,
+            )
+
+            for override in query:
+                block_overrides = overrides.setdefault(override.location, {})
+                block_overrides[override.field] = json.loads(override.value)
+                block_overrides[override.field + "_id"] = override.id
+                block_overrides[override.field + "_instance"] = override
+
+            if cache_key:
+                # The model instances are only needed to save changes to the
+                # overrides, so leave them out to keep the cached map small.
+                cache.set(cache_key, {
+                    location: {
+                        field: value
+                        for field, value in block_overrides.iteritems()
+                        if not field.endswith("_instance")
+                    }
+                    for location, block_overrides in overrides.iteritems()
+                }, timeout)
 
         overrides_cache[ccx] = overrides
 
     return overrides_cache[ccx]
 
 
+def _overrides_version_cache_key(ccx):
+    """
+    Returns the cache key of the version of the overrides of the `ccx`.
+    """
+    return u'ccx.overrides.version.{}'.format(ccx.id)
+
+
+def _get_overrides_version(ccx):
+    """
+    Returns the version of the overrides of the `ccx`, which is the time in
+    milliseconds when they were last changed.
+    """
+    cache_key = _overrides_version_cache_key(ccx)
+    version = cache.get(cache_key)
+    if version is None:
+        version = int(time() * 1000)
+        if not cache.add(cache_key, version, None):
+            version = cache.get(cache_key, version)
+    return version
+
+
+def _change_overrides_version(ccx):
+    """
+    Changes the version of the overrides of the `ccx`, so that the overrides
+    cached for earlier versions are no longer used.
+    """
+    cache_key = _overrides_version_cache_key(ccx)
+    version = max(int(time() * 1000), cache.get(cache_key, 0) + 1)
+    cache.set(cache_key, version, None)
+
+
 @transaction.atomic
 def override_field_for_ccx(ccx, block, name, value):
     """
@@ -153,6 +214,7 @@ def override_field_for_ccx(ccx, block, name, value):
     if override:
         override_has_changes = serialized_value != override.value
 
+    created = False
     if not override:
         override, created = CcxFieldOverride.objects.get_or_create(
             ccx=ccx,
@@ -168,6 +230,9 @@ def override_field_for_ccx(ccx, block, name, value):
     if override_has_changes:
         override.value = serialized_value
         override.save()
+    if created or override_has_changes:
+        _change_overrides_version(ccx)
+        clear_inherited_overrides()
 
     _get_overrides_for_ccx(ccx).setdefault(clean_ccx_key, {})[name] = value_json
     _get_overrides_for_ccx(ccx).setdefault(clean_ccx_key, {})[name + "_instance"] = override
@@ -187,6 +252,8 @@ def clear_override_for_ccx(ccx, block, name):
             field=name).delete()
 
         clear_ccx_field_info_from_ccx_map(ccx, block, name)
+        _change_overrides_version(ccx)
+        clear_inherited_overrides()
 
     except CcxFieldOverride.DoesNotExist:
         pass
@@ -214,3 +281,4 @@ def bulk_delete_ccx_override_fields(ccx, ids):
     ids = list(set(ids))
     if ids:
         CcxFieldOverride.objects.filter(ccx=ccx, id__in=ids).delete()
+        _change_overrides_version(ccx)
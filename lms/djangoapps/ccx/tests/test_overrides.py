@@ -13,6 +13,8 @@ from courseware.field_overrides import OverrideFieldData
 from courseware.testutils import FieldOverrideTestMixin
 from django.test.utils import override_settings
 from lms.djangoapps.courseware.tests.test_field_overrides import inject_field_overrides
+from opaque_keys.edx.locator import CourseLocator
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
 from request_cache.middleware import RequestCache
 from student.tests.factories import AdminFactory
 from xmodule.modulestore.tests.django_utils import (
@@ -20,8 +22,12 @@ from xmodule.modulestore.tests.django_utils import (
     TEST_DATA_SPLIT_MODULESTORE)
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 
-from lms.djangoapps.ccx.models import CustomCourseForEdX
-from lms.djangoapps.ccx.overrides import override_field_for_ccx
+from lms.djangoapps.ccx.models import CcxFieldOverride, CustomCourseForEdX
+from lms.djangoapps.ccx.overrides import (
+    _get_overrides_for_ccx,
+    bulk_delete_ccx_override_fields,
+    override_field_for_ccx,
+)
 
 from lms.djangoapps.ccx.tests.utils import flatten, iter_blocks
 
@@ -173,3 +179,44 @@ class TestFieldOverrides(FieldOverrideTestMixin, SharedModuleStoreTestCase):
         override_field_for_ccx(self.ccx, chapter, 'due', ccx_due)
         vertical = chapter.get_children()[0].get_children()[0]
         self.assertEqual(vertical.due, ccx_due)
+
+
+@attr('shard_1')
+@override_settings(CCX_OVERRIDES_CACHE_TIMEOUT=60 * 60)
+class TestCachedOverrides(CacheIsolationTestCase):
+    """
+    Make sure the overrides of a CCX are cached until they are changed.
+    """
+    ENABLED_CACHES = ['default']
+
+    def setUp(self):
+        super(TestCachedOverrides, self).setUp()
+        self.ccx = CustomCourseForEdX.objects.create(
+            course_id=CourseLocator('org', 'course', 'run'),
+            display_name='Test CCX',
+            coach=AdminFactory.create())
+        self.location = self.ccx.course_id.make_usage_key('chapter', 'chapter')
+        self.override = CcxFieldOverride.objects.create(
+            ccx=self.ccx, location=self.location, field='display_name', value='"Overridden"')
+        self.addCleanup(RequestCache.clear_request_cache)
+
+    def get_overrides(self):
+        """
+        Get the overrides of the CCX as a new request would.
+        """
+        RequestCache.clear_request_cache()
+        return _get_overrides_for_ccx(self.ccx)
+
+    @mock.patch('lms.djangoapps.ccx.overrides.UNSETTLED_OVERRIDES_VERSION_AGE', 0)
+    def test_overrides_are_cached_until_changed(self):
+        self.assertEqual(self.get_overrides()[self.location]['display_name'], 'Overridden')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_overrides()[self.location]['display_name'], 'Overridden')
+
+        bulk_delete_ccx_override_fields(self.ccx, [self.override.id])
+        self.assertEqual(self.get_overrides(), {})
+
+    def test_recently_changed_overrides_are_not_cached(self):
+        self.get_overrides()
+        with self.assertNumQueries(1):
+            self.get_overrides()
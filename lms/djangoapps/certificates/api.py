@@ -175,6 +175,58 @@ def generate_user_certificates(student, course_key, course=None, insecure=False,
     return cert.status
 
 
+def generate_certificates_for_students(students, course_key, course=None, generation_mode='batch'):
+    """
+    Adds the add-cert requests of many students into the xqueue, as
+    generate_user_certificates does for one.
+
+    Students are graded, and their certificates generated, in batches of
+    `CERTIFICATE_GENERATION_BATCH_SIZE`.  The xqueue tasks are sent by
+    `CERTIFICATE_XQUEUE_SUBMISSION_WORKERS` threads if that setting is
+    non-zero.
+
+    Args:
+        students (iterable of User)
+        course_key (CourseKey)
+
+    Keyword Arguments:
+        course (Course): Optionally provide the course object; if not provided
+            it will be loaded.
+        generation_mode - who has requested certificate generation.
+
+    Yields:
+        A (student, status) tuple for every student, where status is the
+        status of the student's certificate, or None if no certificate was
+        generated for them.
+    """
+    if course is None:
+        course = modulestore().get_course(course_key, depth=0)
+    xqueue = XQueueCertInterface()
+    generate_pdf = not has_html_certificates_enabled(course_key, course)
+    certs = xqueue.add_certs(
+        students,
+        course_key,
+        course=course,
+        generate_pdf=generate_pdf,
+        batch_size=settings.CERTIFICATE_GENERATION_BATCH_SIZE,
+        submission_workers=settings.CERTIFICATE_XQUEUE_SUBMISSION_WORKERS,
+    )
+    for student, cert in certs:
+        if cert is None:
+            yield student, None
+            continue
+
+        if CertificateStatuses.is_passing_status(cert.status):
+            emit_certificate_event('created', student, course_key, course, {
+                'user_id': student.id,
+                'course_id': unicode(course_key),
+                'certificate_id': cert.verify_uuid,
+                'enrollment_mode': cert.mode,
+                'generation_mode': generation_mode
+            })
+        yield student, cert.status
+
+
 def regenerate_user_certificates(student, course_key, course=None,
                                  forced_grade=None, template_file=None, insecure=False):
     """
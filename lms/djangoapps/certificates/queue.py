@@ -1,7 +1,10 @@
 """Interface for adding certificate generation tasks to the XQueue. """
+from itertools import islice
 import json
 import random
 import logging
+from Queue import Queue
+from threading import Lock, Thread
 import lxml.html
 from lxml.etree import XMLSyntaxError, ParserError
 from uuid import uuid4
@@ -22,6 +25,7 @@ from lms.djangoapps.verify_student.models import SoftwareSecurePhotoVerification
 from certificates.models import (
     CertificateStatuses,
     GeneratedCertificate,
+    certificate_status,
     certificate_status_for_student,
     CertificateStatuses as status,
     CertificateWhitelist,
@@ -50,6 +54,91 @@ class XQueueAddToQueueError(Exception):
         )
 
 
+def _make_xqueue_interface():
+    """
+    Returns a new connection to the xqueue server configured in the settings.
+    """
+    # Get basic auth (username/password) for
+    # xqueue connection if it's in the settings
+    if settings.XQUEUE_INTERFACE.get('basic_auth') is not None:
+        requests_auth = HTTPBasicAuth(
+            *settings.XQUEUE_INTERFACE['basic_auth'])
+    else:
+        requests_auth = None
+
+    return XQueueInterface(
+        settings.XQUEUE_INTERFACE['url'],
+        settings.XQUEUE_INTERFACE['django_auth'],
+        requests_auth,
+    )
+
+
+class _XQueueSubmitter(object):
+    """
+    Sends certificate tasks to the XQueue from a fixed number of worker
+    threads, each with its own connection to the queue server.  `submit`
+    blocks while as many tasks as there are workers are already waiting, so
+    that certificates aren't generated much faster than they can be sent.
+    """
+    def __init__(self, workers):
+        self._tasks = Queue(maxsize=workers)
+        self._lock = Lock()
+        self._failures = []
+        self._threads = [Thread(target=self._work) for __ in range(workers)]
+        for thread in self._threads:
+            thread.daemon = True
+            thread.start()
+
+    def submit(self, send, cert):
+        """
+        Queues `send`, a function sending the task of `cert` over the XQueue
+        connection it is given.
+        """
+        self._tasks.put((send, cert))
+
+    def wait(self):
+        """
+        Waits until all submitted tasks have been sent, and returns a list of
+        the (cert, exception) of those that could not be sent.
+        """
+        self._tasks.join()
+        with self._lock:
+            failures, self._failures = self._failures, []
+        return failures
+
+    def close(self):
+        """
+        Stops the worker threads once all submitted tasks have been sent.
+        """
+        for __ in self._threads:
+            self._tasks.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def _work(self):
+        """
+        Sends queued tasks until told to stop.
+        """
+        xqueue_interface = _make_xqueue_interface()
+        while True:
+            task = self._tasks.get()
+            try:
+                if task is None:
+                    return
+                send, cert = task
+                try:
+                    send(xqueue_interface)
+                except Exception as exc:  # pylint: disable=broad-except
+                    # Any failure is recorded on the certificate, rather than
+                    # stopping the thread and leaving submit and close blocked.
+                    if not isinstance(exc, XQueueAddToQueueError):
+                        LOGGER.exception(u"Could not send the certificate task of user %s", cert.user_id)
+                    with self._lock:
+                        self._failures.append((cert, exc))
+            finally:
+                self._tasks.task_done()
+
+
 class XQueueCertInterface(object):
     """
     XQueueCertificateInterface provides an
@@ -83,26 +172,13 @@ class XQueueCertInterface(object):
 
     def __init__(self, request=None):
 
-        # Get basic auth (username/password) for
-        # xqueue connection if it's in the settings
-
-        if settings.XQUEUE_INTERFACE.get('basic_auth') is not None:
-            requests_auth = HTTPBasicAuth(
-                *settings.XQUEUE_INTERFACE['basic_auth'])
-        else:
-            requests_auth = None
-
         if request is None:
             factory = RequestFactory()
             self.request = factory.get('/')
         else:
             self.request = request
 
-        self.xqueue_interface = XQueueInterface(
-            settings.XQUEUE_INTERFACE['url'],
-            settings.XQUEUE_INTERFACE['django_auth'],
-            requests_auth,
-        )
+        self.xqueue_interface = _make_xqueue_interface()
         self.whitelist = CertificateWhitelist.objects.all()
         self.restricted = UserProfile.objects.filter(allow_certificate=False)
         self.use_https = True
@@ -183,7 +259,6 @@ class XQueueCertInterface(object):
 
         raise NotImplementedError
 
-    # pylint: disable=too-many-statements
     def add_cert(self, student, course_id, course=None, forced_grade=None, template_file=None, generate_pdf=True):
         """
         Request a new certificate for a student.
@@ -213,6 +288,24 @@ class XQueueCertInterface(object):
 
         Returns the newly created certificate instance
         """
+        return self._add_cert(
+            student,
+            course_id,
+            course=course,
+            forced_grade=forced_grade,
+            template_file=template_file,
+            generate_pdf=generate_pdf
+        )
+
+    # pylint: disable=too-many-statements
+    def _add_cert(self, student, course_id, course=None, forced_grade=None, template_file=None, generate_pdf=True,
+                  info=None, submitter=None):
+        """
+        Request a new certificate for a student, as described in add_cert.
+
+        `info` is the data about the student read by _get_students_info, if
+        any, and `submitter` the _XQueueSubmitter to send the XQueue task with.
+        """
 
         valid_statuses = [
             status.generating,
@@ -226,7 +319,10 @@ class XQueueCertInterface(object):
             status.audit_notpassing,
         ]
 
-        cert_status = certificate_status_for_student(student, course_id)['status']
+        if info is not None:
+            cert_status = certificate_status(info['cert'])['status']
+        else:
+            cert_status = certificate_status_for_student(student, course_id)['status']
         cert = None
 
         if cert_status not in valid_statuses:
@@ -249,18 +345,25 @@ class XQueueCertInterface(object):
         if course is None:
             course = modulestore().get_course(course_id, depth=0)
 
-        profile = UserProfile.objects.get(user=student)
-        profile_name = profile.name
+        if info is not None:
+            profile_name = info['profile_name']
+            is_whitelisted = info['is_whitelisted']
+            grade = dict(info['grade'])
+            enrollment_mode = info['enrollment_mode']
+            user_is_verified = info['user_is_verified']
+        else:
+            profile = UserProfile.objects.get(user=student)
+            profile_name = profile.name
 
-        # Needed for access control in grading.
-        self.request.user = student
-        self.request.session = {}
+            # Needed for access control in grading.
+            self.request.user = student
+            self.request.session = {}
 
-        is_whitelisted = self.whitelist.filter(user=student, course_id=course_id, whitelist=True).exists()
-        grade = grades.grade(student, course)
-        enrollment_mode, __ = CourseEnrollment.enrollment_mode_for_user(student, course_id)
+            is_whitelisted = self.whitelist.filter(user=student, course_id=course_id, whitelist=True).exists()
+            grade = grades.grade(student, course)
+            enrollment_mode, __ = CourseEnrollment.enrollment_mode_for_user(student, course_id)
+            user_is_verified = SoftwareSecurePhotoVerification.user_is_verified(student)
         mode_is_verified = enrollment_mode in GeneratedCertificate.VERIFIED_CERTS_MODES
-        user_is_verified = SoftwareSecurePhotoVerification.user_is_verified(student)
         cert_mode = enrollment_mode
         is_eligible_for_certificate = is_whitelisted or CourseMode.is_eligible_for_certificate(enrollment_mode)
         unverified = False
@@ -299,7 +402,10 @@ class XQueueCertInterface(object):
             mode_is_verified
         )
 
-        cert, created = GeneratedCertificate.objects.get_or_create(user=student, course_id=course_id)  # pylint: disable=no-member
+        if info is not None:
+            cert = info['cert']
+        else:
+            cert, __ = GeneratedCertificate.objects.get_or_create(user=student, course_id=course_id)  # pylint: disable=no-member
 
         cert.mode = cert_mode
         cert.user = student
@@ -374,7 +480,7 @@ class XQueueCertInterface(object):
         # Check to see whether the student is on the the embargoed
         # country restricted list. If so, they should not receive a
         # certificate -- set their status to restricted and log it.
-        if self.restricted.filter(user=student).exists():
+        if info['is_restricted'] if info is not None else self.restricted.filter(user=student).exists():
             cert.status = status.restricted
             cert.save()
 
@@ -406,12 +512,138 @@ class XQueueCertInterface(object):
             return cert
 
         # Finally, generate the certificate and send it off.
-        return self._generate_cert(cert, course, student, grade_contents, template_pdf, generate_pdf)
+        return self._generate_cert(cert, course, student, grade_contents, template_pdf, generate_pdf, submitter)
 
-    def _generate_cert(self, cert, course, student, grade_contents, template_pdf, generate_pdf):
+    def add_certs(self, students, course_id, course=None, generate_pdf=True, batch_size=100, submission_workers=0):
+        """
+        Request new certificates for many students, as add_cert does for
+        each of them.
+
+        Students are processed in batches of `batch_size`.  The students of a
+        batch are graded together, and their certificates, profiles,
+        enrollments, whitelisting and verification are read with a query each,
+        creating the certificate records they don't have yet in bulk.
+
+        If `submission_workers` is given, that many threads send the XQueue
+        tasks of a batch while its next students are processed.
+
+        Yields a (student, certificate) tuple for every student, as returned by
+        add_cert, or with a certificate of None if the student could not be
+        graded.
+        """
+        if course is None:
+            course = modulestore().get_course(course_id, depth=0)
+
+        submitter = _XQueueSubmitter(submission_workers) if generate_pdf and submission_workers else None
+        try:
+            students = iter(students)
+            batch = list(islice(students, batch_size))
+            while batch:
+                for result in self._add_certs_for_batch(batch, course_id, course, generate_pdf, submitter):
+                    yield result
+                batch = list(islice(students, batch_size))
+        finally:
+            if submitter is not None:
+                submitter.close()
+
+    def _add_certs_for_batch(self, students, course_id, course, generate_pdf, submitter):
+        """
+        Request new certificates for a batch of students, yielding the
+        (student, certificate) tuples described in add_certs.
+        """
+        students_info = self._get_students_info(students, course_id, course)
+
+        certs = []
+        for student in students:
+            if student.id in students_info:
+                certs.append(self._add_cert(
+                    student,
+                    course_id,
+                    course=course,
+                    generate_pdf=generate_pdf,
+                    info=students_info[student.id],
+                    submitter=submitter
+                ))
+            else:
+                certs.append(None)
+
+        if submitter is not None:
+            for cert, exc in submitter.wait():
+                self._handle_xqueue_error(cert, exc)
+
+        for student, cert in zip(students, certs):
+            yield student, cert
+
+    def _get_students_info(self, students, course_id, course):
+        """
+        Returns the data add_cert needs about each of `students` who could be
+        graded, keyed by user id, creating the certificate records they don't
+        have yet.
+        """
+        student_grades = {}
+        for student, gradeset, err_msg in grades.iterate_grades_for(course, students, batch_size=len(students)):
+            if err_msg:
+                LOGGER.error(
+                    u"Could not generate a certificate for student %s in the course '%s' "
+                    u"because they could not be graded: %s",
+                    student.id,
+                    unicode(course_id),
+                    err_msg
+                )
+            else:
+                student_grades[student.id] = gradeset
+
+        certs = {
+            cert.user_id: cert
+            for cert in GeneratedCertificate.objects.filter(  # pylint: disable=no-member
+                course_id=course_id, user_id__in=student_grades
+            )
+        }
+        missing_user_ids = [user_id for user_id in student_grades if user_id not in certs]
+        if missing_user_ids:
+            GeneratedCertificate.objects.bulk_create([  # pylint: disable=no-member
+                GeneratedCertificate(user_id=user_id, course_id=course_id) for user_id in missing_user_ids
+            ])
+            certs.update(
+                (cert.user_id, cert)
+                for cert in GeneratedCertificate.objects.filter(  # pylint: disable=no-member
+                    course_id=course_id, user_id__in=missing_user_ids
+                )
+            )
+
+        profiles = {
+            user_id: (name, allow_certificate)
+            for user_id, name, allow_certificate in UserProfile.objects.filter(
+                user_id__in=student_grades
+            ).values_list('user_id', 'name', 'allow_certificate')
+        }
+        whitelisted_user_ids = set(self.whitelist.filter(
+            user_id__in=student_grades, course_id=course_id, whitelist=True
+        ).values_list('user_id', flat=True))
+        enrollment_modes = dict(CourseEnrollment.objects.filter(
+            user_id__in=student_grades, course_id=course_id
+        ).values_list('user_id', 'mode'))
+        verified_user_ids = SoftwareSecurePhotoVerification.verified_user_ids(
+            [student for student in students if student.id in student_grades]
+        )
+
+        return {
+            user_id: {
+                'cert': certs[user_id],
+                'grade': gradeset,
+                'profile_name': profiles[user_id][0],
+                'is_restricted': not profiles[user_id][1],
+                'is_whitelisted': user_id in whitelisted_user_ids,
+                'enrollment_mode': enrollment_modes.get(user_id),
+                'user_is_verified': user_id in verified_user_ids,
+            }
+            for user_id, gradeset in student_grades.iteritems()
+        }
+
+    def _generate_cert(self, cert, course, student, grade_contents, template_pdf, generate_pdf, submitter=None):
         """
         Generate a certificate for the student. If `generate_pdf` is True,
-        sends a request to XQueue.
+        sends a request to XQueue, through `submitter` if given.
         """
         course_id = unicode(course.id)
 
@@ -434,21 +666,16 @@ class XQueueCertInterface(object):
 
         cert.save()
 
-        if generate_pdf:
+        if generate_pdf and submitter is not None:
+            submitter.submit(
+                lambda xqueue_interface: self._send_to_xqueue(contents, key, xqueue_interface=xqueue_interface),
+                cert
+            )
+        elif generate_pdf:
             try:
                 self._send_to_xqueue(contents, key)
             except XQueueAddToQueueError as exc:
-                cert.status = ExampleCertificate.STATUS_ERROR
-                cert.error_reason = unicode(exc)
-                cert.save()
-                LOGGER.critical(
-                    (
-                        u"Could not add certificate task to XQueue.  "
-                        u"The course was '%s' and the student was '%s'."
-                        u"The certificate task status has been marked as 'error' "
-                        u"and can be re-submitted with a management command."
-                    ), course_id, student.id
-                )
+                self._handle_xqueue_error(cert, exc)
             else:
                 LOGGER.info(
                     (
@@ -461,6 +688,22 @@ class XQueueCertInterface(object):
                 )
         return cert
 
+    def _handle_xqueue_error(self, cert, exc):
+        """
+        Marks `cert` as errored after its task could not be added to the XQueue.
+        """
+        cert.status = ExampleCertificate.STATUS_ERROR
+        cert.error_reason = unicode(exc)
+        cert.save()
+        LOGGER.critical(
+            (
+                u"Could not add certificate task to XQueue.  "
+                u"The course was '%s' and the student was '%s'."
+                u"The certificate task status has been marked as 'error' "
+                u"and can be re-submitted with a management command."
+            ), unicode(cert.course_id), cert.user_id
+        )
+
     def add_example_cert(self, example_cert):
         """Add a task to create an example certificate.
 
@@ -523,7 +766,8 @@ class XQueueCertInterface(object):
                 ), example_cert.uuid, unicode(exc)
             )
 
-    def _send_to_xqueue(self, contents, key, task_identifier=None, callback_url_path='/update_certificate'):
+    def _send_to_xqueue(self, contents, key, task_identifier=None, callback_url_path='/update_certificate',
+                        xqueue_interface=None):
         """Create a new task on the XQueue.
 
         Arguments:
@@ -537,6 +781,8 @@ class XQueueCertInterface(object):
             callback_url_path (str): The path of the callback URL.
                 If not provided, use the default end-point for student-generated
                 certificates.
+            xqueue_interface (XQueueInterface): The connection to send the task
+                over, if not this interface's own.
 
         """
         callback_url = u'{protocol}://{base_url}{path}'.format(
@@ -566,7 +812,7 @@ class XQueueCertInterface(object):
 
         xheader = make_xheader(callback_url, key, settings.CERT_QUEUE)
 
-        (error, msg) = self.xqueue_interface.send_to_queue(
+        (error, msg) = (xqueue_interface or self.xqueue_interface).send_to_queue(
             header=xheader, body=json.dumps(contents))
         if error:
             exc = XQueueAddToQueueError(error, msg)
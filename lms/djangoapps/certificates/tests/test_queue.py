@@ -132,6 +132,79 @@ class XQueueCertInterfaceAddCertificateTest(ModuleStoreTestCase):
         self.assertIsNotNone(certificate)
         self.assertEqual(certificate.mode, 'audit')
 
+    @ddt.data(0, 2)
+    def test_add_certs(self, submission_workers):
+        """Test certificates are generated for a batch of students, with or without submission workers."""
+        CourseEnrollmentFactory(user=self.user_2, course_id=self.course.id, is_active=True, mode='verified')
+        GeneratedCertificateFactory.create(
+            user=self.user_2,
+            course_id=self.course.id,
+            status=CertificateStatuses.unavailable,
+            mode='honor'
+        )
+        student_without_grade = UserFactory.create()
+
+        def iterate_grades_for(course, students, batch_size=None):  # pylint: disable=unused-argument
+            """Grades all the students but the last one."""
+            for student in students[:-1]:
+                yield student, {'grade': 'Pass', 'percent': 0.75}, ""
+            yield students[-1], {}, "Grading failed"
+
+        with patch('courseware.grades.iterate_grades_for', Mock(side_effect=iterate_grades_for)):
+            with patch.object(XQueueInterface, 'send_to_queue') as mock_send:
+                mock_send.return_value = (0, None)
+                results = list(self.xqueue.add_certs(
+                    [self.user, self.user_2, student_without_grade],
+                    self.course.id,
+                    batch_size=3,
+                    submission_workers=submission_workers
+                ))
+
+        self.assertEqual([student for student, __ in results], [self.user, self.user_2, student_without_grade])
+        self.assertIsNone(results[2][1])
+        self.assertEqual(mock_send.call_count, 2)
+        self.assertEqual(
+            GeneratedCertificate.eligible_certificates.get(user=self.user, course_id=self.course.id).mode,
+            'honor'
+        )
+        certificate = GeneratedCertificate.eligible_certificates.get(user=self.user_2, course_id=self.course.id)
+        self.assertEqual(certificate.status, CertificateStatuses.generating)
+        self.assertEqual(certificate.mode, 'verified')
+        self.assertFalse(
+            GeneratedCertificate.objects.filter(user=student_without_grade, course_id=self.course.id).exists()
+        )
+
+    def test_add_certs_xqueue_error(self):
+        """Test certificates whose task could not be sent by a submission worker are marked as errored."""
+        with patch('courseware.grades.iterate_grades_for', Mock(return_value=[
+                (self.user, {'grade': 'Pass', 'percent': 0.75}, "")
+        ])):
+            with patch.object(XQueueInterface, 'send_to_queue') as mock_send:
+                mock_send.return_value = (1, 'error')
+                list(self.xqueue.add_certs([self.user], self.course.id, submission_workers=1))
+
+        certificate = GeneratedCertificate.eligible_certificates.get(user=self.user, course_id=self.course.id)
+        self.assertEqual(certificate.status, CertificateStatuses.error)
+        self.assertIn('error', certificate.error_reason)
+
+    def test_add_certs_unexpected_error(self):
+        """Test a submission worker marks certificates as errored and keeps sending tasks on unexpected errors."""
+        CourseEnrollmentFactory(user=self.user_2, course_id=self.course.id, is_active=True, mode='honor')
+        with patch('courseware.grades.iterate_grades_for', Mock(return_value=[
+                (self.user, {'grade': 'Pass', 'percent': 0.75}, ""),
+                (self.user_2, {'grade': 'Pass', 'percent': 0.75}, ""),
+        ])):
+            with patch.object(XQueueInterface, 'send_to_queue') as mock_send:
+                mock_send.side_effect = [ValueError('Connection reset'), (0, None)]
+                list(self.xqueue.add_certs([self.user, self.user_2], self.course.id, submission_workers=1))
+
+        self.assertEqual(mock_send.call_count, 2)
+        certificate = GeneratedCertificate.eligible_certificates.get(user=self.user, course_id=self.course.id)
+        self.assertEqual(certificate.status, CertificateStatuses.error)
+        self.assertIn('Connection reset', certificate.error_reason)
+        certificate = GeneratedCertificate.eligible_certificates.get(user=self.user_2, course_id=self.course.id)
+        self.assertEqual(certificate.status, CertificateStatuses.generating)
+
     def add_cert_to_queue(self, mode):
         """
         Dry method for course enrollment and adding request to
@@ -5,7 +5,8 @@ from util.json_request import JsonResponse
 import json
 
 from courseware import models
-from django.db.models import Count
+from django.conf import settings
+from django.db.models import Count, Sum
 from django.utils.translation import ugettext as _
 
 from xmodule.modulestore.django import modulestore
@@ -18,6 +19,36 @@ from opaque_keys.edx.locations import Location
 MAX_SCREEN_LIST_LENGTH = 250
 
 
+def _get_problem_grade_counts(course_id, **filters):
+    """
+    Returns the number of students having each grade on the problems of the course
+
+    `course_id` the course ID for the course interested in
+
+    `filters` further filters on the problems, e.g. `module_state_key__in`
+
+    Output is a queryset of dicts with 'module_state_key', 'grade', 'max_grade' and 'count_grade' keys.
+    Ungraded students are not counted.
+    """
+    if settings.FEATURES.get('ENABLE_GRADE_DISTRIBUTION_TABLE'):
+        # Read the counts maintained as grades change, rather than aggregating every studentmodule row
+        return models.ProblemGradeCount.objects.filter(
+            course_id__exact=course_id,
+            grade__isnull=False,
+            **filters
+        ).values('module_state_key', 'grade', 'max_grade').annotate(
+            count_grade=Sum('student_count')
+        ).filter(count_grade__gt=0)
+
+    # Aggregate query on studentmodule table for grade data for problems in course
+    return models.StudentModule.objects.filter(
+        course_id__exact=course_id,
+        grade__isnull=False,
+        module_type__exact="problem",
+        **filters
+    ).values('module_state_key', 'grade', 'max_grade').annotate(count_grade=Count('grade'))
+
+
 def get_problem_grade_distribution(course_id):
     """
     Returns the grade distribution per problem for the course
@@ -32,12 +63,8 @@ def get_problem_grade_distribution(course_id):
         attempting the problem
     """
 
-    # Aggregate query on studentmodule table for grade data for all problems in course
-    db_query = models.StudentModule.objects.filter(
-        course_id__exact=course_id,
-        grade__isnull=False,
-        module_type__exact="problem",
-    ).values('module_state_key', 'grade', 'max_grade').annotate(count_grade=Count('grade'))
+    # Grade data for all problems in course
+    db_query = _get_problem_grade_counts(course_id)
 
     prob_grade_distrib = {}
     total_student_count = {}
@@ -105,17 +132,11 @@ def get_problem_set_grade_distrib(course_id, problem_set):
       'grade_distrib' - array of tuples (`grade`,`count`) ordered by `grade`
     """
 
-    # Aggregate query on studentmodule table for grade data for set of problems in course
-    db_query = models.StudentModule.objects.filter(
-        course_id__exact=course_id,
-        grade__isnull=False,
-        module_type__exact="problem",
+    # Grade data for set of problems in course
+    db_query = _get_problem_grade_counts(
+        course_id,
         module_state_key__in=problem_set,
-    ).values(
-        'module_state_key',
-        'grade',
-        'max_grade',
-    ).annotate(count_grade=Count('grade')).order_by('module_state_key', 'grade')
+    ).order_by('module_state_key', 'grade')
 
     prob_grade_distrib = {}
 
@@ -4,12 +4,14 @@ Tests for class dashboard (Metrics tab in instructor dashboard)
 
 import json
 
+from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.test.client import RequestFactory
 from mock import patch
 from nose.plugins.attrib import attr
 
 from capa.tests.response_xml_factory import StringResponseXMLFactory
+from courseware.models import ProblemGradeCount, StudentModule
 from courseware.tests.factories import StudentModuleFactory
 from student.tests.factories import UserFactory, CourseEnrollmentFactory, AdminFactory
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
@@ -118,6 +120,39 @@ class TestGetProblemGradeDistribution(SharedModuleStoreTestCase):
             num_students = sequential_open_distrib[problem]
             self.assertEquals(USER_COUNT, num_students)
 
+    @patch.dict(settings.FEATURES, {'ENABLE_GRADE_DISTRIBUTION_TABLE': True})
+    def test_grade_distribution_table(self):
+
+        ProblemGradeCount.rebuild(self.course.id)
+
+        # Change, remove and add grades, which should update the counts
+        student_module = StudentModule.objects.get(student=self.users[0], module_state_key=self.item.location)
+        student_module.grade = 0.5
+        student_module.save()
+        StudentModule.objects.get(student=self.users[1], module_state_key=self.item.location).delete()
+        StudentModuleFactory.create(
+            grade=0.5,
+            max_grade=1,
+            course_id=self.course.id,
+            module_state_key=self.item.location,
+        )
+
+        def sorted_distribution():
+            """Returns the grade distribution of the course, with grades in order"""
+            prob_grade_distrib, total_student_count = get_problem_grade_distribution(self.course.id)
+            for problem in prob_grade_distrib.values():
+                problem['grade_distrib'].sort()
+            return prob_grade_distrib, total_student_count
+
+        from_table = sorted_distribution()
+        with patch.dict(settings.FEATURES, {'ENABLE_GRADE_DISTRIBUTION_TABLE': False}):
+            from_student_modules = sorted_distribution()
+        self.assertEqual(from_table, from_student_modules)
+        self.assertIn(
+            [(0.0, 8), (0.5, 1), (0.5, 1), (1.0, 1)],
+            [problem['grade_distrib'] for problem in from_table[0].values()]
+        )
+
     def test_get_problemset_grade_distrib(self):
 
         prob_grade_distrib, __ = get_problem_grade_distribution(self.course.id)
@@ -1,13 +1,20 @@
 """
 API function for retrieving course blocks data
 """
+from hashlib import md5
 
-from lms.djangoapps.course_blocks.api import get_course_blocks, COURSE_BLOCK_ACCESS_TRANSFORMERS
+from django.conf import settings
+
+from lms.djangoapps.course_blocks.api import (
+    get_course_blocks,
+    get_course_blocks_fingerprint,
+    COURSE_BLOCK_ACCESS_TRANSFORMERS,
+)
 from openedx.core.lib.block_structure.transformers import BlockStructureTransformers
 
 from .transformers.blocks_api import BlocksAPITransformer
 from .transformers.proctored_exam import ProctoredExamTransformer
-from .serializers import BlockSerializer, BlockDictSerializer
+from .serializers import BulkBlocksSerializer
 
 
 def get_blocks(
@@ -48,20 +55,8 @@ def get_blocks(
         block_types_filter (list): Optional list of block type names used to filter
             the final result of returned blocks.
     """
-    # create ordered list of transformers, adding BlocksAPITransformer at end.
-    transformers = BlockStructureTransformers()
-    if user is not None:
-        transformers += COURSE_BLOCK_ACCESS_TRANSFORMERS + [ProctoredExamTransformer()]
-    transformers += [
-        BlocksAPITransformer(
-            block_counts,
-            student_view_data,
-            depth,
-            nav_depth
-        )
-    ]
-
     # transform
+    transformers = _get_transformers(user, depth, nav_depth, block_counts, student_view_data)
     blocks = get_course_blocks(user, usage_key, transformers)
 
     # filter blocks by types
@@ -81,10 +76,66 @@ def get_blocks(
         'requested_fields': requested_fields or [],
     }
 
-    if return_type == 'dict':
-        serializer = BlockDictSerializer(blocks, context=serializer_context, many=False)
-    else:
-        serializer = BlockSerializer(blocks, context=serializer_context, many=True)
+    serializer = BulkBlocksSerializer(blocks, context=serializer_context, many=(return_type != 'dict'))
 
     # return serialized data
     return serializer.data
+
+
+def get_blocks_etag(
+        request,
+        usage_key,
+        user=None,
+        depth=None,
+        nav_depth=None,
+        requested_fields=None,
+        block_counts=None,
+        student_view_data=None,
+        return_type='dict',
+        block_types_filter=None,
+):
+    """
+    Return an entity tag for the data get_blocks returns for the same
+    arguments, without transforming the course blocks, or None if the
+    data can't be identified.
+
+    The tag changes whenever the course's collected block data changes, and
+    is the same for all users whose course blocks are transformed in the
+    same way.
+
+    Arguments:
+        See the description in get_blocks.
+    """
+    transformers = _get_transformers(user, depth, nav_depth, block_counts, student_view_data)
+    fingerprint = get_course_blocks_fingerprint(user, usage_key, transformers)
+    if fingerprint is None:
+        return None
+
+    # The other data the serialized blocks depend on.
+    return md5(repr((
+        fingerprint,
+        request.build_absolute_uri('/'),
+        sorted(requested_fields or []),
+        return_type,
+        sorted(block_types_filter or []),
+        bool(settings.FEATURES.get('ENABLE_LTI_PROVIDER')),
+    ))).hexdigest()
+
+
+def _get_transformers(user, depth, nav_depth, block_counts, student_view_data):
+    """
+    Return the transformers get_blocks applies for the given arguments.
+    """
+    # create ordered list of transformers, adding BlocksAPITransformer at end.
+    transformers = BlockStructureTransformers()
+    if user is not None:
+        transformers += COURSE_BLOCK_ACCESS_TRANSFORMERS + [ProctoredExamTransformer()]
+    transformers += [
+        BlocksAPITransformer(
+            block_counts,
+            student_view_data,
+            depth,
+            nav_depth
+        )
+    ]
+    return transformers
@@ -2,12 +2,17 @@
 Serializers for Course Blocks related return objects.
 """
 from django.conf import settings
+from django.utils.http import RFC3986_SUBDELIMS, urlquote
 from rest_framework import serializers
 from rest_framework.reverse import reverse
 
 from .transformers import SUPPORTED_FIELDS
 
 
+# The characters that django's reverse leaves unquoted in URL paths.
+URL_PATH_SAFE_CHARACTERS = RFC3986_SUBDELIMS + str('/~:@')
+
+
 class BlockSerializer(serializers.Serializer):  # pylint: disable=abstract-method
     """
     Serializer for single course block
@@ -93,3 +98,133 @@ class BlockDictSerializer(serializers.Serializer):  # pylint: disable=abstract-m
             unicode(block_key): BlockSerializer(block_key, context=self.context).data
             for block_key in structure
         }
+
+
+class BulkBlocksSerializer(object):
+    """
+    Serializer that formats a BlockStructure object as BlockDictSerializer
+    does, or as a list of blocks as BlockSerializer does with many=True.
+
+    Rather than running a serializer per block, the blocks are serialized in
+    a single pass over the structure's block data, with the lookup of each
+    requested field and the reversing of each URL prepared beforehand.
+    """
+    def __init__(self, block_structure, context, many=False):
+        self.block_structure = block_structure
+        self.context = context
+        self.many = many
+
+    @property
+    def data(self):
+        """
+        The serialized blocks.
+        """
+        if self.many:
+            return list(self._serialize_blocks())
+        return {
+            'root': unicode(self.block_structure.root_block_usage_key),
+            'blocks': {block['id']: block for block in self._serialize_blocks()},
+        }
+
+    def _serialize_blocks(self):
+        """
+        Yields the serialized representation of each block.
+        """
+        block_structure = self.block_structure
+        requested_fields = self.context['requested_fields']
+        request = self.context['request']
+        root_block_usage_key = block_structure.root_block_usage_key
+        course_id = unicode(root_block_usage_key.course_key)
+
+        url_builders = [
+            ('lms_web_url', _block_url_builder(
+                'jump_to', {'course_id': course_id}, 'location', root_block_usage_key, request,
+            )),
+            ('student_view_url', _block_url_builder(
+                'courseware.views.views.render_xblock', {}, 'usage_key_string', root_block_usage_key, request,
+            )),
+        ]
+        if settings.FEATURES.get("ENABLE_LTI_PROVIDER") and 'lti_url' in requested_fields:
+            url_builders.append(('lti_url', _block_url_builder(
+                'lti_provider_launch', {'course_id': course_id}, 'usage_id', root_block_usage_key, request,
+            )))
+
+        field_readers = [
+            (supported_field.serializer_field_name, _block_field_reader(supported_field), supported_field.default_value)
+            for supported_field in SUPPORTED_FIELDS
+            if supported_field.requested_field_name in requested_fields
+        ]
+        include_children = 'children' in requested_fields
+
+        for block_key in block_structure:
+            block_data = block_structure[block_key]
+            block_id = unicode(block_key)
+            data = {'id': block_id}
+            for field_name, build_url in url_builders:
+                data[field_name] = build_url(block_id)
+
+            for field_name, read_field, default in field_readers:
+                value = read_field(block_data) if block_data is not None else None
+                if value is None:
+                    value = default
+                if value is not None:
+                    # only return fields that have data
+                    data[field_name] = value
+
+            if include_children:
+                children = block_structure.get_children(block_key)
+                if children:
+                    data['children'] = [unicode(child) for child in children]
+
+            yield data
+
+
+def _block_field_reader(supported_field):
+    """
+    Returns a function reading the given supported field from the BlockData
+    of a block, as BlockSerializer._get_field does, but without a default.
+    """
+    field_name = supported_field.block_field_name
+    if supported_field.transformer is None:
+        return lambda block_data: block_data.fields.get(field_name)
+
+    transformer_name = supported_field.transformer.name()
+
+    def read_transformer_field(block_data):
+        """
+        Reads the transformer block field, or the entire transformer block
+        data dict if no field name is given.
+        """
+        transformer_data = block_data.transformer_data.get(transformer_name)
+        if transformer_data is None:
+            return None
+        return transformer_data.fields if field_name is None else transformer_data.fields.get(field_name)
+
+    return read_transformer_field
+
+
+def _block_url_builder(view_name, kwargs, block_kwarg, sample_block_key, request):
+    """
+    Returns a function that returns the URL of the given view for a block,
+    given the block's usage key string as the `block_kwarg` argument.
+
+    The URL is reversed once, for the sample block, and the URLs of the other
+    blocks are built by replacing the sample block's usage key in it.
+    """
+    def reverse_block_url(block_id):
+        """
+        Reverses the URL for the given block.
+        """
+        block_kwargs = dict(kwargs)
+        block_kwargs[block_kwarg] = block_id
+        return reverse(view_name, kwargs=block_kwargs, request=request)
+
+    sample_block_id = unicode(sample_block_key)
+    sample_url = reverse_block_url(sample_block_id)
+    if not isinstance(sample_url, basestring):
+        return reverse_block_url
+
+    prefix, separator, suffix = sample_url.rpartition(urlquote(sample_block_id, safe=URL_PATH_SAFE_CHARACTERS))
+    if not separator:
+        return reverse_block_url
+    return lambda block_id: prefix + urlquote(block_id, safe=URL_PATH_SAFE_CHARACTERS) + suffix
@@ -1,6 +1,7 @@
 """
 Tests for Course Blocks serializers
 """
+from django.test.client import RequestFactory
 from mock import MagicMock
 
 from openedx.core.lib.block_structure.transformers import BlockStructureTransformers
@@ -12,7 +13,7 @@ from lms.djangoapps.course_blocks.api import get_course_blocks, COURSE_BLOCK_ACC
 
 from student.roles import CourseStaffRole
 from ..transformers.blocks_api import BlocksAPITransformer
-from ..serializers import BlockSerializer, BlockDictSerializer
+from ..serializers import BlockSerializer, BlockDictSerializer, BulkBlocksSerializer
 from .helpers import deserialize_usage_key
 
 
@@ -231,3 +232,37 @@ class TestBlockDictSerializer(TestBlockSerializerBase):
             self.assert_extended_block(serialized_block)
             self.assert_staff_fields(serialized_block)
         self.assertEquals(len(serializer.data['blocks']), 29)
+
+
+class TestBulkBlocksSerializer(TestBlockSerializerBase):
+    """
+    Tests the BulkBlocksSerializer class, which serializes blocks as BlockSerializer and BlockDictSerializer do.
+    """
+    def setUp(self):
+        super(TestBulkBlocksSerializer, self).setUp()
+        self.serializer_context['request'] = RequestFactory().get('/')
+
+    def test_basic(self):
+        self.assertEquals(
+            BulkBlocksSerializer(self.block_structure, context=self.serializer_context).data,
+            BlockDictSerializer(self.block_structure, many=False, context=self.serializer_context).data,
+        )
+
+    def test_additional_requested_fields(self):
+        self.add_additional_requested_fields()
+        self.assertEquals(
+            BulkBlocksSerializer(self.block_structure, context=self.serializer_context, many=True).data,
+            BlockSerializer(self.block_structure, many=True, context=self.serializer_context).data,
+        )
+
+    def test_staff_fields(self):
+        """
+        Test fields accessed by a staff user
+        """
+        context = self.create_staff_context()
+        context['request'] = RequestFactory().get('/')
+        self.add_additional_requested_fields(context)
+        self.assertEquals(
+            BulkBlocksSerializer(context['block_structure'], context=context).data,
+            BlockDictSerializer(context['block_structure'], many=False, context=context).data,
+        )
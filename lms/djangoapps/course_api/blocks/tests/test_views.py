@@ -2,7 +2,9 @@
 Tests for Blocks Views
 """
 
+from django.conf import settings
 from django.core.urlresolvers import reverse
+from mock import patch
 from string import join
 from urllib import urlencode
 from urlparse import urlunparse
@@ -239,6 +241,60 @@ class TestBlocksView(SharedModuleStoreTestCase):
         self.verify_response_with_requested_fields(response)
 
 
+@patch.dict(settings.FEATURES, {'ENABLE_COURSE_BLOCKS_API_ETAG': True})
+class TestBlocksViewETag(SharedModuleStoreTestCase):
+    """
+    Test class for the ETag of BlocksView responses
+    """
+    ENABLED_CACHES = ['default']
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestBlocksViewETag, cls).setUpClass()
+        cls.course_key = ToyCourseFactory.create().id
+
+    def setUp(self):
+        super(TestBlocksViewETag, self).setUp()
+        self.user = UserFactory.create()
+        self.client.login(username=self.user.username, password='test')
+        CourseEnrollmentFactory.create(user=self.user, course_id=self.course_key)
+        self.url = reverse(
+            'blocks_in_block_tree',
+            kwargs={'usage_key_string': unicode(self.store.make_course_usage_key(self.course_key))}
+        )
+        self.query_params = {'depth': 'all', 'username': self.user.username}
+
+        # cache the course's block structure
+        self.client.get(self.url, self.query_params)
+
+    def test_not_modified(self):
+        response = self.client.get(self.url, self.query_params)
+        self.assertEquals(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.client.get(self.url, self.query_params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(response.status_code, 304)
+        self.assertEquals(response['ETag'], etag)
+
+    def test_etag_depends_on_params(self):
+        etag = self.client.get(self.url, self.query_params)['ETag']
+
+        self.query_params['requested_fields'] = 'graded'
+        response = self.client.get(self.url, self.query_params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(response.status_code, 200)
+        self.assertNotEquals(response['ETag'], etag)
+
+    def test_etag_shared_by_equivalent_users(self):
+        etag = self.client.get(self.url, self.query_params)['ETag']
+
+        other_user = UserFactory.create()
+        self.client.login(username=other_user.username, password='test')
+        CourseEnrollmentFactory.create(user=other_user, course_id=self.course_key)
+        self.query_params['username'] = other_user.username
+        response = self.client.get(self.url, self.query_params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(response.status_code, 304)
+
+
 class TestBlocksInCourseView(TestBlocksView):  # pylint: disable=test-inherits-tests
     """
     Test class for BlocksInCourseView
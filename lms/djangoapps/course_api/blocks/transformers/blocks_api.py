@@ -53,6 +53,15 @@ class BlocksAPITransformer(BlockStructureTransformer):
 
         # TODO support olx_data by calling export_to_xml(?)
 
+    def transform_equivalence_key(self, usage_info, block_structure):
+        # The contained transformers only depend on the requested data.
+        return (
+            tuple(sorted(self.block_types_to_count or [])),
+            tuple(sorted(self.requested_student_view_data or [])),
+            self.depth,
+            self.nav_depth,
+        )
+
     def transform(self, usage_info, block_structure):
         """
         Mutates block_structure based on the given usage_info.
@@ -33,6 +33,26 @@ class ProctoredExamTransformer(FilteringTransformerMixin, BlockStructureTransfor
         block_structure.request_xblock_fields('is_proctored_enabled')
         block_structure.request_xblock_fields('is_practice_exam')
 
+    def transform_equivalence_key(self, usage_info, block_structure):
+        if not settings.FEATURES.get('ENABLE_PROCTORED_EXAMS', False):
+            return ()
+
+        # Exams are excluded based on each user's attempts.
+        for block_key in block_structure:
+            if self._is_exam(block_structure, block_key):
+                return None
+        return ()
+
+    @staticmethod
+    def _is_exam(block_structure, block_key):
+        """
+        Returns whether the given block is a proctored or practice exam.
+        """
+        return block_key.block_type == 'sequential' and bool(
+            block_structure.get_xblock_field(block_key, 'is_proctored_enabled') or
+            block_structure.get_xblock_field(block_key, 'is_practice_exam')
+        )
+
     def transform_block_filters(self, usage_info, block_structure):
         if not settings.FEATURES.get('ENABLE_PROCTORED_EXAMS', False):
             return [block_structure.create_universal_filter()]
@@ -42,12 +62,7 @@ class ProctoredExamTransformer(FilteringTransformerMixin, BlockStructureTransfor
             Test whether the block is a proctored exam for the user in
             question.
             """
-            if (
-                    block_key.block_type == 'sequential' and (
-                        block_structure.get_xblock_field(block_key, 'is_proctored_enabled') or
-                        block_structure.get_xblock_field(block_key, 'is_practice_exam')
-                    )
-            ):
+            if self._is_exam(block_structure, block_key):
                 # This section is an exam.  It should be excluded unless the
                 # user is not a verified student or has declined taking the exam.
                 user_exam_summary = get_attempt_status_summary(
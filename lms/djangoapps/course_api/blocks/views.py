@@ -1,8 +1,11 @@
 """
 CourseBlocks API views
 """
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.http import Http404
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
 from rest_framework.generics import ListAPIView
 from rest_framework.response import Response
 
@@ -12,7 +15,7 @@ from openedx.core.lib.api.view_utils import view_auth_classes, DeveloperErrorVie
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import ItemNotFoundError
 
-from .api import get_blocks
+from .api import get_blocks, get_blocks_etag
 from .forms import BlockListGetForm
 
 
@@ -170,6 +173,11 @@ class BlocksView(DeveloperErrorViewMixin, ListAPIView):
           * lti_url: The block URL for an LTI consumer. Returned only if the
             "ENABLE_LTI_PROVIDER" Django settign is set to "True".
 
+        If the "ENABLE_COURSE_BLOCKS_API_ETAG" feature is enabled, the
+        response has an ETag header when the course's blocks are cached, and
+        a request whose If-None-Match header contains that ETag returns a
+        304: Not Modified response with no content.
+
     """
 
     def list(self, request, usage_key_string):  # pylint: disable=arguments-differ
@@ -189,21 +197,32 @@ class BlocksView(DeveloperErrorViewMixin, ListAPIView):
         if not params.is_valid():
             raise ValidationError(params.errors)
 
+        blocks_kwargs = dict(
+            usage_key=params.cleaned_data['usage_key'],
+            user=params.cleaned_data['user'],
+            depth=params.cleaned_data['depth'],
+            nav_depth=params.cleaned_data.get('nav_depth'),
+            requested_fields=params.cleaned_data['requested_fields'],
+            block_counts=params.cleaned_data.get('block_counts', []),
+            student_view_data=params.cleaned_data.get('student_view_data', []),
+            return_type=params.cleaned_data['return_type'],
+            block_types_filter=params.cleaned_data.get('block_types_filter', None),
+        )
+
         try:
-            return Response(
-                get_blocks(
-                    request,
-                    params.cleaned_data['usage_key'],
-                    params.cleaned_data['user'],
-                    params.cleaned_data['depth'],
-                    params.cleaned_data.get('nav_depth'),
-                    params.cleaned_data['requested_fields'],
-                    params.cleaned_data.get('block_counts', []),
-                    params.cleaned_data.get('student_view_data', []),
-                    params.cleaned_data['return_type'],
-                    params.cleaned_data.get('block_types_filter', None),
-                )
-            )
+            etag = None
+            if settings.FEATURES.get('ENABLE_COURSE_BLOCKS_API_ETAG', False):
+                etag = get_blocks_etag(request, **blocks_kwargs)
+                if etag is not None and etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+                    # The client's copy of the blocks is still current.
+                    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+                    response['ETag'] = quote_etag(etag)
+                    return response
+
+            response = Response(get_blocks(request, **blocks_kwargs))
+            if etag is not None:
+                response['ETag'] = quote_etag(etag)
+            return response
         except ItemNotFoundError as exception:
             raise Http404("Block not found: {}".format(exception.message))
 
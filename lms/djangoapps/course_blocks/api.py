@@ -2,6 +2,7 @@
 API entry point to the course_blocks app with top-level
 get_course_blocks function.
 """
+from django.conf import settings
 from django.core.cache import cache
 from openedx.core.djangoapps.content.block_structure.api import get_block_structure_manager
 from openedx.core.lib.block_structure.manager import BlockStructureManager
@@ -64,4 +65,32 @@ def get_course_blocks(
     return get_block_structure_manager(starting_block_usage_key.course_key).get_transformed(
         transformers,
         starting_block_usage_key,
+        share_transformed=settings.FEATURES.get('ENABLE_COURSE_BLOCKS_TRANSFORM_CACHE', False),
+    )
+
+
+def get_course_blocks_fingerprint(
+        user,
+        starting_block_usage_key,
+        transformers=None,
+):
+    """
+    Returns a string identifying the block structure get_course_blocks
+    returns for the same arguments, without transforming it, or None if it
+    can't be identified.
+
+    The fingerprint changes whenever the course's collected block data
+    changes, and is the same for all users whose blocks are transformed in
+    the same way.  See BlockStructureManager.get_transformed_fingerprint.
+
+    Arguments:
+        See the description in get_course_blocks.
+    """
+    if not transformers:
+        transformers = BlockStructureTransformers(COURSE_BLOCK_ACCESS_TRANSFORMERS)
+    transformers.usage_info = CourseUsageInfo(starting_block_usage_key.course_key, user)
+
+    return get_block_structure_manager(starting_block_usage_key.course_key).get_transformed_fingerprint(
+        transformers,
+        starting_block_usage_key,
     )
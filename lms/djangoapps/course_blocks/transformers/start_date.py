@@ -1,8 +1,16 @@
 """
 Start Date Transformer implementation.
 """
+from bisect import bisect_left
+from datetime import datetime
+
+from django.conf import settings
+from django.utils.timezone import UTC
+
 from openedx.core.lib.block_structure.transformer import BlockStructureTransformer, FilteringTransformerMixin
-from lms.djangoapps.courseware.access_utils import check_start_date
+from lms.djangoapps.courseware.access_utils import check_start_date, in_preview_mode
+from courseware.masquerade import is_masquerading_as_student
+from student.roles import CourseBetaTesterRole
 from xmodule.course_metadata_utils import DEFAULT_START_DATE
 
 from .utils import get_field_on_block
@@ -24,8 +32,9 @@ class StartDateTransformer(FilteringTransformerMixin, BlockStructureTransformer)
 
     Staff users are exempted from visibility rules.
     """
-    VERSION = 1
+    VERSION = 2
     MERGED_START_DATE = 'merged_start_date'
+    START_DATES = 'start_dates'
 
     @classmethod
     def name(cls):
@@ -53,6 +62,7 @@ class StartDateTransformer(FilteringTransformerMixin, BlockStructureTransformer)
         """
         block_structure.request_xblock_fields('days_early_for_beta')
 
+        start_dates = set()
         for block_key in block_structure.topological_traversal():
 
             # compute merged value of start date from all parents
@@ -82,6 +92,31 @@ class StartDateTransformer(FilteringTransformerMixin, BlockStructureTransformer)
                 cls.MERGED_START_DATE,
                 merged_start_value
             )
+            start_dates.add(merged_start_value)
+
+        # The sorted, distinct merged start dates of all blocks, at
+        # which the blocks accessible to non-staff users change.
+        block_structure.set_transformer_data(cls, cls.START_DATES, sorted(start_dates))
+
+    def transform_equivalence_key(self, usage_info, block_structure):
+        if usage_info.has_staff_access:
+            return 'staff'
+
+        # Access depends on more than the current time in these cases.
+        course_key = usage_info.course_key
+        if (
+                settings.FEATURES['DISABLE_START_DATES'] or
+                in_preview_mode() or
+                is_masquerading_as_student(usage_info.user, course_key) or
+                CourseBetaTesterRole(course_key).has_user(usage_info.user)
+        ):
+            return None
+
+        # Non-staff users see the same blocks until the next start date.
+        start_dates = block_structure.get_transformer_data(self, self.START_DATES)
+        if start_dates is None:
+            return None
+        return bisect_left(start_dates, datetime.now(UTC()))
 
     def transform_block_filters(self, usage_info, block_structure):
         # Users with staff access bypass the Start Date check.
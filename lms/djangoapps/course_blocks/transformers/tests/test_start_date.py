@@ -8,8 +8,11 @@ from mock import patch
 from nose.plugins.attrib import attr
 
 from courseware.tests.factories import BetaTesterFactory
+from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
+from student.tests.factories import UserFactory
 from ..start_date import StartDateTransformer, DEFAULT_START_DATE
-from .helpers import BlockParentsMapTestCase, update_block
+from ...usage_info import CourseUsageInfo
+from .helpers import BlockParentsMapTestCase, publish_course, update_block
 
 
 @attr('shard_3')
@@ -119,3 +122,29 @@ class StartDateTransformerTestCase(BlockParentsMapTestCase):
             blocks_with_differing_student_access,
             self.transformers,
         )
+
+    @patch.dict('django.conf.settings.FEATURES', {'DISABLE_START_DATES': False})
+    def test_transform_equivalence_key(self):
+        for idx, start in [(0, self.StartDateType.LAST_MONTH), (1, self.StartDateType.NEXT_MONTH)]:
+            block = self.get_block(idx)
+            block.start = start
+            update_block(block)
+        publish_course(self.course)
+        block_structure = get_course_in_cache(self.course.id)
+        transformer = StartDateTransformer()
+
+        def equivalence_key(user):
+            """
+            Returns the transformer's equivalence key for the given user.
+            """
+            return transformer.transform_equivalence_key(CourseUsageInfo(self.course.id, user), block_structure)
+
+        student_key = equivalence_key(self.student)
+        self.assertEquals(equivalence_key(UserFactory.create()), student_key)
+        self.assertEquals(equivalence_key(self.staff), 'staff')
+        self.assertIsNone(equivalence_key(self.beta_user))
+
+        # The key changes once the next start date has passed.
+        with patch('lms.djangoapps.course_blocks.transformers.start_date.datetime') as mock_datetime:
+            mock_datetime.now.return_value = self.StartDateType.NEXT_MONTH + timedelta(days=1)
+            self.assertEquals(equivalence_key(self.student), student_key + 1)
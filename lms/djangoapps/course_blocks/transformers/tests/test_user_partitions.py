@@ -10,6 +10,7 @@ from openedx.core.djangoapps.course_groups.partition_scheme import CohortPartiti
 from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory, config_course_cohorts
 from openedx.core.djangoapps.course_groups.cohorts import add_user_to_cohort
 from openedx.core.djangoapps.course_groups.views import link_cohort_to_partition_group
+from openedx.core.lib.block_structure.transformers import BlockStructureTransformers
 from student.tests.factories import CourseEnrollmentFactory
 from xmodule.partitions.partitions import Group, UserPartition
 from xmodule.modulestore.tests.factories import CourseFactory
@@ -213,6 +214,25 @@ class UserPartitionTransformerTestCase(UserPartitionTestMixin, CourseStructureTe
             self.get_block_key_set(self.blocks, *expected_blocks)
         )
 
+    @ddt.data(
+        (False, ('course', 'B', 'O')),
+        (True, ('course', 'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O')),
+    )
+    @ddt.unpack
+    def test_transform_exempt_staff(self, exempt_staff, expected_blocks):
+        self.user.is_staff = True
+        self.user.save()
+
+        trans_block_structure = get_course_blocks(
+            self.user,
+            self.course.location,
+            BlockStructureTransformers([UserPartitionTransformer(exempt_staff=exempt_staff)]),
+        )
+        self.assertSetEqual(
+            set(trans_block_structure.get_block_keys()),
+            self.get_block_key_set(self.blocks, *expected_blocks)
+        )
+
 
 @attr('shard_3')
 @ddt.ddt
@@ -14,9 +14,15 @@ class UserPartitionTransformer(FilteringTransformerMixin, BlockStructureTransfor
     removing all blocks in the block structure to which the user does
     not have group access.
 
-    Staff users are *not* exempted from user partition pathways.
+    Staff users are *not* exempted from user partition pathways, unless
+    the transformer is created with exempt_staff.  Users with staff access
+    then only have the group access of the children of split_test blocks
+    enforced, so that they still see the child of their group.
     """
-    VERSION = 1
+    VERSION = 2
+
+    def __init__(self, exempt_staff=False):
+        self.exempt_staff = exempt_staff
 
     @classmethod
     def name(cls):
@@ -44,6 +50,11 @@ class UserPartitionTransformer(FilteringTransformerMixin, BlockStructureTransfor
         root_block = block_structure.get_xblock(block_structure.root_block_usage_key)
         user_partitions = getattr(root_block, 'user_partitions', []) or []
         block_structure.set_transformer_data(cls, 'user_partitions', user_partitions)
+        block_structure.set_transformer_data(cls, 'split_test_partition_ids', set(
+            block_structure.get_xblock(block_key).user_partition_id
+            for block_key in block_structure.topological_traversal()
+            if block_key.block_type == 'split_test'
+        ))
 
         # If there are no user partitions, this transformation is a
         # no-op, so there is nothing to collect.
@@ -64,6 +75,18 @@ class UserPartitionTransformer(FilteringTransformerMixin, BlockStructureTransfor
             merged_group_access = _MergedGroupAccess(user_partitions, xblock, merged_parent_access_list)
             block_structure.set_transformer_block_field(block_key, cls, 'merged_group_access', merged_group_access)
 
+    def transform_equivalence_key(self, usage_info, block_structure):
+        # Blocks are removed based only on the user's group in each partition.
+        user_partitions = block_structure.get_transformer_data(self, 'user_partitions')
+        if not user_partitions:
+            return ()
+        user_partitions = self._enforced_user_partitions(usage_info, block_structure, user_partitions)
+        user_groups = _get_user_partition_groups(usage_info.course_key, user_partitions, usage_info.user)
+        return (
+            self._is_staff_exempted(usage_info),
+            tuple(sorted((partition_id, group.id) for partition_id, group in user_groups.iteritems())),
+        )
+
     def transform_block_filters(self, usage_info, block_structure):
         result_list = SplitTestTransformer().transform_block_filters(usage_info, block_structure)
 
@@ -71,18 +94,40 @@ class UserPartitionTransformer(FilteringTransformerMixin, BlockStructureTransfor
         if not user_partitions:
             return [block_structure.create_universal_filter()]
 
+        user_partitions = self._enforced_user_partitions(usage_info, block_structure, user_partitions)
+        if not user_partitions:
+            return result_list
+
         user_groups = _get_user_partition_groups(
             usage_info.course_key, user_partitions, usage_info.user
         )
+        partition_ids = set(partition.id for partition in user_partitions)
         group_access_filter = block_structure.create_removal_filter(
             lambda block_key: not block_structure.get_transformer_block_field(
                 block_key, self, 'merged_group_access'
-            ).check_group_access(user_groups)
+            ).check_group_access(user_groups, partition_ids)
         )
 
         result_list.append(group_access_filter)
         return result_list
 
+    def _is_staff_exempted(self, usage_info):
+        """
+        Returns whether the user is exempted from the group access of the
+        partitions not used by split_test blocks.
+        """
+        return bool(self.exempt_staff and usage_info.has_staff_access)
+
+    def _enforced_user_partitions(self, usage_info, block_structure, user_partitions):
+        """
+        Returns the user partitions whose group access is enforced for the
+        user.
+        """
+        if not self._is_staff_exempted(usage_info):
+            return user_partitions
+        split_test_partition_ids = block_structure.get_transformer_data(self, 'split_test_partition_ids')
+        return [partition for partition in user_partitions if partition.id in split_test_partition_ids]
+
 
 class _MergedGroupAccess(object):
     """
@@ -202,17 +247,21 @@ class _MergedGroupAccess(object):
         else:
             return None
 
-    def check_group_access(self, user_groups):
+    def check_group_access(self, user_groups, partition_ids=None):
         """
         Arguments:
             dict[int: Group]: Given a user, a mapping from user
                 partition IDs to the group to which the user belongs in
                 each partition.
+            set[int]: The IDs of the partitions to check, or None to
+                check all of them.
 
         Returns:
             bool: Whether said user has group access.
         """
         for partition_id, allowed_group_ids in self._access.iteritems():
+            if partition_ids is not None and partition_id not in partition_ids:
+                continue
 
             # If the user is not assigned to a group for this partition,
             # deny access.
@@ -67,6 +67,10 @@ class VisibilityTransformer(FilteringTransformerMixin, BlockStructureTransformer
                 )
             )
 
+    def transform_equivalence_key(self, usage_info, block_structure):
+        # Only staff access determines which blocks are visible.
+        return bool(usage_info.has_staff_access)
+
     def transform_block_filters(self, usage_info, block_structure):
         # Users with staff access bypass the Visibility check.
         if usage_info.has_staff_access:
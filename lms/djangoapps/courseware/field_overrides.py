@@ -28,6 +28,7 @@ from xmodule.modulestore.inheritance import InheritanceMixin
 NOTSET = object()
 ENABLED_OVERRIDE_PROVIDERS_KEY = u'courseware.field_overrides.enabled_providers.{course_id}'
 ENABLED_MODULESTORE_OVERRIDE_PROVIDERS_KEY = u'courseware.modulestore_field_overrides.enabled_providers.{course_id}'
+INHERITED_OVERRIDES_KEY = u'courseware.field_overrides.inherited_overrides'
 
 
 def resolve_dotted(name):
@@ -49,17 +50,6 @@ def resolve_dotted(name):
     return target
 
 
-def _lineage(block):
-    """
-    Returns an iterator over all ancestors of the given block, starting with
-    its immediate parent and ending at the root of the block tree.
-    """
-    parent = block.get_parent()
-    while parent:
-        yield parent
-        parent = parent.get_parent()
-
-
 class _OverridesDisabled(threading.local):
     """
     A thread local used to manage state of overrides being disabled or not.
@@ -82,6 +72,14 @@ def disable_overrides():
     _OVERRIDES_DISABLED.disabled = prev
 
 
+def clear_inherited_overrides():
+    """
+    Forgets the overrides inherited by blocks that were looked up in this
+    request, so that a changed override is seen by the next lookup.
+    """
+    RequestCache.get_request_cache().data.pop(INHERITED_OVERRIDES_KEY, None)
+
+
 def overrides_disabled():
     """
     Checks to see whether overrides are disabled in the current context.
@@ -198,6 +196,7 @@ class OverrideFieldData(FieldData):
     def __init__(self, user, fallback, providers):
         self.fallback = fallback
         self.providers = tuple(provider(user) for provider in providers)
+        self.user_id = getattr(user, 'id', None)
 
     def get_override(self, block, name):
         """
@@ -211,6 +210,26 @@ class OverrideFieldData(FieldData):
                     return value
         return NOTSET
 
+    def get_inherited_override(self, block, name):
+        """
+        Returns the override of the field identified by `name` that is set
+        on the nearest ancestor of `block`, or `NOTSET` if there is none.
+        Lookups are remembered in the request cache, per user, so each
+        ancestor is only checked once for all of its descendants, even
+        though every bound block has its own OverrideFieldData.
+        """
+        inherited_overrides = RequestCache.get_request_cache().data.setdefault(INHERITED_OVERRIDES_KEY, {})
+        cache_key = (type(self), self.user_id, block.scope_ids.usage_id, name)
+        if cache_key not in inherited_overrides:
+            value = NOTSET
+            parent = block.get_parent()
+            if parent:
+                value = self.get_override(parent, name)
+                if value is NOTSET:
+                    value = self.get_inherited_override(parent, name)
+            inherited_overrides[cache_key] = value
+        return inherited_overrides[cache_key]
+
     def get(self, block, name):
         value = self.get_override(block, name)
         if value is not NOTSET:
@@ -228,15 +247,13 @@ class OverrideFieldData(FieldData):
             return self.fallback.has(block, name)
 
         has = self.get_override(block, name)
-        if has is NOTSET:
+        if has is NOTSET and not overrides_disabled():
             # If this is an inheritable field and an override is set above,
             # then we want to return False here, so the field_data uses the
             # override and not the original value for this block.
             inheritable = InheritanceMixin.fields.keys()
-            if name in inheritable:
-                for ancestor in _lineage(block):
-                    if self.get_override(ancestor, name) is not NOTSET:
-                        return False
+            if name in inheritable and self.get_inherited_override(block, name) is not NOTSET:
+                return False
 
         return has is not NOTSET or self.fallback.has(block, name)
 
@@ -249,10 +266,9 @@ class OverrideFieldData(FieldData):
         if self.providers and not overrides_disabled():
             inheritable = InheritanceMixin.fields.keys()
             if name in inheritable:
-                for ancestor in _lineage(block):
-                    value = self.get_override(ancestor, name)
-                    if value is not NOTSET:
-                        return value
+                value = self.get_inherited_override(block, name)
+                if value is not NOTSET:
+                    return value
         return self.fallback.default(block, name)
 
 
@@ -1,6 +1,7 @@
 # Compute grades using real division, with no integer truncation
 from __future__ import division
 
+import hashlib
 import json
 import logging
 import random
@@ -10,7 +11,9 @@ import dogstats_wrapper as dog_stats_api
 from course_blocks.api import get_course_blocks
 from courseware import courses
 from django.conf import settings
+from django.contrib.auth.models import User
 from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from django.test.client import RequestFactory
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.keys import CourseKey
@@ -28,7 +31,7 @@ from xmodule import graders, block_metadata_utils
 from xmodule.graders import Score
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import ItemNotFoundError
-from .models import StudentModule
+from .models import PersistentCourseGrade, PersistentSubsectionGrade, StudentModule
 from .module_render import get_module_for_descriptor
 from .transformers.grades import GradesTransformer
 
@@ -270,6 +273,14 @@ def grade(student, course, keep_raw_scores=False, course_structure=None):
     Also sends a signal to update the minimum grade requirement status.
     """
     grade_summary = _grade(student, course, keep_raw_scores, course_structure)
+    _send_grades_updated(student, course, grade_summary)
+    return grade_summary
+
+
+def _send_grades_updated(student, course, grade_summary):
+    """
+    Sends the signal to update the minimum grade requirement status.
+    """
     responses = GRADES_UPDATED.send_robust(
         sender=None,
         username=student.username,
@@ -281,10 +292,17 @@ def grade(student, course, keep_raw_scores=False, course_structure=None):
     for receiver, response in responses:
         log.info('Signal fired when student grade is calculated. Receiver: %s. Response: %s', receiver, response)
 
-    return grade_summary
 
-
-def _grade(student, course, keep_raw_scores, course_structure=None):
+def _grade(
+        student,
+        course,
+        keep_raw_scores,
+        course_structure=None,
+        read_persisted=True,
+        scores_client=None,
+        grading_context_result=None,
+        submissions_scores=None,
+):
     """
     Unwrapped version of "grade"
 
@@ -295,16 +313,33 @@ def _grade(student, course, keep_raw_scores, course_structure=None):
     - course: a CourseDescriptor
     - keep_raw_scores : if True, then value for key 'raw_scores' contains scores
       for every graded module
+    - read_persisted : if True and persistent grades are enabled, a persisted
+      course grade for the current course version is returned as-is instead of
+      being recomputed
+    - scores_client : an optional ScoresClient with the student's scores
+      already fetched (e.g. by a batch of students being graded together)
+    - grading_context_result : an optional, already computed grading context
+      for the student's course structure
+    - submissions_scores : the student's scores registered with the
+      submissions API, if already fetched
 
     More information on the format is in the docstring for CourseGrader.
     """
-    if course_structure is None:
-        course_structure = get_course_blocks(student, course.location)
-    grading_context_result = grading_context(course_structure)
-    scorable_locations = [block.location for block in grading_context_result['all_graded_blocks']]
-
-    with outer_atomic():
-        scores_client = ScoresClient.create_for_locations(course.id, student.id, scorable_locations)
+    use_persisted_grades = persistent_grades_enabled()
+    if use_persisted_grades and read_persisted and not keep_raw_scores:
+        grade_summary = _read_persisted_course_grade(student, course)
+        if grade_summary is not None:
+            return grade_summary
+
+    if grading_context_result is None:
+        if course_structure is None:
+            course_structure = get_course_blocks(student, course.location)
+        grading_context_result = grading_context(course_structure)
+
+    if scores_client is None:
+        scorable_locations = [block.location for block in grading_context_result['all_graded_blocks']]
+        with outer_atomic():
+            scores_client = ScoresClient.create_for_locations(course.id, student.id, scorable_locations)
 
     # Dict of item_ids -> (earned, possible) point tuples. This *only* grabs
     # scores that were registered with the submissions API, which for the moment
@@ -314,16 +349,35 @@ def _grade(student, course, keep_raw_scores, course_structure=None):
     # Django translation --> ... --> courseware --> submissions
     from submissions import api as sub_api  # installed from the edx-submissions repository
 
-    with outer_atomic():
-        submissions_scores = sub_api.get_scores(
-            course.id.to_deprecated_string(),
-            anonymous_id_for_user(student, course.id)
-        )
+    if submissions_scores is None:
+        with outer_atomic():
+            submissions_scores = sub_api.get_scores(
+                course.id.to_deprecated_string(),
+                anonymous_id_for_user(student, course.id)
+            )
 
-    totaled_scores, raw_scores = _calculate_totaled_scores(
+    totaled_scores, raw_scores, subsection_totals = _calculate_totaled_scores(
         student, grading_context_result, submissions_scores, scores_client, keep_raw_scores
     )
 
+    grade_summary = _summarize_totaled_scores(course, totaled_scores)
+
+    if use_persisted_grades:
+        _persist_grades(student, course, subsection_totals, grade_summary)
+
+    if keep_raw_scores:
+        # way to get all RAW scores out to instructor
+        # so grader can be double-checked
+        grade_summary['raw_scores'] = raw_scores
+
+    return grade_summary
+
+
+def _summarize_totaled_scores(course, totaled_scores):
+    """
+    Runs the course grader over the given totaled scores and returns the
+    resulting grade summary, augmented with the final letter grade.
+    """
     with outer_atomic():
         # Grading policy might be overriden by a CCX, need to reset it
         course.set_grading_policy(course.grading_policy)
@@ -336,10 +390,6 @@ def _grade(student, course, keep_raw_scores, course_structure=None):
         letter_grade = grade_for_percentage(course.grade_cutoffs, grade_summary['percent'])
         grade_summary['grade'] = letter_grade
         grade_summary['totaled_scores'] = totaled_scores   # make this available, eg for instructor download & debugging
-        if keep_raw_scores:
-            # way to get all RAW scores out to instructor
-            # so grader can be double-checked
-            grade_summary['raw_scores'] = raw_scores
 
     return grade_summary
 
@@ -352,86 +402,358 @@ def _calculate_totaled_scores(
         keep_raw_scores,
 ):
     """
-    Returns the totaled scores, which can be passed to the grader.
+    Returns the totaled scores, which can be passed to the grader, the raw
+    scores (if keep_raw_scores is True) and a dict mapping the location of
+    every graded section to its graded total.
     """
     raw_scores = []
     totaled_scores = {}
+    subsection_totals = {}
     for section_format, sections in grading_context_result['all_graded_sections'].iteritems():
         format_scores = []
         for section_info in sections:
             section = section_info['section_block']
-            section_name = block_metadata_utils.display_name_with_default(section)
-
-            with outer_atomic():
-                # Check to
-                # see if any of our locations are in the scores from the submissions
-                # API. If scores exist, we have to calculate grades for this section.
-                should_grade_section = any(
-                    unicode(descendant.location) in submissions_scores
-                    for descendant in section_info['scored_descendants']
+            graded_total, scores = _calculate_section_total(
+                student, section_info, submissions_scores, scores_client
+            )
+            if keep_raw_scores:
+                raw_scores += scores
+            subsection_totals[section.location] = graded_total
+
+            # Add the graded total to totaled_scores
+            if graded_total.possible > 0:
+                format_scores.append(graded_total)
+            else:
+                log.info(
+                    "Unable to grade a section with a total possible score of zero. " +
+                    str(section.location)
                 )
 
-                if not should_grade_section:
-                    should_grade_section = any(
-                        descendant.location in scores_client
-                        for descendant in section_info['scored_descendants']
-                    )
+        totaled_scores[section_format] = format_scores
 
-                # If we haven't seen a single problem in the section, we don't have
-                # to grade it at all! We can assume 0%
-                if should_grade_section:
-                    scores = []
-
-                    for descendant in section_info['scored_descendants']:
-
-                        (correct, total) = get_score(
-                            student,
-                            descendant,
-                            scores_client,
-                            submissions_scores,
-                        )
-                        if correct is None and total is None:
-                            continue
-
-                        if settings.GENERATE_PROFILE_SCORES:  # for debugging!
-                            if total > 1:
-                                correct = random.randrange(max(total - 2, 1), total + 1)
-                            else:
-                                correct = total
-
-                        graded = descendant.graded
-                        if not total > 0:
-                            # We simply cannot grade a problem that is 12/0, because we might need it as a percentage
-                            graded = False
-
-                        scores.append(
-                            Score(
-                                correct,
-                                total,
-                                graded,
-                                block_metadata_utils.display_name_with_default_escaped(descendant),
-                                descendant.location
-                            )
-                        )
-
-                    __, graded_total = graders.aggregate_scores(scores, section_name)
-                    if keep_raw_scores:
-                        raw_scores += scores
-                else:
-                    graded_total = Score(0.0, 1.0, True, section_name, None)
+    return totaled_scores, raw_scores, subsection_totals
+
+
+def _calculate_section_total(student, section_info, submissions_scores, scores_client):
+    """
+    Returns a tuple of the graded total of the given section (an entry of the
+    grading context's 'all_graded_sections') and the list of scores of its
+    descendants.
+    """
+    section = section_info['section_block']
+    section_name = block_metadata_utils.display_name_with_default(section)
+
+    with outer_atomic():
+        # Check to
+        # see if any of our locations are in the scores from the submissions
+        # API. If scores exist, we have to calculate grades for this section.
+        should_grade_section = any(
+            unicode(descendant.location) in submissions_scores
+            for descendant in section_info['scored_descendants']
+        )
+
+        if not should_grade_section:
+            should_grade_section = any(
+                descendant.location in scores_client
+                for descendant in section_info['scored_descendants']
+            )
+
+        # If we haven't seen a single problem in the section, we don't have
+        # to grade it at all! We can assume 0%
+        if not should_grade_section:
+            return Score(0.0, 1.0, True, section_name, None), []
+
+        scores = []
+
+        for descendant in section_info['scored_descendants']:
 
-                # Add the graded total to totaled_scores
-                if graded_total.possible > 0:
-                    format_scores.append(graded_total)
+            (correct, total) = get_score(
+                student,
+                descendant,
+                scores_client,
+                submissions_scores,
+            )
+            if correct is None and total is None:
+                continue
+
+            if settings.GENERATE_PROFILE_SCORES:  # for debugging!
+                if total > 1:
+                    correct = random.randrange(max(total - 2, 1), total + 1)
                 else:
-                    log.info(
-                        "Unable to grade a section with a total possible score of zero. " +
-                        str(section.location)
-                    )
+                    correct = total
+
+            graded = descendant.graded
+            if not total > 0:
+                # We simply cannot grade a problem that is 12/0, because we might need it as a percentage
+                graded = False
+
+            scores.append(
+                Score(
+                    correct,
+                    total,
+                    graded,
+                    block_metadata_utils.display_name_with_default_escaped(descendant),
+                    descendant.location
+                )
+            )
+
+        __, graded_total = graders.aggregate_scores(scores, section_name)
 
+    return graded_total, scores
+
+
+def persistent_grades_enabled():
+    """
+    Returns whether subsection and course grades are persisted and
+    incrementally updated, rather than recomputed on every read.
+    """
+    return settings.FEATURES.get('ENABLE_PERSISTENT_GRADES', False)
+
+
+def _course_version(course):
+    """
+    Returns a string identifying the version of the course content that grades
+    are computed against, or an empty string if it cannot be determined. Any
+    edit to the course (including its grading policy) changes the version.
+    """
+    edited_on = getattr(course, 'subtree_edited_on', None)
+    return unicode(edited_on) if edited_on else u''
+
+
+def _grades_version(student, course):
+    """
+    Returns a string identifying what the grades of the student in the course
+    are computed against: the version of the course content, and the groups
+    of the student, which decide the blocks they are graded on.  Returns an
+    empty string if the version of the course cannot be determined.
+    """
+    course_version = _course_version(course)
+    if not course_version:
+        return u''
+
+    user_groups = []
+    for user_partition in course.user_partitions:
+        group = user_partition.scheme.get_group_for_user(course.id, student, user_partition)
+        if group is not None:
+            user_groups.append(u'{}:{}'.format(user_partition.id, group.id))
+    if not user_groups:
+        return course_version
+    return u'{} {}'.format(course_version, hashlib.sha1(u','.join(user_groups)).hexdigest())
+
+
+def _read_persisted_course_grade(student, course):
+    """
+    Returns the persisted grade summary of the student in the course, or None
+    if there is no persisted grade for the current version of the course and
+    groups of the student.
+    """
+    course_version = _grades_version(student, course)
+    if not course_version:
+        return None
+
+    try:
+        persisted_grade = PersistentCourseGrade.objects.get(
+            user=student,
+            course_id=course.id,
+            course_version=course_version,
+        )
+    except PersistentCourseGrade.DoesNotExist:
+        return None
+
+    grade_summary = json.loads(persisted_grade.grade_summary)
+    grade_summary['totaled_scores'] = {
+        section_format: [
+            Score(earned, possible, graded, section, None)
+            for earned, possible, graded, section in format_scores
+        ]
+        for section_format, format_scores in grade_summary['totaled_scores'].iteritems()
+    }
+    return grade_summary
+
+
+def _persist_grades(student, course, subsection_totals, grade_summary):
+    """
+    Saves the graded totals of the student's subsections and the course grade
+    summary (without raw scores).
+    """
+    course_version = _grades_version(student, course)
+    if not course_version:
+        # Grades that are not known to be up to date are never read, e.g. for
+        # XML courses, which have no edit time.
+        return
+
+    serializable_summary = dict(grade_summary)
+    serializable_summary.pop('raw_scores', None)
+    serializable_summary['totaled_scores'] = {
+        section_format: [
+            (score.earned, score.possible, score.graded, score.section)
+            for score in format_scores
+        ]
+        for section_format, format_scores in grade_summary['totaled_scores'].iteritems()
+    }
+
+    try:
+        with transaction.atomic():
+            if subsection_totals:
+                _persist_subsection_grades(student, course.id, course_version, subsection_totals)
+            PersistentCourseGrade.objects.update_or_create(
+                user=student,
+                course_id=course.id,
+                defaults={
+                    'course_version': course_version,
+                    'percent_grade': grade_summary['percent'],
+                    'letter_grade': grade_summary['grade'],
+                    'grade_summary': json.dumps(serializable_summary),
+                }
+            )
+    except IntegrityError:
+        # A concurrent request persisted the same grades first; since both
+        # computed them from the same scores, there is nothing to do.
+        log.info(u'Persisted grades for user %s in course %s were saved concurrently.', student.id, course.id)
+
+
+def _persist_subsection_grades(student, course_key, course_version, subsection_totals):
+    """
+    Saves the given dict of subsection location -> graded total for the
+    student, only writing the rows whose values changed.
+    """
+    existing_grades = {
+        persisted_grade.usage_key.map_into_course(course_key): persisted_grade
+        for persisted_grade in PersistentSubsectionGrade.objects.filter(user=student, course_id=course_key)
+    }
+    new_grades = []
+    for usage_key, graded_total in subsection_totals.iteritems():
+        persisted_grade = existing_grades.get(usage_key)
+        if persisted_grade is None:
+            new_grades.append(PersistentSubsectionGrade(
+                user=student,
+                course_id=course_key,
+                usage_key=usage_key,
+                course_version=course_version,
+                earned=graded_total.earned,
+                possible=graded_total.possible,
+            ))
+        elif (persisted_grade.earned, persisted_grade.possible, persisted_grade.course_version) != (
+                graded_total.earned, graded_total.possible, course_version
+        ):
+            persisted_grade.earned = graded_total.earned
+            persisted_grade.possible = graded_total.possible
+            persisted_grade.course_version = course_version
+            persisted_grade.save()
+    PersistentSubsectionGrade.objects.bulk_create(new_grades)
+
+
+def invalidate_persisted_grades(user_id, course_key, usage_key):
+    """
+    Deletes the persisted course grade of a user after their score on the
+    block at usage_key changed, so that it is recomputed when next read, and
+    schedules its incremental update.
+    """
+    if not persistent_grades_enabled():
+        return
+
+    PersistentCourseGrade.objects.filter(user_id=user_id, course_id=course_key).delete()
+
+    # Imported here to avoid a circular dependency between the grading code
+    # and the courseware tasks.
+    from courseware.tasks import update_persisted_grades as update_persisted_grades_task
+    try:
+        update_persisted_grades_task.apply_async(
+            (user_id, unicode(course_key), unicode(usage_key)),
+            countdown=settings.PERSISTENT_GRADES_UPDATE_DELAY,
+        )
+    except Exception:  # pylint: disable=broad-except
+        # The course grade is recomputed when next read instead.
+        log.exception(
+            u"Failed to schedule the update of persisted grades. user_id: %s, course_id: %s, usage_id: %s",
+            user_id, course_key, usage_key
+        )
+
+
+def update_persisted_grades(user_id, course_key, usage_key):
+    """
+    Incrementally updates the persisted grades of a user after their score on
+    the block at usage_key changed. Only the subsections containing the block
+    are regraded; the course grade is then re-aggregated from the persisted
+    subsection grades. If any graded subsection has no up-to-date persisted
+    grade, the whole course is regraded (and persisted) instead.
+
+    The subsections are regraded even if a course grade was persisted since
+    invalidate_persisted_grades deleted it, as it may have been aggregated by
+    the update for another score change before this subsection was regraded.
+    """
+    student = User.objects.get(id=user_id)
+    course = modulestore().get_course(course_key, depth=0)
+    if course is None:
+        return
+    usage_key = usage_key.map_into_course(course_key)
+    course_version = _grades_version(student, course)
+    if not course_version:
+        # See _persist_grades.
+        return
+
+    course_structure = get_course_blocks(student, course.location)
+    grading_context_result = grading_context(course_structure)
+    affected_sections = [
+        section_info
+        for sections in grading_context_result['all_graded_sections'].itervalues()
+        for section_info in sections
+        if any(descendant.location == usage_key for descendant in section_info['scored_descendants'])
+    ]
+    if not affected_sections:
+        # The block does not count towards the grade of this user.
+        return
+
+    scorable_locations = [
+        descendant.location
+        for section_info in affected_sections
+        for descendant in section_info['scored_descendants']
+    ]
+    with outer_atomic():
+        scores_client = ScoresClient.create_for_locations(course.id, student.id, scorable_locations)
+
+    # See _grade for why this is imported here.
+    from submissions import api as sub_api  # installed from the edx-submissions repository
+    with outer_atomic():
+        submissions_scores = sub_api.get_scores(
+            unicode(course.id), anonymous_id_for_user(student, course.id)
+        )
+
+    subsection_totals = {}
+    for section_info in affected_sections:
+        subsection_totals[section_info['section_block'].location], __ = _calculate_section_total(
+            student, section_info, submissions_scores, scores_client
+        )
+
+    with transaction.atomic():
+        _persist_subsection_grades(student, course.id, course_version, subsection_totals)
+
+    persisted_grades = {
+        persisted_grade.usage_key.map_into_course(course.id): persisted_grade
+        for persisted_grade in PersistentSubsectionGrade.objects.filter(
+            user=student, course_id=course.id, course_version=course_version
+        )
+    }
+    totaled_scores = {}
+    for section_format, sections in grading_context_result['all_graded_sections'].iteritems():
+        format_scores = []
+        for section_info in sections:
+            section = section_info['section_block']
+            persisted_grade = persisted_grades.get(section.location)
+            if persisted_grade is None:
+                _grade(student, course, False, course_structure=course_structure, read_persisted=False)
+                return
+            if persisted_grade.possible > 0:
+                format_scores.append(Score(
+                    persisted_grade.earned,
+                    persisted_grade.possible,
+                    True,
+                    block_metadata_utils.display_name_with_default(section),
+                    None
+                ))
         totaled_scores[section_format] = format_scores
 
-    return totaled_scores, raw_scores
+    _persist_grades(student, course, {}, _summarize_totaled_scores(course, totaled_scores))
 
 
 def grade_for_percentage(grade_cutoffs, percentage):
@@ -639,7 +961,7 @@ def get_score(user, block, scores_client, submissions_scores_cache):
     return weighted_score(correct, total, block.weight)
 
 
-def iterate_grades_for(course_or_id, students, keep_raw_scores=False):
+def iterate_grades_for(course_or_id, students, keep_raw_scores=False, batch_size=None):
     """Given a course_id and an iterable of students (User), yield a tuple of:
 
     (student, gradeset, err_msg) for every student enrolled in the course.
@@ -656,12 +978,26 @@ def iterate_grades_for(course_or_id, students, keep_raw_scores=False):
     - grade_breakdown : A breakdown of the major components that
         make up the final grade. (For display)
     - raw_scores: contains scores for every graded module
+
+    If batch_size is given, students are graded in chunks of that many
+    students, which share a single query for their scores and reuse the
+    grading context of identical course structures.
     """
     if isinstance(course_or_id, (basestring, CourseKey)):
         course = courses.get_course_by_id(course_or_id)
     else:
         course = course_or_id
 
+    if batch_size:
+        # Grading contexts keyed by the set of blocks in the course structure
+        # they were computed from, shared by the batches (see
+        # _iterate_grades_for_batch).
+        grading_contexts = {}
+        for students_batch in _batches(students, batch_size):
+            for result in _iterate_grades_for_batch(course, students_batch, keep_raw_scores, grading_contexts):
+                yield result
+        return
+
     for student in students:
         with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=[u'action:{}'.format(course.id)]):
             try:
@@ -680,6 +1016,137 @@ def iterate_grades_for(course_or_id, students, keep_raw_scores=False):
                 yield student, {}, exc.message
 
 
+def _batches(iterable, batch_size):
+    """
+    Yields lists of up to batch_size consecutive items of the iterable.
+    """
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# The maximum number of grading contexts shared by the batches of students
+# being graded together.  Students mostly share a few course structures.
+MAX_SHARED_GRADING_CONTEXTS = 10
+
+
+def _get_submissions_scores_for_batch(course_key, students):
+    """
+    Returns a dict mapping the id of each of the given students to their
+    scores registered with the submissions API in the course, as returned by
+    submissions.api.get_scores, reading the scores of all of them at once.
+    """
+    # See _grade for why this is imported here.
+    from submissions.models import ScoreSummary  # installed from the edx-submissions repository
+
+    # The anonymous ids of students who have scores are already saved.
+    user_ids = {
+        anonymous_id_for_user(student, course_key, save=False): student.id
+        for student in students
+    }
+    submissions_scores = {student.id: {} for student in students}
+    score_summaries = ScoreSummary.objects.filter(
+        student_item__course_id=unicode(course_key),
+        student_item__student_id__in=list(user_ids),
+    ).select_related('latest', 'student_item')
+    for score_summary in score_summaries:
+        if score_summary.latest.is_hidden():
+            continue
+        student_item = score_summary.student_item
+        submissions_scores[user_ids[student_item.student_id]][student_item.item_id] = (
+            score_summary.latest.points_earned,
+            score_summary.latest.points_possible,
+        )
+    return submissions_scores
+
+
+def _iterate_grades_for_batch(course, students, keep_raw_scores, grading_contexts):
+    """
+    Grades a batch of students together, yielding the same tuples as
+    iterate_grades_for. The scores of all students are loaded with a single
+    query (and their submissions scores with another), and students whose
+    course structures contain the same blocks share a grading context (cached
+    in the given grading_contexts dict, which holds up to
+    MAX_SHARED_GRADING_CONTEXTS of them).
+    """
+    use_persisted_grades = persistent_grades_enabled() and not keep_raw_scores
+    results = {}
+    student_grading_contexts = {}
+    with dog_stats_api.timer('lms.grades.iterate_grades_for_batch', tags=[u'action:{}'.format(course.id)]):
+        for student in students:
+            try:
+                if use_persisted_grades:
+                    grade_summary = _read_persisted_course_grade(student, course)
+                    if grade_summary is not None:
+                        results[student.id] = (grade_summary, "")
+                        continue
+
+                course_structure = get_course_blocks(student, course.location)
+                structure_key = frozenset(course_structure)
+                if structure_key not in grading_contexts:
+                    if len(grading_contexts) >= MAX_SHARED_GRADING_CONTEXTS:
+                        grading_contexts.clear()
+                    grading_contexts[structure_key] = grading_context(course_structure)
+                student_grading_contexts[student.id] = grading_contexts[structure_key]
+            except Exception as exc:  # pylint: disable=broad-except
+                log.exception(
+                    'Cannot grade student %s (%s) in course %s because of exception: %s',
+                    student.username,
+                    student.id,
+                    course.id,
+                    exc.message
+                )
+                results[student.id] = ({}, exc.message)
+
+        scorable_locations = set(
+            block.location
+            for grading_context_result in student_grading_contexts.itervalues()
+            for block in grading_context_result['all_graded_blocks']
+        )
+        with outer_atomic():
+            scores_clients = ScoresClient.create_for_users(
+                course.id, list(student_grading_contexts), scorable_locations
+            )
+            submissions_scores = _get_submissions_scores_for_batch(
+                course.id, [student for student in students if student.id in student_grading_contexts]
+            )
+
+        for student in students:
+            if student.id in results:
+                grade_summary, err_msg = results[student.id]
+                if grade_summary:
+                    _send_grades_updated(student, course, grade_summary)
+                yield student, grade_summary, err_msg
+                continue
+
+            try:
+                grade_summary = _grade(
+                    student,
+                    course,
+                    keep_raw_scores,
+                    read_persisted=False,
+                    scores_client=scores_clients[student.id],
+                    grading_context_result=student_grading_contexts[student.id],
+                    submissions_scores=submissions_scores[student.id],
+                )
+                _send_grades_updated(student, course, grade_summary)
+                yield student, grade_summary, ""
+            except Exception as exc:  # pylint: disable=broad-except
+                log.exception(
+                    'Cannot grade student %s (%s) in course %s because of exception: %s',
+                    student.username,
+                    student.id,
+                    course.id,
+                    exc.message
+                )
+                yield student, {}, exc.message
+
+
 def _get_mock_request(student):
     """
     Make a fake request because grading code expects to be able to look at
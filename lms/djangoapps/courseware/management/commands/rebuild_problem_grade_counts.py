@@ -0,0 +1,52 @@
+"""
+Recompute the per-problem grade counts read by the grade distribution
+dashboards, from the courses' StudentModule rows.
+"""
+import logging
+from optparse import make_option
+from textwrap import dedent
+
+from django.core.management.base import BaseCommand, CommandError
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+from courseware.models import ProblemGradeCount
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Recompute the per-problem grade counts of the given courses, or of all
+    courses.  Run this for existing courses when enabling
+    ENABLE_GRADE_DISTRIBUTION_TABLE, or to correct the counts.
+
+    Example usage:
+        $ ./manage.py lms rebuild_problem_grade_counts course-v1:edX+DemoX+Demo_Course
+        $ ./manage.py lms rebuild_problem_grade_counts --all
+    """
+    args = '<course_id course_id ...>'
+    help = dedent(__doc__).strip()
+    option_list = BaseCommand.option_list + (
+        make_option('--all',
+                    action='store_true',
+                    dest='all',
+                    default=False,
+                    help='Rebuild the grade counts of all courses'),
+    )
+
+    def handle(self, *args, **options):
+        if options['all']:
+            course_keys = [course_overview.id for course_overview in CourseOverview.get_all_courses()]
+        elif args:
+            try:
+                course_keys = [CourseKey.from_string(arg) for arg in args]
+            except InvalidKeyError:
+                raise CommandError('Invalid course key.')
+        else:
+            raise CommandError('At least one course or --all must be specified.')
+
+        for course_key in course_keys:
+            log.info(u'Rebuilding problem grade counts of %s', course_key)
+            ProblemGradeCount.rebuild(course_key)
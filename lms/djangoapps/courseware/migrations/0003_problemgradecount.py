@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import xmodule_django.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courseware', '0002_persistent_grades'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProblemGradeCount',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('course_id', xmodule_django.models.CourseKeyField(max_length=255, db_index=True)),
+                ('module_state_key', xmodule_django.models.LocationKeyField(max_length=255, db_column='module_id', db_index=True)),
+                ('grade', models.FloatField(null=True, blank=True)),
+                ('max_grade', models.FloatField(null=True, blank=True)),
+                ('student_count', models.IntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -44,6 +44,7 @@ from xblock.fields import Scope, UserScope
 from xmodule.modulestore.django import modulestore
 from xblock.core import XBlockAside
 from courseware.user_state_client import DjangoXBlockUserStateClient
+import dogstats_wrapper as dog_stats_api
 
 
 log = logging.getLogger(__name__)
@@ -354,6 +355,22 @@ class UserStateCache(object):
         self.course_id = course_id
         self.user = user
         self._client = DjangoXBlockUserStateClient(self.user)
+        # Usage keys whose state has already been read from the database,
+        # whether or not a StudentModule exists for them.
+        self._fetched_keys = set()
+        self.prefetched_count = 0
+        self.lazily_fetched_count = 0
+
+    def prefetch(self, usage_keys):
+        """
+        Load the state of all of ``usage_keys`` into this cache in one batch,
+        so that later calls to ``cache_fields`` only read the keys that
+        weren't prefetched.
+
+        Arguments:
+            usage_keys (iterable of :class:`UsageKey`): The blocks to load state for.
+        """
+        self.prefetched_count += self._fetch(usage_keys, u'prefetched')
 
     def cache_fields(self, fields, xblocks, aside_types):  # pylint: disable=unused-argument
         """
@@ -365,12 +382,31 @@ class UserStateCache(object):
             xblocks (list of :class:`XBlock`): XBlocks to cache fields for.
             aside_types (list of str): Aside types to cache fields for.
         """
+        self.lazily_fetched_count += self._fetch(_all_usage_keys(xblocks, aside_types), u'lazy')
+
+    def _fetch(self, usage_keys, fetch_type):
+        """
+        Read the state of those of ``usage_keys`` that haven't been read yet,
+        and return how many were read.
+        """
+        usage_keys = set(usage_keys) - self._fetched_keys
+        if not usage_keys:
+            return 0
+
         block_field_state = self._client.get_many(
             self.user.username,
-            _all_usage_keys(xblocks, aside_types),
+            usage_keys,
         )
         for user_state in block_field_state:
             self._cache[user_state.block_key] = user_state.state
+        self._fetched_keys.update(usage_keys)
+
+        dog_stats_api.histogram(
+            'courseware.field_data_cache.user_state_keys',
+            len(usage_keys),
+            tags=[u'fetch:{}'.format(fetch_type)],
+        )
+        return len(usage_keys)
 
     @contract(kvs_key=DjangoKeyValueStore.Key)
     def set(self, kvs_key, value):
@@ -725,14 +761,43 @@ class FieldDataCache(object):
             ),
         }
         self.scorable_locations = set()
+        # Usage keys of the descriptors whose fields are already in this cache,
+        # so that overlapping subtrees are only read from the database once.
+        self._cached_usage_keys = set()
         self.add_descriptors_to_cache(descriptors)
 
+    def prefetch_user_state(self, usage_keys):
+        """
+        Load the Scope.user_state data for all of `usage_keys` (and their
+        asides) in one batch, ahead of the descriptors being added to this
+        FieldDataCache. Descriptors added later only query for the state of
+        blocks that weren't prefetched.
+
+        usage_keys: The usage keys to load state for, e.g. all of the blocks
+            in the course's block structure.
+        """
+        if self.user.is_authenticated():
+            usage_keys = set(usage_keys)
+            usage_keys.update([
+                AsideUsageKeyV1(usage_key, aside_type)
+                for usage_key in list(usage_keys)
+                for aside_type in self.asides
+            ])
+            self.cache[Scope.user_state].prefetch(usage_keys)
+
     def add_descriptors_to_cache(self, descriptors):
         """
         Add all `descriptors` to this FieldDataCache.
         """
         if self.user.is_authenticated():
             self.scorable_locations.update(desc.location for desc in descriptors if desc.has_score)
+            descriptors = [
+                descriptor for descriptor in descriptors
+                if descriptor.scope_ids.usage_id not in self._cached_usage_keys
+            ]
+            if not descriptors:
+                return
+            self._cached_usage_keys.update(descriptor.scope_ids.usage_id for descriptor in descriptors)
             for scope, fields in self._fields_to_cache(descriptors).items():
                 if scope not in self.cache:
                     continue
@@ -988,6 +1053,29 @@ class ScoresClient(object):
         client.fetch_scores(scorable_locations)
         return client
 
+    @classmethod
+    def create_for_users(cls, course_key, user_ids, locations):
+        """
+        Return a dict of user_id -> ScoresClient for each of the given users,
+        with the scores for all of them fetched in a single query.
+        """
+        clients = {user_id: cls(course_key, user_id) for user_id in user_ids}
+        scores_qset = StudentModule.objects.filter(
+            student_id__in=list(clients),
+            course_id=course_key,
+            module_state_key__in=set(locations),
+        )
+        for user_id, location, correct, total in scores_qset.values_list(
+                'student_id', 'module_state_key', 'grade', 'max_grade'
+        ):
+            # pylint: disable=protected-access
+            clients[user_id]._locations_to_scores[
+                UsageKey.from_string(location).map_into_course(course_key)
+            ] = cls.Score(correct, total)
+        for client in clients.itervalues():
+            client._has_fetched = True  # pylint: disable=protected-access
+        return clients
+
 
 # @contract(user_id=int, usage_key=UsageKey, score="number|None", max_score="number|None")
 def set_score(user_id, usage_key, score, max_score):
@@ -17,11 +17,13 @@ import itertools
 
 from django.contrib.auth.models import User
 from django.conf import settings
-from django.db import models
-from django.db.models.signals import post_save
+from django.db import models, transaction
+from django.db.models import Count, F
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver, Signal
 
 from model_utils.models import TimeStampedModel
+from opaque_keys.edx.keys import CourseKey, UsageKey
 from student.models import user_by_anonymous_id
 from submissions.models import score_set, score_reset
 import coursewarehistoryextended
@@ -116,6 +118,18 @@ class StudentModule(models.Model):
     created = models.DateTimeField(auto_now_add=True, db_index=True)
     modified = models.DateTimeField(auto_now=True, db_index=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember the grade loaded from the database, so that the grade counts
+        of problems can be updated when it changes.
+        """
+        instance = super(StudentModule, cls).from_db(db, field_names, values)
+        loaded_values = dict(zip(field_names, values))
+        if 'grade' in loaded_values and 'max_grade' in loaded_values:
+            instance.saved_grade = (loaded_values['grade'], loaded_values['max_grade'])
+        return instance
+
     @classmethod
     def all_submitted_problems_read_only(cls, course_id):
         """
@@ -361,6 +375,179 @@ class StudentFieldOverride(TimeStampedModel):
     value = models.TextField(default='null')
 
 
+class PersistentSubsectionGrade(TimeStampedModel):
+    """
+    The graded total a user has earned on a single subsection (sequential) of a
+    course, as computed by `courseware.grades`. Rows are updated incrementally
+    whenever one of the user's scores in the subsection changes, so that the
+    course grade can be re-aggregated without reloading every problem score.
+    """
+    class Meta(object):
+        app_label = "courseware"
+        unique_together = (('user', 'course_id', 'usage_key'),)
+
+    user = models.ForeignKey(User, db_index=True)
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    usage_key = LocationKeyField(max_length=255)
+
+    # The version of the course content the grade was computed against.
+    course_version = models.CharField(max_length=255, blank=True)
+
+    earned = models.FloatField()
+    possible = models.FloatField()
+
+    def __unicode__(self):
+        return u"[PersistentSubsectionGrade] {}: {} = {}/{} ({})".format(
+            self.user_id, self.usage_key, self.earned, self.possible, self.course_version
+        )
+
+
+class PersistentCourseGrade(TimeStampedModel):
+    """
+    The last computed course grade summary for a user in a course. This is the
+    output of the course grader (without raw scores), serialized as JSON, and is
+    only trusted while `course_version` matches the current course content.
+    """
+    class Meta(object):
+        app_label = "courseware"
+        unique_together = (('user', 'course_id'),)
+
+    user = models.ForeignKey(User, db_index=True)
+    course_id = CourseKeyField(max_length=255, db_index=True)
+
+    # The version of the course content the grade was computed against.
+    course_version = models.CharField(max_length=255, blank=True)
+
+    percent_grade = models.FloatField()
+    letter_grade = models.CharField(max_length=255, null=True, blank=True)
+    grade_summary = models.TextField()
+
+    def __unicode__(self):
+        return u"[PersistentCourseGrade] {}: {} = {} ({})".format(
+            self.user_id, self.course_id, self.percent_grade, self.course_version
+        )
+
+
+class ProblemGradeCount(models.Model):
+    """
+    The number of students with a given grade and max grade on a problem.
+
+    This aggregates the `StudentModule` rows of problems, and is updated as
+    those rows are saved and deleted, so that grade distributions can be read
+    without scanning every row of a course.  The count of a grade may be split
+    across several rows, so counts must be summed when read.
+    """
+    class Meta(object):
+        app_label = "courseware"
+
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    module_state_key = LocationKeyField(max_length=255, db_index=True, db_column='module_id')
+    grade = models.FloatField(null=True, blank=True)
+    max_grade = models.FloatField(null=True, blank=True)
+    student_count = models.IntegerField(default=0)
+
+    @classmethod
+    def add(cls, course_id, module_state_key, grade, max_grade, delta):
+        """
+        Add `delta` to the number of students with `grade` and `max_grade` on
+        the problem `module_state_key`.
+        """
+        updated = cls.objects.filter(
+            course_id=course_id or CourseKeyField.Empty,
+            module_state_key=module_state_key,
+            grade=grade,
+            max_grade=max_grade,
+        ).update(student_count=F('student_count') + delta)
+        if not updated:
+            cls.objects.create(
+                course_id=course_id,
+                module_state_key=module_state_key,
+                grade=grade,
+                max_grade=max_grade,
+                student_count=delta,
+            )
+
+    @classmethod
+    def rebuild(cls, course_id):
+        """
+        Recompute the grade counts of all problems in the course from its
+        `StudentModule` rows.
+        """
+        with transaction.atomic():
+            cls.objects.filter(course_id=course_id).delete()
+            rows = StudentModule.objects.filter(
+                course_id=course_id,
+                module_type='problem',
+            ).values('module_state_key', 'grade', 'max_grade').annotate(student_count=Count('id'))
+            cls.objects.bulk_create(
+                [cls(course_id=course_id, **row) for row in rows],
+                batch_size=1000,
+            )
+
+    def __unicode__(self):
+        return u"[ProblemGradeCount] {}: {}/{} x {}".format(
+            self.module_state_key, self.grade, self.max_grade, self.student_count
+        )
+
+
+@receiver(post_save, sender=StudentModule)
+def update_problem_grade_counts_on_save(sender, instance, created, **kwargs):  # pylint: disable=unused-argument
+    """
+    Move the student from their previous grade's count to their new one, if
+    the grade distribution table is enabled.
+    """
+    if not settings.FEATURES.get('ENABLE_GRADE_DISTRIBUTION_TABLE') or instance.module_type != 'problem':
+        return
+
+    new_grade = (instance.grade, instance.max_grade)
+    if created:
+        old_grade = None
+    elif hasattr(instance, 'saved_grade'):
+        old_grade = instance.saved_grade
+    else:
+        # The previous grade of a module that wasn't loaded from the database
+        # isn't known; `ProblemGradeCount.rebuild` corrects the counts.
+        return
+
+    if old_grade != new_grade:
+        if old_grade is not None:
+            ProblemGradeCount.add(instance.course_id, instance.module_state_key, old_grade[0], old_grade[1], -1)
+        ProblemGradeCount.add(instance.course_id, instance.module_state_key, new_grade[0], new_grade[1], 1)
+    instance.saved_grade = new_grade
+
+
+@receiver(post_delete, sender=StudentModule)
+def update_problem_grade_counts_on_delete(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Remove the student from their grade's count, if the grade distribution
+    table is enabled.
+    """
+    if not settings.FEATURES.get('ENABLE_GRADE_DISTRIBUTION_TABLE') or instance.module_type != 'problem':
+        return
+
+    grade, max_grade = getattr(instance, 'saved_grade', (instance.grade, instance.max_grade))
+    ProblemGradeCount.add(instance.course_id, instance.module_state_key, grade, max_grade, -1)
+
+
+@receiver(post_delete, sender=StudentModule)
+def discard_buffered_state_on_delete(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Discard the state updates buffered for a deleted student module, so that
+    flushing them doesn't recreate it.
+    """
+    if not getattr(settings, 'USER_STATE_WRITE_BEHIND_FIELDS', None):
+        return
+
+    # Imported here to avoid a circular dependency between the courseware
+    # models and the user state client.
+    from courseware.user_state_client import discard_buffered_state
+
+    discard_buffered_state(
+        instance.student.username,
+        [instance.module_state_key.map_into_course(instance.course_id)],
+    )
+
+
 # Signal that indicates that a user's score for a problem has been updated.
 # This signal is generated when a scoring event occurs either within the core
 # platform or in the Submissions module. Note that this signal will be triggered
@@ -457,3 +644,24 @@ def submissions_score_reset_handler(sender, **kwargs):  # pylint: disable=unused
             u"Failed to process score_reset signal from Submissions API. "
             "user: %s, course_id: %s, usage_id: %s", user, course_id, usage_id
         )
+
+
+@receiver(SCORE_CHANGED)
+def persistent_grades_score_changed_handler(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Consume the SCORE_CHANGED signal and invalidate the persisted course grade
+    of the affected user, scheduling its incremental update, if persistent
+    grades are enabled.
+    """
+    if not settings.FEATURES.get('ENABLE_PERSISTENT_GRADES'):
+        return
+
+    # Imported here to avoid a circular dependency between the courseware
+    # models and the grading code.
+    from courseware.grades import invalidate_persisted_grades
+
+    invalidate_persisted_grades(
+        kwargs['user_id'],
+        CourseKey.from_string(kwargs['course_id']),
+        UsageKey.from_string(kwargs['usage_id']),
+    )
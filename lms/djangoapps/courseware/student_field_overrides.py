@@ -4,7 +4,9 @@ by the individual due dates feature.
 """
 import json
 
-from .field_overrides import FieldOverrideProvider
+import request_cache
+
+from .field_overrides import FieldOverrideProvider, clear_inherited_overrides
 from .models import StudentFieldOverride
 
 
@@ -43,19 +45,52 @@ def _get_overrides_for_user(user, block):
     Gets all of the individual student overrides for given user and block.
     Returns a dictionary of field override values keyed by field name.
     """
-    query = StudentFieldOverride.objects.filter(
-        course_id=block.runtime.course_id,
-        location=block.location,
-        student_id=user.id,
-    )
+    course_overrides = _get_course_overrides_for_user(user, block.runtime.course_id)
+    if not course_overrides:
+        # Most users have no overrides at all.
+        return {}
+
+    location = StudentFieldOverride._meta.get_field('location').get_prep_value(block.location)
     overrides = {}
-    for override in query:
-        field = block.fields[override.field]
-        value = field.from_json(json.loads(override.value))
-        overrides[override.field] = value
+    for name, value in course_overrides.get(location, {}).iteritems():
+        field = block.fields[name]
+        overrides[name] = field.from_json(json.loads(value))
     return overrides
 
 
+def _get_course_overrides_for_user(user, course_id):
+    """
+    Gets all of the individual student overrides for given user in the
+    course, reading them once per request.  Returns a dictionary mapping the
+    serialized location of each overridden block to a dictionary of its
+    serialized override values keyed by field name.
+    """
+    overrides_cache = request_cache.get_cache('student-field-overrides')
+    cache_key = (user.id, course_id)
+
+    if cache_key not in overrides_cache:
+        overrides = {}
+        query = StudentFieldOverride.objects.filter(
+            course_id=course_id,
+            student_id=user.id,
+        ).values_list('location', 'field', 'value')
+        for location, field, value in query:
+            overrides.setdefault(unicode(location), {})[field] = value
+        overrides_cache[cache_key] = overrides
+
+    return overrides_cache[cache_key]
+
+
+def _clear_cached_overrides_for_user(user, block):
+    """
+    Forgets the overrides read for the `user` in the course of `block`, and
+    on `block` itself, so that the next lookup sees a changed override.
+    """
+    request_cache.get_cache('student-field-overrides').pop((user.id, block.runtime.course_id), None)
+    getattr(block, '_student_overrides', {}).pop(user.id, None)
+    clear_inherited_overrides()
+
+
 def override_field_for_user(user, block, name, value):
     """
     Overrides a field for the `user`.  `block` and `name` specify the block
@@ -70,6 +105,7 @@ def override_field_for_user(user, block, name, value):
     field = block.fields[name]
     override.value = json.dumps(field.to_json(value))
     override.save()
+    _clear_cached_overrides_for_user(user, block)
 
 
 def clear_override_for_user(user, block, name):
@@ -87,3 +123,4 @@ def clear_override_for_user(user, block, name):
             field=name).delete()
     except StudentFieldOverride.DoesNotExist:
         pass
+    _clear_cached_overrides_for_user(user, block)
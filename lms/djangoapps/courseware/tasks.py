@@ -0,0 +1,37 @@
+"""
+Asynchronous tasks for the courseware app.
+"""
+
+from django.conf import settings
+from django.db import DatabaseError
+from lms import CELERY_APP
+from opaque_keys.edx.keys import CourseKey, UsageKey
+
+from courseware import grades
+from courseware.user_state_client import DjangoXBlockUserStateClient
+
+
+@CELERY_APP.task(bind=True, max_retries=5)
+def flush_buffered_user_state(self, username):
+    """
+    Write the Scope.user_state updates buffered for ``username`` by
+    DjangoXBlockUserStateClient.set_many to StudentModule.
+    """
+    try:
+        DjangoXBlockUserStateClient().flush_buffered_state(username)
+    except DatabaseError as exc:
+        # The updates stay buffered until they are written.
+        raise self.retry(exc=exc, countdown=settings.USER_STATE_WRITE_BEHIND_DELAY)
+
+
+@CELERY_APP.task(bind=True, max_retries=5)
+def update_persisted_grades(self, user_id, course_id, usage_id):
+    """
+    Incrementally update the persisted grades of the user ``user_id`` after
+    their score on the block ``usage_id`` changed.
+    """
+    try:
+        grades.update_persisted_grades(user_id, CourseKey.from_string(course_id), UsageKey.from_string(usage_id))
+    except DatabaseError as exc:
+        # Until then, the course grade is recomputed when read.
+        raise self.retry(exc=exc, countdown=settings.PERSISTENT_GRADES_UPDATE_DELAY)
@@ -3,6 +3,7 @@ Tests for `field_overrides` module.
 """
 # pylint: disable=missing-docstring
 import unittest
+from mock import Mock, patch
 from nose.plugins.attrib import attr
 
 from django.test.utils import override_settings
@@ -11,6 +12,7 @@ from xmodule.modulestore.tests.factories import CourseFactory
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 
 from ..field_overrides import (
+    clear_inherited_overrides,
     resolve_dotted,
     disable_overrides,
     FieldOverrideProvider,
@@ -119,6 +121,21 @@ class OverrideFieldDataTests(SharedModuleStoreTestCase):
         with disable_overrides():
             self.assertEqual(data.get('block', 'foo'), 'baz')
 
+    def test_inherited_override_shared(self):
+        parent = Mock(scope_ids=Mock(usage_id='parent'))
+        parent.get_parent.return_value = None
+        child = Mock(scope_ids=Mock(usage_id='child'))
+        child.get_parent.return_value = parent
+        first, second = self.make_one(), self.make_one()
+        with patch.object(OverrideFieldData, 'get_override', return_value='fu') as mock_get_override:
+            self.assertEqual(first.get_inherited_override(child, 'foo'), 'fu')
+            self.assertEqual(second.get_inherited_override(child, 'foo'), 'fu')
+            self.assertEqual(mock_get_override.call_count, 1)
+
+            clear_inherited_overrides()
+            self.assertEqual(second.get_inherited_override(child, 'foo'), 'fu')
+            self.assertEqual(mock_get_override.call_count, 2)
+
     @override_settings(FIELD_OVERRIDE_PROVIDERS=())
     def test_no_overrides_configured(self):
         data = self.make_one()
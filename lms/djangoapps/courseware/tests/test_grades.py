@@ -1,6 +1,9 @@
 """
 Test grade calculation.
 """
+from datetime import datetime
+
+from django.conf import settings
 from django.http import Http404
 from django.test import TestCase
 from django.test.client import RequestFactory
@@ -10,14 +13,19 @@ from nose.plugins.attrib import attr
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from opaque_keys.edx.locator import CourseLocator, BlockUsageLocator
 
+from course_blocks.api import get_course_blocks
 from courseware.grades import (
     grade,
     iterate_grades_for,
+    _get_submissions_scores_for_batch,
     ProgressSummary,
-    get_module_score
+    get_module_score,
+    update_persisted_grades,
+    _grades_version,
 )
 from courseware.module_render import get_module
 from courseware.model_data import FieldDataCache, set_score
+from courseware.models import PersistentCourseGrade, PersistentSubsectionGrade
 from courseware.tests.helpers import (
     LoginEnrollmentTestCase,
     get_request_for_user
@@ -25,6 +33,8 @@ from courseware.tests.helpers import (
 from capa.tests.response_xml_factory import MultipleChoiceResponseXMLFactory
 from student.tests.factories import UserFactory
 from student.models import CourseEnrollment
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.partitions.partitions import Group
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 
@@ -127,8 +137,52 @@ class TestGradeIteration(SharedModuleStoreTestCase):
         self.assertTrue(all_gradesets[student2])
         self.assertTrue(all_gradesets[student5])
 
+    def test_batched_grades_match(self):
+        """Grading students in batches gives the same results as grading them
+        one at a time."""
+        all_gradesets, all_errors = self._gradesets_and_errors_for(self.course.id, self.students)
+        batched_gradesets, batched_errors = self._gradesets_and_errors_for(
+            self.course.id, self.students, batch_size=2
+        )
+        self.assertEqual(batched_errors, all_errors)
+        self.assertEqual(batched_gradesets, all_gradesets)
+
+    @patch('courseware.grades.get_course_blocks')
+    def test_batched_grading_exception(self, mock_get_course_blocks):
+        """An error while grading one student of a batch does not prevent the
+        other students of the batch from being graded."""
+        def _get_course_blocks_with_errors(student, root_block_usage_key):
+            if student.username == 'student2':
+                raise Exception("I don't like student2")
+            return get_course_blocks(student, root_block_usage_key)
+        mock_get_course_blocks.side_effect = _get_course_blocks_with_errors
+
+        all_gradesets, all_errors = self._gradesets_and_errors_for(self.course.id, self.students, batch_size=3)
+        self.assertEqual(all_errors, {self.students[1]: "I don't like student2"})
+        self.assertEqual(len(all_gradesets), 5)
+
+    @patch('submissions.api.get_scores')
+    def test_batched_submissions_scores(self, mock_get_scores):
+        """Grading students in batches reads their submissions scores once per
+        batch rather than once per student."""
+        with patch(
+            'courseware.grades._get_submissions_scores_for_batch',
+            wraps=_get_submissions_scores_for_batch,
+        ) as mock_batch_scores:
+            self._gradesets_and_errors_for(self.course.id, self.students, batch_size=3)
+        self.assertFalse(mock_get_scores.called)
+        self.assertEqual(mock_batch_scores.call_count, 2)
+
+    @patch('courseware.grades.MAX_SHARED_GRADING_CONTEXTS', 0)
+    def test_batched_grading_contexts_bounded(self):
+        """The grading contexts shared by the batches are dropped once there
+        are too many of them."""
+        all_gradesets, _ = self._gradesets_and_errors_for(self.course.id, self.students)
+        batched_gradesets, _ = self._gradesets_and_errors_for(self.course.id, self.students, batch_size=2)
+        self.assertEqual(batched_gradesets, all_gradesets)
+
     ################################# Helpers #################################
-    def _gradesets_and_errors_for(self, course_id, students):
+    def _gradesets_and_errors_for(self, course_id, students, batch_size=None):
         """Simple helper method to iterate through student grades and give us
         two dictionaries -- one that has all students and their respective
         gradesets, and one that has only students that could not be graded and
@@ -136,7 +190,7 @@ class TestGradeIteration(SharedModuleStoreTestCase):
         students_to_gradesets = {}
         students_to_errors = {}
 
-        for student, gradeset, err_msg in iterate_grades_for(course_id, students):
+        for student, gradeset, err_msg in iterate_grades_for(course_id, students, batch_size=batch_size):
             students_to_gradesets[student] = gradeset
             if err_msg:
                 students_to_errors[student] = err_msg
@@ -468,6 +522,153 @@ class TestGetModuleScore(LoginEnrollmentTestCase, SharedModuleStoreTestCase):
         self.assertEqual(score, 1.0)
 
 
+class TestPersistentGrades(SharedModuleStoreTestCase):
+    """
+    Test the persisted, incrementally updated subsection and course grades.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super(TestPersistentGrades, cls).setUpClass()
+        cls.course = CourseFactory.create(default_store=ModuleStoreEnum.Type.split)
+        cls.chapter = ItemFactory.create(
+            parent=cls.course,
+            category="chapter",
+            display_name="Test Chapter"
+        )
+        cls.sequence = ItemFactory.create(
+            parent=cls.chapter,
+            category='sequential',
+            display_name="Test Sequential",
+            graded=True,
+            format="Homework"
+        )
+        cls.vertical = ItemFactory.create(
+            parent=cls.sequence,
+            category='vertical',
+            display_name='Test Vertical'
+        )
+        problem_xml = MultipleChoiceResponseXMLFactory().build_xml(
+            question_text='The correct answer is Choice 3',
+            choices=[False, False, True, False],
+            choice_names=['choice_0', 'choice_1', 'choice_2', 'choice_3']
+        )
+        cls.problem1 = ItemFactory.create(
+            parent=cls.vertical,
+            category="problem",
+            display_name="Test Problem 1",
+            data=problem_xml
+        )
+        cls.problem2 = ItemFactory.create(
+            parent=cls.vertical,
+            category="problem",
+            display_name="Test Problem 2",
+            data=problem_xml
+        )
+
+    def setUp(self):
+        super(TestPersistentGrades, self).setUp()
+        self.request = get_request_for_user(UserFactory())
+        self.user = self.request.user
+        CourseEnrollment.enroll(self.user, self.course.id)
+
+    def test_grades_not_persisted_when_disabled(self):
+        grade(self.user, self.course)
+        self.assertFalse(PersistentCourseGrade.objects.filter(user=self.user).exists())
+        self.assertFalse(PersistentSubsectionGrade.objects.filter(user=self.user).exists())
+
+    @patch.dict(settings.FEATURES, {'ENABLE_PERSISTENT_GRADES': True})
+    def test_grades_persisted(self):
+        grade_summary = grade(self.user, self.course)
+        self.assertEqual(grade_summary['percent'], 0.0)
+
+        course_grade = PersistentCourseGrade.objects.get(user=self.user, course_id=self.course.id)
+        self.assertEqual(course_grade.percent_grade, 0.0)
+        self.assertIsNone(course_grade.letter_grade)
+
+        subsection_grade = PersistentSubsectionGrade.objects.get(user=self.user, course_id=self.course.id)
+        self.assertEqual(subsection_grade.usage_key, self.sequence.location)
+
+    @patch.dict(settings.FEATURES, {'ENABLE_PERSISTENT_GRADES': True})
+    def test_persisted_grade_is_read(self):
+        computed_summary = grade(self.user, self.course)
+        with patch('courseware.grades.get_course_blocks') as mock_get_course_blocks:
+            persisted_summary = grade(self.user, self.course)
+        self.assertFalse(mock_get_course_blocks.called)
+        self.assertEqual(persisted_summary['percent'], computed_summary['percent'])
+        self.assertEqual(persisted_summary['section_breakdown'], computed_summary['section_breakdown'])
+        self.assertEqual(persisted_summary['totaled_scores'], computed_summary['totaled_scores'])
+
+    @patch.dict(settings.FEATURES, {'ENABLE_PERSISTENT_GRADES': True})
+    def test_score_change_updates_persisted_grades(self):
+        grade(self.user, self.course)
+        answer_problem(self.course, self.request, self.problem1)
+
+        subsection_grade = PersistentSubsectionGrade.objects.get(user=self.user, course_id=self.course.id)
+        self.assertEqual((subsection_grade.earned, subsection_grade.possible), (1.0, 2.0))
+
+        course_grade = PersistentCourseGrade.objects.get(user=self.user, course_id=self.course.id)
+        self.assertGreater(course_grade.percent_grade, 0.0)
+
+        # The incrementally updated grade matches a full recomputation.
+        PersistentCourseGrade.objects.filter(user=self.user).delete()
+        self.assertEqual(grade(self.user, self.course)['percent'], course_grade.percent_grade)
+
+    @patch.dict(settings.FEATURES, {'ENABLE_PERSISTENT_GRADES': True})
+    def test_score_change_without_persisted_grades(self):
+        answer_problem(self.course, self.request, self.problem1)
+        answer_problem(self.course, self.request, self.problem2)
+
+        subsection_grade = PersistentSubsectionGrade.objects.get(user=self.user, course_id=self.course.id)
+        self.assertEqual((subsection_grade.earned, subsection_grade.possible), (2.0, 2.0))
+        self.assertTrue(PersistentCourseGrade.objects.filter(user=self.user, course_id=self.course.id).exists())
+
+    @patch.dict(settings.FEATURES, {'ENABLE_PERSISTENT_GRADES': True})
+    def test_score_change_invalidates_grade_when_update_fails(self):
+        grade(self.user, self.course)
+        with patch('courseware.grades.update_persisted_grades', side_effect=Exception):
+            answer_problem(self.course, self.request, self.problem1)
+
+        self.assertFalse(PersistentCourseGrade.objects.filter(user=self.user, course_id=self.course.id).exists())
+        self.assertGreater(grade(self.user, self.course)['percent'], 0.0)
+
+    @patch.dict(settings.FEATURES, {'ENABLE_PERSISTENT_GRADES': True})
+    def test_update_regrades_subsection_when_course_grade_persisted(self):
+        grade(self.user, self.course)
+        # The score changes while the course grade of the user is persisted,
+        # as when the update for another score change persisted it first.
+        with patch('courseware.grades.invalidate_persisted_grades'):
+            answer_problem(self.course, self.request, self.problem1)
+
+        update_persisted_grades(self.user.id, self.course.id, self.problem1.location)
+
+        subsection_grade = PersistentSubsectionGrade.objects.get(user=self.user, course_id=self.course.id)
+        self.assertEqual((subsection_grade.earned, subsection_grade.possible), (1.0, 2.0))
+        course_grade = PersistentCourseGrade.objects.get(user=self.user, course_id=self.course.id)
+        self.assertGreater(course_grade.percent_grade, 0.0)
+
+    @patch.dict(settings.FEATURES, {'ENABLE_PERSISTENT_GRADES': True})
+    def test_grades_not_persisted_without_version(self):
+        with patch('courseware.grades._course_version', return_value=u''):
+            grade(self.user, self.course)
+            answer_problem(self.course, self.request, self.problem1)
+        self.assertFalse(PersistentCourseGrade.objects.filter(user=self.user).exists())
+        self.assertFalse(PersistentSubsectionGrade.objects.filter(user=self.user).exists())
+
+    def test_grades_version_includes_groups(self):
+        user_partition = MagicMock(id=0)
+        course = MagicMock(subtree_edited_on=datetime(2016, 6, 1), user_partitions=[user_partition])
+
+        user_partition.scheme.get_group_for_user.return_value = None
+        version_without_group = _grades_version(self.user, course)
+        user_partition.scheme.get_group_for_user.return_value = Group(1, 'Group 1')
+        version_in_group_1 = _grades_version(self.user, course)
+        user_partition.scheme.get_group_for_user.return_value = Group(2, 'Group 2')
+        version_in_group_2 = _grades_version(self.user, course)
+
+        self.assertEqual(len({version_without_group, version_in_group_1, version_in_group_2}), 3)
+        self.assertTrue(version_in_group_1.startswith(version_without_group))
+
+
 def answer_problem(course, request, problem, score=1):
     """
     Records a correct answer for the given problem.
@@ -283,6 +283,49 @@ class TestMissingStudentModule(TestCase):
             self.assertFalse(self.kvs.has(user_state_key('a_field')))
 
 
+@attr('shard_1')
+class TestUserStatePrefetch(TestCase):
+    """Tests for prefetching user_state ahead of adding descriptors to a FieldDataCache"""
+    # Tell Django to clean out all databases, not just default
+    multi_db = True
+
+    def setUp(self):
+        super(TestUserStatePrefetch, self).setUp()
+        student_module = StudentModuleFactory(state=json.dumps({'a_field': 'a_value'}))
+        self.user = student_module.student
+        self.assertEqual(self.user.id, 1)   # check our assumption hard-coded in the key functions above.
+
+        self.field_data_cache = FieldDataCache([], course_id, self.user)
+        self.kvs = DjangoKeyValueStore(self.field_data_cache)
+        self.user_state_cache = self.field_data_cache.cache[Scope.user_state]
+
+    def test_prefetched_state_is_not_read_again(self):
+        "Test that descriptors whose state was prefetched don't query for it"
+        with self.assertNumQueries(1):
+            self.field_data_cache.prefetch_user_state([location('usage_id'), location('other_usage_id')])
+
+        with self.assertNumQueries(0):
+            self.field_data_cache.add_descriptors_to_cache([mock_descriptor([mock_field(Scope.user_state, 'a_field')])])
+            self.assertEquals('a_value', self.kvs.get(user_state_key('a_field')))
+
+        self.assertEquals(2, self.user_state_cache.prefetched_count)
+        self.assertEquals(0, self.user_state_cache.lazily_fetched_count)
+
+    def test_missing_state_is_read_lazily(self):
+        "Test that descriptors whose state wasn't prefetched still load it, once"
+        self.field_data_cache.prefetch_user_state([location('other_usage_id')])
+        descriptor = mock_descriptor([mock_field(Scope.user_state, 'a_field')])
+
+        with self.assertNumQueries(1):
+            self.field_data_cache.add_descriptors_to_cache([descriptor])
+        with self.assertNumQueries(0):
+            self.field_data_cache.add_descriptors_to_cache([descriptor])
+            self.assertEquals('a_value', self.kvs.get(user_state_key('a_field')))
+
+        self.assertEquals(1, self.user_state_cache.prefetched_count)
+        self.assertEquals(1, self.user_state_cache.lazily_fetched_count)
+
+
 @attr('shard_1')
 class StorageTestBase(object):
     """
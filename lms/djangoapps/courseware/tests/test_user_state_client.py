@@ -4,13 +4,20 @@ defined in edx_user_state_client.
 """
 
 from collections import defaultdict
+import json
 from unittest import skip
 
+from django.db import DatabaseError
 from django.test import TestCase
+from django.test.utils import override_settings
+from mock import patch
+from opaque_keys.edx.locator import CourseLocator
 
 from edx_user_state_client.tests import UserStateClientTestBase
+from courseware.models import StudentModule
 from courseware.user_state_client import DjangoXBlockUserStateClient
 from courseware.tests.factories import UserFactory
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
 
 
 class TestDjangoUserStateClient(UserStateClientTestBase, TestCase):
@@ -67,3 +74,86 @@ class TestDjangoUserStateClient(UserStateClientTestBase, TestCase):
     @skip("Not supported by DjangoXBlockUserStateClient")
     def test_iter_course_many_users(self):
         pass
+
+
+@override_settings(USER_STATE_WRITE_BEHIND_FIELDS={'video': ['position']}, USER_STATE_WRITE_BEHIND_DELAY=30)
+class TestBufferedUserState(CacheIsolationTestCase):
+    """
+    Tests of the buffering of low-value state updates by the DjangoUserStateClient.
+    """
+    ENABLED_CACHES = ['default']
+    # Tell Django to clean out all databases, not just default
+    multi_db = True
+
+    def setUp(self):
+        super(TestBufferedUserState, self).setUp()
+        self.user = UserFactory.create()
+        self.client = DjangoXBlockUserStateClient(self.user)
+        self.block_key = CourseLocator('org', 'course', 'run').make_usage_key('video', 'video')
+
+        patcher = patch('courseware.tasks.flush_buffered_user_state.apply_async')
+        self.mock_flush = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _stored_state(self):
+        """
+        Return the state stored in the user's StudentModule.
+        """
+        return json.loads(StudentModule.objects.get(student=self.user).state)
+
+    def test_buffered_updates_are_coalesced(self):
+        self.client.set(self.user.username, self.block_key, {'position': 1})
+        self.client.set(self.user.username, self.block_key, {'position': 2})
+
+        self.assertFalse(StudentModule.objects.filter(student=self.user).exists())
+        self.assertEqual(self.client.get(self.user.username, self.block_key).state, {'position': 2})
+        self.mock_flush.assert_called_once_with((self.user.username,), countdown=30)
+
+        self.client.flush_buffered_state(self.user.username)
+        self.assertEqual(self._stored_state(), {'position': 2})
+
+    def test_buffered_updates_are_timestamped(self):
+        self.client.set(self.user.username, self.block_key, {'position': 1})
+        buffered = self.client.get(self.user.username, self.block_key)
+        self.assertIsNotNone(buffered.updated)
+
+        self.client.set(self.user.username, self.block_key, {'position': 2, 'attempts': 1})
+        self.client.set(self.user.username, self.block_key, {'position': 3})
+        updated = self.client.get(self.user.username, self.block_key).updated
+        self.assertGreaterEqual(updated, StudentModule.objects.get(student=self.user).modified)
+        self.assertGreaterEqual(updated, buffered.updated)
+
+    def test_other_updates_are_written_immediately(self):
+        self.client.set(self.user.username, self.block_key, {'position': 1})
+        self.client.set(self.user.username, self.block_key, {'position': 2, 'attempts': 1})
+        self.assertEqual(self._stored_state(), {'position': 2, 'attempts': 1})
+
+        # The buffered update was written along with the other field.
+        self.client.set(self.user.username, self.block_key, {'attempts': 2})
+        self.client.flush_buffered_state(self.user.username)
+        self.assertEqual(self._stored_state(), {'position': 2, 'attempts': 2})
+
+    def test_deleted_fields_are_not_flushed(self):
+        self.client.set(self.user.username, self.block_key, {'position': 1})
+        self.client.delete(self.user.username, self.block_key, fields=['position'])
+        self.client.flush_buffered_state(self.user.username)
+
+        self.assertFalse(StudentModule.objects.filter(student=self.user).exists())
+
+    def test_deleted_modules_are_not_flushed(self):
+        self.client.set(self.user.username, self.block_key, {'position': 1, 'attempts': 1})
+        self.client.set(self.user.username, self.block_key, {'position': 2})
+        StudentModule.objects.get(student=self.user).delete()
+        self.client.flush_buffered_state(self.user.username)
+
+        self.assertFalse(StudentModule.objects.filter(student=self.user).exists())
+
+    def test_failed_flush_keeps_updates_buffered(self):
+        self.client.set(self.user.username, self.block_key, {'position': 1})
+        with patch.object(DjangoXBlockUserStateClient, '_write_many', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.client.flush_buffered_state(self.user.username)
+        self.assertEqual(self.client.get(self.user.username, self.block_key).state, {'position': 1})
+
+        self.client.flush_buffered_state(self.user.username)
+        self.assertEqual(self._stored_state(), {'position': 1})
@@ -4,8 +4,10 @@ data in a Django ORM model.
 """
 
 import itertools
+from contextlib import contextmanager
 from operator import attrgetter
-from time import time
+from time import sleep, time
+from uuid import uuid4
 
 try:
     import simplejson as json
@@ -13,12 +15,117 @@ except ImportError:
     import json
 
 import dogstats_wrapper as dog_stats_api
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
 from xblock.fields import Scope
 from courseware.models import StudentModule, BaseStudentModuleHistory
 from edx_user_state_client.interface import XBlockUserStateClient, XBlockUserState
 
 
+# How long buffered state updates are kept in the cache if they can't be
+# flushed, e.g. while the celery workers are down.
+BUFFERED_STATE_TIMEOUT = 24 * 60 * 60
+
+# How many seconds the lock on the state updates buffered for a user is held
+# at most, e.g. if its holder dies, and waited for at most.
+BUFFERED_STATE_LOCK_TIMEOUT = 2
+
+
+def _buffered_state_cache_key(username):
+    """
+    Return the cache key of the state updates buffered for ``username``.
+    They're cached as a dict mapping each block's UsageKey to a tuple of
+    its buffered state dict and the time it was last updated.
+    """
+    return u'courseware.user_state_buffer.{}'.format(username)
+
+
+def _flush_scheduled_cache_key(username):
+    """
+    Return the cache key that is set while a flush of the state updates
+    buffered for ``username`` is scheduled.
+    """
+    return u'courseware.user_state_buffer.{}.scheduled'.format(username)
+
+
+def _buffered_state_lock_cache_key(username):
+    """
+    Return the cache key of the lock on the state updates buffered for
+    ``username``.
+    """
+    return u'courseware.user_state_buffer.{}.lock'.format(username)
+
+
+@contextmanager
+def _buffered_state_lock(username):
+    """
+    Hold the lock on the state updates buffered for ``username``, so that
+    they can be read and written back without losing concurrent updates.
+    """
+    lock_key = _buffered_state_lock_cache_key(username)
+    token = uuid4().hex
+    deadline = time() + BUFFERED_STATE_LOCK_TIMEOUT
+    while not cache.add(lock_key, token, BUFFERED_STATE_LOCK_TIMEOUT):
+        if time() > deadline:
+            # The lock outlived its timeout, so its holder must be gone.
+            cache.set(lock_key, token, BUFFERED_STATE_LOCK_TIMEOUT)
+            break
+        sleep(0.01)
+    try:
+        yield
+    finally:
+        # Don't release a lock that expired and was acquired by someone else.
+        if cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+
+def discard_buffered_state(username, block_keys, fields=None):
+    """
+    Discard the buffered updates of ``fields`` (or of all fields if
+    ``fields`` is None) of ``block_keys`` for ``username``, so that
+    deleted fields aren't written again by the next flush.
+    """
+    if not getattr(settings, 'USER_STATE_WRITE_BEHIND_FIELDS', None):
+        return
+
+    cache_key = _buffered_state_cache_key(username)
+    with _buffered_state_lock(username):
+        pending = cache.get(cache_key)
+        if not pending:
+            return
+
+        discarded = False
+        for usage_key in block_keys:
+            if usage_key not in pending:
+                continue
+            buffered_state, _ = pending[usage_key]
+            for field in (buffered_state.keys() if fields is None else fields):
+                if field in buffered_state:
+                    del buffered_state[field]
+                    discarded = True
+            if not buffered_state:
+                del pending[usage_key]
+        if discarded:
+            cache.set(cache_key, pending, BUFFERED_STATE_TIMEOUT)
+
+
+def _select_fields(state, fields):
+    """
+    Return the items of ``state`` named in ``fields``, or all of them if
+    ``fields`` is None.
+    """
+    if fields is None:
+        return state
+    return {
+        field: state[field]
+        for field in fields
+        if field in state
+    }
+
+
 class DjangoXBlockUserStateClient(XBlockUserStateClient):
     """
     An interface that uses the Django ORM StudentModule as a backend.
@@ -138,6 +245,8 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
         self._ddog_histogram(evt_time, 'get_many.blks_requested', len(block_keys))
 
+        buffered_state = self._get_buffered_state(username, block_keys)
+
         modules = self._get_student_modules(username, block_keys)
         for module, usage_key in modules:
             if module.state is None:
@@ -149,19 +258,24 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
             self._ddog_histogram(evt_time, 'get_many.block_size', len(module.state))
 
+            # Updates that haven't been flushed yet are newer than the stored state.
+            modified = module.modified
+            if usage_key in buffered_state:
+                buffered, modified = buffered_state.pop(usage_key)
+                state.update(buffered)
+
             # If the state is the empty dict, then it has been deleted, and so
             # conformant UserStateClients should treat it as if it doesn't exist.
             if state == {}:
                 continue
 
-            if fields is not None:
-                state = {
-                    field: state[field]
-                    for field in fields
-                    if field in state
-                }
             block_count += 1
-            yield XBlockUserState(username, usage_key, state, module.modified, scope)
+            yield XBlockUserState(username, usage_key, _select_fields(state, fields), modified, scope)
+
+        # Blocks whose only state is still buffered.
+        for usage_key, (state, updated) in buffered_state.iteritems():
+            block_count += 1
+            yield XBlockUserState(username, usage_key, _select_fields(state, fields), updated, scope)
 
         # The rest of this method exists only to submit DataDog events.
         # Remove it once we're no longer interested in the data.
@@ -198,10 +312,24 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
             # what we have.
             return
 
+        block_keys_to_state = self._buffer_updates(user, block_keys_to_state)
+        self._write_many(user, block_keys_to_state)
+
+    def _write_many(self, user, block_keys_to_state, lock=False):
+        """
+        Write the state dicts in ``block_keys_to_state`` over the stored
+        state of ``user``'s blocks. If ``lock`` is True, the stored state is
+        read with SELECT ... FOR UPDATE, so it can't change before it's
+        written back; this must be called in a transaction then.
+        """
         evt_time = time()
 
+        student_modules = StudentModule.objects
+        if lock:
+            student_modules = student_modules.select_for_update()
+
         for usage_key, state in block_keys_to_state.items():
-            student_module, created = StudentModule.objects.get_or_create(
+            student_module, created = student_modules.get_or_create(
                 student=user,
                 course_id=usage_key.course_key,
                 module_state_key=usage_key,
@@ -271,6 +399,8 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
         self._ddog_histogram(evt_time, 'delete_many.block_count', len(block_keys))
 
+        discard_buffered_state(username, block_keys, fields)
+
         student_modules = self._get_student_modules(username, block_keys)
         for student_module, _ in student_modules:
             if fields is None:
@@ -290,6 +420,113 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         finish_time = time()
         self._ddog_histogram(evt_time, 'delete_many.response_time', (finish_time - evt_time) * 1000)
 
+    def _buffer_updates(self, user, block_keys_to_state):
+        """
+        Buffer the updates in ``block_keys_to_state`` that only set fields
+        listed in settings.USER_STATE_WRITE_BEHIND_FIELDS, and schedule a
+        flush of them. Returns the updates that must be written now.
+
+        The buffered state of the blocks that are written now is written
+        along with them, so that it can't later overwrite newer values.
+        """
+        buffered_fields = getattr(settings, 'USER_STATE_WRITE_BEHIND_FIELDS', None)
+        if not buffered_fields:
+            return block_keys_to_state
+
+        to_buffer = {}
+        to_write = {}
+        for usage_key, state in block_keys_to_state.items():
+            if state and set(state).issubset(buffered_fields.get(usage_key.block_type, ())):
+                to_buffer[usage_key] = state
+            else:
+                to_write[usage_key] = state
+
+        cache_key = _buffered_state_cache_key(user.username)
+        with _buffered_state_lock(user.username):
+            pending = cache.get(cache_key)
+            if not pending and not to_buffer:
+                return to_write
+
+            pending = pending or {}
+            pending_size = len(pending)
+            for usage_key, state in to_write.items():
+                if usage_key in pending:
+                    buffered_state, _ = pending.pop(usage_key)
+                    buffered_state.update(state)
+                    to_write[usage_key] = buffered_state
+            updated = timezone.now()
+            for usage_key, state in to_buffer.items():
+                buffered_state, _ = pending.get(usage_key, ({}, None))
+                buffered_state.update(state)
+                pending[usage_key] = (buffered_state, updated)
+
+            if to_buffer or len(pending) != pending_size:
+                cache.set(cache_key, pending, BUFFERED_STATE_TIMEOUT)
+
+        if to_buffer:
+            self._ddog_histogram(time(), 'set_many.blks_buffered', len(to_buffer))
+            delay = settings.USER_STATE_WRITE_BEHIND_DELAY
+            if cache.add(_flush_scheduled_cache_key(user.username), True, delay):
+                from courseware.tasks import flush_buffered_user_state
+                flush_buffered_user_state.apply_async((user.username,), countdown=delay)
+
+        return to_write
+
+    def _get_buffered_state(self, username, block_keys):
+        """
+        Return a dict mapping those of ``block_keys`` that have buffered
+        updates for ``username`` to tuples of the buffered state dicts and
+        the times they were last updated.
+        """
+        if not getattr(settings, 'USER_STATE_WRITE_BEHIND_FIELDS', None):
+            return {}
+
+        pending = cache.get(_buffered_state_cache_key(username))
+        if not pending:
+            return {}
+
+        return {
+            usage_key: (dict(pending[usage_key][0]), pending[usage_key][1])
+            for usage_key in block_keys
+            if usage_key in pending
+        }
+
+    def flush_buffered_state(self, username):
+        """
+        Write the state updates buffered for ``username`` to the database,
+        in one transaction that locks the StudentModules it updates, so that
+        concurrent writes of their state aren't lost.
+        """
+        cache_key = _buffered_state_cache_key(username)
+        # Updates buffered from now on schedule another flush.
+        cache.delete(_flush_scheduled_cache_key(username))
+        with _buffered_state_lock(username):
+            pending = cache.get(cache_key)
+            if not pending:
+                return
+            cache.delete(cache_key)
+
+        try:
+            user = User.objects.get(username=username)
+            with transaction.atomic():
+                self._write_many(
+                    user,
+                    {usage_key: state for usage_key, (state, _) in pending.iteritems()},
+                    lock=True,
+                )
+        except Exception:
+            # Buffer the updates again, under those buffered since, so that
+            # the next flush writes them.
+            with _buffered_state_lock(username):
+                for usage_key, (state, updated) in (cache.get(cache_key) or {}).iteritems():
+                    buffered_state, _ = pending.get(usage_key, ({}, None))
+                    buffered_state.update(state)
+                    pending[usage_key] = (buffered_state, updated)
+                cache.set(cache_key, pending, BUFFERED_STATE_TIMEOUT)
+            raise
+
+        self._ddog_histogram(time(), 'flush_buffered_state.blks_flushed', len(pending))
+
     def get_history(self, username, block_key, scope=Scope.user_state):
         """
         Retrieve history of state changes for a given block for a given
@@ -25,6 +25,7 @@ import urllib
 from lang_pref import LANGUAGE_KEY
 from xblock.fragment import Fragment
 from opaque_keys.edx.keys import CourseKey
+from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
 from openedx.core.lib.gating import api as gating_api
 from openedx.core.lib.time_zone_utils import get_user_time_zone
 from openedx.core.djangoapps.user_api.preferences.api import get_user_preference
@@ -341,9 +342,13 @@ class CoursewareIndex(View):
         Prefetches all descendant data for the requested section and
         sets up the runtime, which binds the request user to the section.
         """
-        self.field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
-            self.course_key, self.effective_user, self.course, depth=CONTENT_DEPTH,
-        )
+        self.field_data_cache = FieldDataCache([], self.course_key, self.effective_user)
+        if settings.FEATURES.get('ENABLE_COURSEWARE_USER_STATE_PREFETCH'):
+            # The course outline, the table of contents and the section
+            # rendered below all read from this cache, so load the state of
+            # all of the course's blocks at once.
+            self.field_data_cache.prefetch_user_state(get_course_in_cache(self.course_key).get_block_keys())
+        self.field_data_cache.add_descriptor_descendents(self.course, depth=CONTENT_DEPTH)
 
         self.course = get_module_for_descriptor(
             self.effective_user,
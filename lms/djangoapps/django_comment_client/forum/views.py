@@ -194,10 +194,12 @@ def inline_discussion(request, course_key, discussion_id):
 
     course = get_course_with_access(request.user, 'load', course_key, check_if_enrolled=True)
     cc_user = cc.User.from_django_user(request.user)
-    user_info = cc_user.to_dict()
 
     try:
-        threads, query_params = get_threads(request, course, discussion_id, per_page=INLINE_THREADS_PER_PAGE)
+        (threads, query_params), user_info = cc.utils.perform_concurrently(
+            lambda: get_threads(request, course, discussion_id, per_page=INLINE_THREADS_PER_PAGE),
+            cc_user.to_dict,
+        )
     except ValueError:
         return HttpResponseBadRequest("Invalid group_id")
 
@@ -231,10 +233,12 @@ def forum_form_discussion(request, course_key):
     course_settings = make_course_settings(course, request.user)
 
     user = cc.User.from_django_user(request.user)
-    user_info = user.to_dict()
 
     try:
-        unsafethreads, query_params = get_threads(request, course)   # This might process a search query
+        (unsafethreads, query_params), user_info = cc.utils.perform_concurrently(
+            lambda: get_threads(request, course),   # This might process a search query
+            user.to_dict,
+        )
         is_staff = has_permission(request.user, 'openclose_thread', course.id)
         threads = [utils.prepare_content(thread, course_key, is_staff) for thread in unsafethreads]
     except cc.utils.CommentClientMaintenanceError:
@@ -305,18 +309,22 @@ def single_thread(request, course_key, discussion_id, thread_id):
     course = get_course_with_access(request.user, 'load', course_key, check_if_enrolled=True)
     course_settings = make_course_settings(course, request.user)
     cc_user = cc.User.from_django_user(request.user)
-    user_info = cc_user.to_dict()
     is_moderator = has_permission(request.user, "see_all_cohorts", course_key)
 
     # Currently, the front end always loads responses via AJAX, even for this
     # page; it would be a nice optimization to avoid that extra round trip to
     # the comments service.
+    thread = cc.Thread.find(thread_id)
+    retrieve_params = {
+        'recursive': request.is_ajax(),
+        'user_id': request.user.id,
+        'response_skip': request.GET.get("resp_skip"),
+        'response_limit': request.GET.get("resp_limit"),
+    }
     try:
-        thread = cc.Thread.find(thread_id).retrieve(
-            recursive=request.is_ajax(),
-            user_id=request.user.id,
-            response_skip=request.GET.get("resp_skip"),
-            response_limit=request.GET.get("resp_limit")
+        user_info, thread = cc.utils.perform_concurrently(
+            cc_user.to_dict,
+            lambda: thread.retrieve(**retrieve_params),
         )
     except cc.utils.CommentClientRequestError as e:
         if e.status_code == 404:
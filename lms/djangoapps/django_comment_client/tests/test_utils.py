@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import datetime
 import json
+import threading
 import ddt
 import mock
 from nose.plugins.attrib import attr
@@ -9,6 +10,8 @@ from django.utils.timezone import UTC as django_utc
 
 from django.core.urlresolvers import reverse
 from django.test import TestCase, RequestFactory
+from django.test.utils import override_settings
+from django.utils import translation
 from edxmako import add_lookup
 
 from django_comment_client.tests.factories import RoleFactory
@@ -30,6 +33,7 @@ from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase, TEST_DAT
 from xmodule.modulestore.django import modulestore
 from opaque_keys.edx.locator import CourseLocator
 from lms.djangoapps.teams.tests.factories import CourseTeamFactory
+import lms.lib.comment_client.utils as cc_utils
 
 
 @attr('shard_1')
@@ -1418,3 +1422,77 @@ class PermissionsTestCase(ModuleStoreTestCase):
         # content has no known author
         del content['user_id']
         self.assertFalse(utils.is_content_authored_by(content, user))
+
+
+@attr('shard_1')
+@ddt.ddt
+class PerformConcurrentlyTestCase(TestCase):
+    """
+    Test the `perform_concurrently` comment client utility function.
+    """
+
+    @ddt.data(False, True)
+    def test_results(self, pooling_enabled):
+        with mock.patch.dict('django.conf.settings.FEATURES', {'ENABLE_FORUM_REQUEST_POOLING': pooling_enabled}):
+            results = cc_utils.perform_concurrently(
+                lambda: 'first',
+                lambda: threading.current_thread(),
+                lambda: 'last',
+            )
+        self.assertEqual(results[0], 'first')
+        self.assertEqual(results[2], 'last')
+        self.assertEqual(results[1] is threading.current_thread(), not pooling_enabled)
+
+    @ddt.data(False, True)
+    def test_first_exception_raised(self, pooling_enabled):
+        def raise_error(message):
+            """
+            Raises a ValueError with the given message.
+            """
+            raise ValueError(message)
+
+        with mock.patch.dict('django.conf.settings.FEATURES', {'ENABLE_FORUM_REQUEST_POOLING': pooling_enabled}):
+            with self.assertRaisesRegexp(ValueError, 'second'):
+                cc_utils.perform_concurrently(
+                    lambda: 'first',
+                    lambda: raise_error('second'),
+                    lambda: raise_error('third'),
+                )
+
+    @mock.patch.dict('django.conf.settings.FEATURES', {'ENABLE_FORUM_REQUEST_POOLING': True})
+    @mock.patch('lms.lib.comment_client.utils._WORKER_POOL', None)
+    def test_worker_pool_reused(self):
+        with override_settings(COMMENTS_SERVICE_CONCURRENCY=1):
+            worker_pool = cc_utils.get_worker_pool()
+            first_results = cc_utils.perform_concurrently(
+                lambda: None,
+                threading.current_thread,
+                threading.current_thread,
+            )
+            second_results = cc_utils.perform_concurrently(
+                lambda: None,
+                threading.current_thread,
+            )
+        # The functions were all called in the single thread of the pool.
+        self.assertIs(cc_utils.get_worker_pool(), worker_pool)
+        self.assertIsNot(first_results[1], threading.current_thread())
+        self.assertIs(first_results[1], first_results[2])
+        self.assertIs(first_results[1], second_results[1])
+
+    @mock.patch.dict('django.conf.settings.FEATURES', {'ENABLE_FORUM_REQUEST_POOLING': True})
+    @mock.patch('lms.lib.comment_client.utils.get_session')
+    def test_pooled_requests(self, mock_get_session):
+        mock_request = mock_get_session.return_value.request
+        mock_request.return_value.status_code = 200
+        mock_request.return_value.json.return_value = {}
+        with translation.override('eo'):
+            cc_utils.perform_concurrently(
+                lambda: cc_utils.perform_request('get', 'http://localhost/first'),
+                lambda: cc_utils.perform_request('get', 'http://localhost/second'),
+            )
+        self.assertEqual(
+            sorted(call_args[0][1] for call_args in mock_request.call_args_list),
+            ['http://localhost/first', 'http://localhost/second'],
+        )
+        for call_args in mock_request.call_args_list:
+            self.assertEqual(call_args[1]['headers']['Accept-Language'], 'eo')
@@ -14,6 +14,7 @@ from django.utils.translation import override as override_language
 
 from course_modes.models import CourseMode
 from student.models import CourseEnrollment, CourseEnrollmentAllowed
+from courseware.grades import invalidate_persisted_grades
 from courseware.models import StudentModule
 from edxmako.shortcuts import render_to_string
 from lang_pref import LANGUAGE_KEY
@@ -268,6 +269,8 @@ def reset_student_attempts(course_id, student, module_state_key, requesting_user
 
     if delete_module:
         module_to_reset.delete()
+        # The score reset above was handled while the module still existed.
+        invalidate_persisted_grades(student.id, course_id, module_state_key)
     else:
         _reset_module_attempts(module_to_reset)
 
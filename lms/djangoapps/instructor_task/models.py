@@ -12,15 +12,19 @@ file and check it in at the same time as your model changes. To do that,
 ASSUMPTIONS: modules have unique IDs, even across different module_types
 
 """
+from contextlib import contextmanager
 from cStringIO import StringIO
 from gzip import GzipFile
 from uuid import uuid4
 import csv
+import errno
 import json
 import hashlib
 import os.path
+import tempfile
 import urllib
 
+from boto.exception import S3ResponseError
 from boto.s3.connection import S3Connection
 from boto.s3.key import Key
 
@@ -179,12 +183,19 @@ class InstructorTask(models.Model):
         return json.dumps({'message': 'Task revoked before running'})
 
 
+class ReportNotFoundError(Exception):
+    """
+    Raised when reading a file that isn't stored in a ReportStore.
+    """
+    pass
+
+
 class ReportStore(object):
     """
     Simple abstraction layer that can fetch and store CSV files for reports
-    download. Should probably refactor later to create a ReportFile object that
-    can simply be appended to for the sake of memory efficiency, rather than
-    passing in the whole dataset. Doing that for now just because it's simpler.
+    download. CSV rows are streamed to the underlying storage as they are
+    produced, so reports can be generated without holding all their rows in
+    memory.
     """
     @classmethod
     def from_config(cls, config_name):
@@ -207,6 +218,57 @@ class ReportStore(object):
         for row in rows:
             yield [unicode(item).encode('utf-8') for item in row]
 
+    def _get_utf8_decoded_rows(self, rows):
+        """
+        Given an iterable of `rows` read from a CSV file (utf-8 encoded), yield
+        the rows with their strings decoded to unicode.
+        """
+        for row in rows:
+            yield [item.decode('utf-8') for item in row]
+
+
+class _MultipartUploadFile(object):
+    """
+    Write-only file-like object that uploads the data written to it as the
+    parts of an S3 multipart upload, buffering at most one part in memory.
+    """
+    def __init__(self, multipart_upload, part_size):
+        self.multipart_upload = multipart_upload
+        self.part_size = part_size
+        self.buffer = StringIO()
+        self.num_parts = 0
+
+    def write(self, data):
+        """
+        Buffer `data`, uploading the buffer as a part once it is large enough.
+        """
+        self.buffer.write(data)
+        if self.buffer.tell() >= self.part_size:
+            self._upload_part()
+
+    def flush(self):
+        """
+        Nothing to do: data is only uploaded in whole parts.
+        """
+        pass
+
+    def close(self):
+        """
+        Upload the remaining data and complete the multipart upload.
+        """
+        if self.buffer.tell() or not self.num_parts:
+            self._upload_part()
+        self.multipart_upload.complete_upload()
+
+    def _upload_part(self):
+        """
+        Upload the buffered data as the next part.
+        """
+        self.num_parts += 1
+        self.buffer.seek(0)
+        self.multipart_upload.upload_part_from_file(self.buffer, self.num_parts)
+        self.buffer = StringIO()
+
 
 class S3ReportStore(ReportStore):
     """
@@ -220,6 +282,10 @@ class S3ReportStore(ReportStore):
     conventions on where files are stored to know what to display. Clients using
     this class can name the final file whatever they want.
     """
+    # Size of the parts of multipart uploads. S3 requires every part but the
+    # last one to be at least 5MB.
+    MULTIPART_UPLOAD_PART_SIZE = 5 * 1024 * 1024
+
     def __init__(self, bucket_name, root_path):
         self.root_path = root_path
 
@@ -302,19 +368,64 @@ class S3ReportStore(ReportStore):
     def store_rows(self, course_id, filename, rows):
         """
         Given a `course_id`, `filename`, and `rows` (each row is an iterable of
-        strings), create a buffer that is a gzip'd csv file, and then `store()`
-        that buffer.
+        strings), stream a gzip'd csv file to S3 as a multipart upload. `rows`
+        may be any iterable, e.g. a generator; rows are compressed and uploaded
+        in parts of MULTIPART_UPLOAD_PART_SIZE bytes as they are produced, so
+        memory use does not depend on the size of the report.
 
         Even though we store it in gzip format, browsers will transparently
         download and decompress it. Filenames should end in `.csv`, not `.gz`.
         """
-        output_buffer = StringIO()
-        gzip_file = GzipFile(fileobj=output_buffer, mode="wb")
-        csvwriter = csv.writer(gzip_file)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
-        gzip_file.close()
+        key = self.key_for(course_id, filename)
+        multipart_upload = self.bucket.initiate_multipart_upload(
+            key.key,
+            headers={
+                "Content-Encoding": "gzip",
+                "Content-Type": "text/csv",
+            }
+        )
+        try:
+            upload_file = _MultipartUploadFile(multipart_upload, self.MULTIPART_UPLOAD_PART_SIZE)
+            gzip_file = GzipFile(fileobj=upload_file, mode="wb")
+            csvwriter = csv.writer(gzip_file)
+            for row in self._get_utf8_encoded_rows(rows):
+                csvwriter.writerow(row)
+            gzip_file.close()
+            upload_file.close()
+        except Exception:
+            multipart_upload.cancel_upload()
+            raise
+
+    def read_rows(self, course_id, filename):
+        """
+        Yield the rows (lists of unicode strings) of the gzip'd csv file that
+        was stored with `store_rows()` under `course_id` and `filename`.
+        Raises ReportNotFoundError if there is no such file.
+        """
+        key = self.key_for(course_id, filename)
+        try:
+            contents = key.get_contents_as_string()
+        except S3ResponseError as error:
+            if error.status == 404:
+                raise ReportNotFoundError(key.key)
+            raise
+        gzip_file = GzipFile(fileobj=StringIO(contents), mode="rb")
+        for row in self._get_utf8_decoded_rows(csv.reader(gzip_file)):
+            yield row
+
+    def delete(self, course_id, filename):
+        """
+        Delete the file stored under `course_id` and `filename`.
+        """
+        self.key_for(course_id, filename).delete()
 
-        self.store(course_id, filename, output_buffer)
+    def partials_store(self):
+        """
+        Return a store for intermediate files, e.g. the parts of a report that
+        is generated by several subtasks. Files in it are not listed by
+        `links_for()` on this store.
+        """
+        return S3ReportStore(self.bucket.name, "{}/partials".format(self.root_path))
 
     def links_for(self, course_id):
         """
@@ -372,24 +483,72 @@ class LocalFSReportStore(ReportStore):
         assumed to be a StringIO objecd (or anything that can flush its contents
         to string using `.getvalue()`).
         """
+        with self._open_for_writing(course_id, filename) as f:
+            f.write(buff.getvalue())
+
+    def store_rows(self, course_id, filename, rows):
+        """
+        Given a course_id, filename, and rows (each row is an iterable of strings),
+        write this data out. `rows` may be any iterable, e.g. a generator; rows
+        are written to the file as they are produced.
+        """
+        with self._open_for_writing(course_id, filename) as f:
+            csvwriter = csv.writer(f)
+            for row in self._get_utf8_encoded_rows(rows):
+                csvwriter.writerow(row)
+
+    @contextmanager
+    def _open_for_writing(self, course_id, filename):
+        """
+        Open a file to write the contents of the file under `course_id` and
+        `filename` to. It is a hidden temporary file, which replaces that file
+        once it is completely written, so that partial files are never listed.
+        """
         full_path = self.path_to(course_id, filename)
         directory = os.path.dirname(full_path)
         if not os.path.exists(directory):
             os.mkdir(directory)
 
-        with open(full_path, "wb") as f:
-            f.write(buff.getvalue())
-
-    def store_rows(self, course_id, filename, rows):
+        temp_file = tempfile.NamedTemporaryFile(dir=directory, prefix='.', suffix='.tmp', delete=False)
+        try:
+            with temp_file:
+                yield temp_file
+            os.chmod(temp_file.name, 0o644)
+            os.rename(temp_file.name, full_path)
+        except Exception:
+            os.remove(temp_file.name)
+            raise
+
+    def read_rows(self, course_id, filename):
         """
-        Given a course_id, filename, and rows (each row is an iterable of strings),
-        write this data out.
+        Yield the rows (lists of unicode strings) of the csv file that was
+        stored with `store_rows()` under `course_id` and `filename`.
+        Raises ReportNotFoundError if there is no such file.
         """
-        output_buffer = StringIO()
-        csvwriter = csv.writer(output_buffer)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
+        full_path = self.path_to(course_id, filename)
+        try:
+            f = open(full_path, "rb")
+        except IOError as error:
+            if error.errno == errno.ENOENT:
+                raise ReportNotFoundError(full_path)
+            raise
+        with f:
+            for row in self._get_utf8_decoded_rows(csv.reader(f)):
+                yield row
+
+    def delete(self, course_id, filename):
+        """
+        Delete the file stored under `course_id` and `filename`.
+        """
+        os.remove(self.path_to(course_id, filename))
 
-        self.store(course_id, filename, output_buffer)
+    def partials_store(self):
+        """
+        Return a store for intermediate files, e.g. the parts of a report that
+        is generated by several subtasks. Files in it are not listed by
+        `links_for()` on this store.
+        """
+        return LocalFSReportStore(os.path.join(self.root_path, "partials"))
 
     def links_for(self, course_id):
         """
@@ -402,7 +561,12 @@ class LocalFSReportStore(ReportStore):
         course_dir = self.path_to(course_id, '')
         if not os.path.exists(course_dir):
             return []
-        files = [(filename, os.path.join(course_dir, filename)) for filename in os.listdir(course_dir)]
+        files = [
+            (filename, os.path.join(course_dir, filename))
+            for filename in os.listdir(course_dir)
+            # Files being written are hidden.
+            if not filename.startswith('.')
+        ]
         files.sort(key=lambda (filename, full_path): os.path.getmtime(full_path), reverse=True)
 
         return [
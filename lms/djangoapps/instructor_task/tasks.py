@@ -20,6 +20,7 @@ of the query for traversing StudentModule objects.
 
 """
 import logging
+import traceback
 from functools import partial
 
 from django.conf import settings
@@ -37,6 +38,9 @@ from instructor_task.tasks_helper import (
     upload_problem_responses_csv,
     upload_grades_csv,
     upload_problem_grade_report,
+    perform_grade_report_subtask,
+    perform_grade_report_merge,
+    fail_grade_report_merge,
     upload_students_csv,
     cohort_students_and_upload,
     upload_enrollment_report,
@@ -193,6 +197,38 @@ def calculate_problem_grade_report(entry_id, xmodule_instance_args):
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def grade_report_subtask(entry_id, report_name, part_index, student_ids, subtask_status_dict):
+    """
+    Generate the part of a grade report (`report_name` is 'grade_report' or
+    'problem_grade_report') containing the given students, as one of the
+    subtasks queued by `calculate_grades_csv` or
+    `calculate_problem_grade_report`. The last subtask to complete queues
+    the merge of the parts into the final report.
+    """
+    return perform_grade_report_subtask(entry_id, report_name, part_index, student_ids, subtask_status_dict)
+
+
+@task(  # pylint: disable=not-callable
+    routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+    default_retry_delay=settings.GRADE_REPORT_MERGE_RETRY_DELAY,
+    max_retries=settings.GRADE_REPORT_MERGE_MAX_RETRIES,
+)
+def merge_grade_report_parts(entry_id, report_name):
+    """
+    Merge the parts of a grade report generated by `grade_report_subtask`s
+    into the final report, once they have all completed.  The merge is
+    retried if it fails, after which the report's task is marked as failed.
+    """
+    try:
+        perform_grade_report_merge(entry_id, report_name)
+    except Exception as exc:  # pylint: disable=broad-except
+        if merge_grade_report_parts.request.retries >= merge_grade_report_parts.max_retries:
+            fail_grade_report_merge(entry_id, exc, traceback.format_exc())
+            raise
+        raise merge_grade_report_parts.retry(exc=exc)
+
+
 @task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
 def calculate_students_features_csv(entry_id, xmodule_instance_args):
     """
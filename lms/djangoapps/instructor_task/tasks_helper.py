@@ -9,7 +9,7 @@ from collections import OrderedDict
 from datetime import datetime
 from django.conf import settings
 from eventtracking import tracker
-from itertools import chain
+from itertools import chain, islice
 from time import time
 import unicodecsv
 import logging
@@ -44,7 +44,7 @@ from certificates.models import (
     CertificateStatuses,
     GeneratedCertificate
 )
-from certificates.api import generate_user_certificates
+from certificates.api import generate_certificates_for_students
 from courseware.courses import get_course_by_id, get_problems_in_section
 from courseware.grades import iterate_grades_for
 from courseware.models import StudentModule
@@ -58,7 +58,13 @@ from instructor_analytics.basic import (
 )
 from instructor_analytics.csvs import format_dictlist
 from openassessment.data import OraAggregateData
-from instructor_task.models import ReportStore, InstructorTask, PROGRESS
+from instructor_task.models import ReportNotFoundError, ReportStore, InstructorTask, PROGRESS
+from instructor_task.subtasks import (
+    SubtaskStatus,
+    check_subtask_is_valid,
+    queue_subtasks_for_query,
+    update_subtask_status,
+)
 from lms.djangoapps.lms_xblock.runtime import LmsPartitionService
 from openedx.core.djangoapps.course_groups.cohorts import get_cohort
 from openedx.core.djangoapps.course_groups.models import CourseUserGroup
@@ -611,6 +617,9 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
                 [row1_colum1, row1_colum2, ...],
                 ...
             ]
+            This may be any iterable, e.g. a generator: rows are written to
+            the report store as they are produced, so the whole report never
+            needs to be held in memory.
         csv_name: Name of the resulting CSV
         course_id: ID of the course
     """
@@ -666,13 +675,19 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     buffered, so we'll never write part of a CSV file to S3 -- i.e. any files
     that are visible in ReportStore will be complete ones.
 
+    If grade report subtasks are enabled, the students are instead split into
+    chunks that are graded by `grade_report_subtask`s, and the resulting
+    partial CSVs are merged by the last subtask to complete.
+
     As we start to add more CSV downloads, it will probably be worthwhile to
     make a more general CSVDoc class instead of building out the rows like we
     do here.
     """
+    if settings.FEATURES.get('ENABLE_GRADE_REPORT_SUBTASKS'):
+        return queue_grade_report_subtasks(_entry_id, course_id, action_name, 'grade_report')
+
     start_time = time()
     start_date = datetime.now(UTC)
-    status_interval = 100
     enrolled_students = CourseEnrollment.objects.users_enrolled_in(course_id)
     task_progress = TaskProgress(action_name, enrolled_students.count(), start_time)
 
@@ -685,6 +700,46 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     )
     TASK_LOG.info(u'%s, Task type: %s, Starting task execution', task_info_string, action_name)
 
+    err_rows = []
+    rows = _compute_grade_report_rows(
+        course_id, enrolled_students, task_progress, err_rows, task_info_string, action_name
+    )
+
+    # Students are graded while their rows are streamed to the report store.
+    current_step = {'step': 'Calculating Grades and Uploading CSVs'}
+    TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
+
+    # Perform the actual upload
+    upload_csv_to_report_store(rows, 'grade_report', course_id, start_date)
+    current_step = {'step': 'Uploading CSVs'}
+    task_progress.update_task_state(extra_meta=current_step)
+
+    # If there are any error rows (don't count the header), write them out as well
+    if len(err_rows) > 1:
+        upload_csv_to_report_store(err_rows, 'grade_report_err', course_id, start_date)
+
+    # One last update before we close out...
+    TASK_LOG.info(u'%s, Task type: %s, Finalizing grade task', task_info_string, action_name)
+    return task_progress.update_task_state(extra_meta=current_step)
+
+
+def _compute_grade_report_rows(course_id, students, task_progress, err_rows, task_info_string, action_name):
+    """
+    Return a generator of the grade report rows of the given `students`
+    (whose first row is the header, if any student could be graded). The
+    students are graded as the rows are consumed; the rows of students that
+    could not be graded are appended to `err_rows` after its header row.
+    """
+    err_rows.append(["id", "username", "error_msg"])
+    return _generate_grade_report_rows(course_id, students, task_progress, err_rows, task_info_string, action_name)
+
+
+def _generate_grade_report_rows(course_id, students, task_progress, err_rows, task_info_string, action_name):  # pylint: disable=too-many-statements
+    """
+    Generator of the grade report rows; see `_compute_grade_report_rows`.
+    """
+    status_interval = 100
+
     course = get_course_by_id(course_id)
     course_is_cohorted = is_course_cohorted(course.id)
     teams_enabled = course.teams_enabled
@@ -698,13 +753,11 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     certificate_whitelist = CertificateWhitelist.objects.filter(course_id=course_id, whitelist=True)
     whitelisted_user_ids = [entry.user_id for entry in certificate_whitelist]
 
-    # Loop over all our students and build our CSV lists in memory
+    # Loop over all our students and yield their CSV rows
     header = None
-    rows = []
-    err_rows = [["id", "username", "error_msg"]]
     current_step = {'step': 'Calculating Grades'}
 
-    total_enrolled_students = enrolled_students.count()
+    total_students = task_progress.total
     student_counter = 0
     TASK_LOG.info(
         u'%s, Task type: %s, Current step: %s, Starting grade calculation for total students: %s',
@@ -712,9 +765,11 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
         action_name,
         current_step,
 
-        total_enrolled_students
+        total_students
     )
-    for student, gradeset, err_msg in iterate_grades_for(course_id, enrolled_students):
+    for student, gradeset, err_msg in iterate_grades_for(
+            course_id, students, batch_size=settings.GRADE_REPORT_BATCH_SIZE
+    ):
         # Periodically update task status (this is a cache write)
         if task_progress.attempted % status_interval == 0:
             task_progress.update_task_state(extra_meta=current_step)
@@ -729,7 +784,7 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
             action_name,
             current_step,
             student_counter,
-            total_enrolled_students
+            total_students
         )
 
         if gradeset:
@@ -737,7 +792,7 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
             task_progress.succeeded += 1
             if not header:
                 header = [section['label'] for section in gradeset[u'section_breakdown']]
-                rows.append(
+                yield (
                     ["id", "email", "username", "grade"] + header + cohorts_header +
                     group_configs_header + teams_header +
                     ['Enrollment Track', 'Verification Status'] + certificate_info_header
@@ -787,7 +842,7 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
             # possible for a student to have a 0.0 show up in their row but
             # still have 100% for the course.
             row_percents = [percents.get(label, 0.0) for label in header]
-            rows.append(
+            yield (
                 [student.id, student.email, student.username, gradeset['percent']] +
                 row_percents + cohorts_group_name + group_configs_group_names + team_name +
                 [enrollment_mode] + [verification_status] + certificate_info
@@ -803,25 +858,9 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
         action_name,
         current_step,
         student_counter,
-        total_enrolled_students
+        total_students
     )
 
-    # By this point, we've got the rows we're going to stuff into our CSV files.
-    current_step = {'step': 'Uploading CSVs'}
-    task_progress.update_task_state(extra_meta=current_step)
-    TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
-
-    # Perform the actual upload
-    upload_csv_to_report_store(rows, 'grade_report', course_id, start_date)
-
-    # If there are any error rows (don't count the header), write them out as well
-    if len(err_rows) > 1:
-        upload_csv_to_report_store(err_rows, 'grade_report_err', course_id, start_date)
-
-    # One last update before we close out...
-    TASK_LOG.info(u'%s, Task type: %s, Finalizing grade task', task_info_string, action_name)
-    return task_progress.update_task_state(extra_meta=current_step)
-
 
 def _order_problems(blocks):
     """
@@ -911,33 +950,78 @@ def upload_problem_grade_report(_xmodule_instance_args, _entry_id, course_id, _t
     """
     Generate a CSV containing all students' problem grades within a given
     `course_id`.
+
+    If grade report subtasks are enabled, the students are instead split into
+    chunks that are graded by `grade_report_subtask`s, and the resulting
+    partial CSVs are merged by the last subtask to complete.
     """
+    if settings.FEATURES.get('ENABLE_GRADE_REPORT_SUBTASKS'):
+        return queue_grade_report_subtasks(_entry_id, course_id, action_name, 'problem_grade_report')
+
     start_time = time()
     start_date = datetime.now(UTC)
-    status_interval = 100
     enrolled_students = CourseEnrollment.objects.users_enrolled_in(course_id)
     task_progress = TaskProgress(action_name, enrolled_students.count(), start_time)
 
-    # This struct encapsulates both the display names of each static item in the
-    # header row as values as well as the django User field names of those items
-    # as the keys.  It is structured in this way to keep the values related.
-    header_row = OrderedDict([('id', 'Student ID'), ('email', 'Email'), ('username', 'Username')])
-
+    error_rows = []
     try:
-        course_structure = CourseStructure.objects.get(course_id=course_id)
-        blocks = course_structure.ordered_blocks
-        problems = _order_problems(blocks)
+        rows = _compute_problem_grade_report_rows(course_id, enrolled_students, task_progress, error_rows)
     except CourseStructure.DoesNotExist:
         return task_progress.update_task_state(
             extra_meta={'step': 'Generating course structure. Please refresh and try again.'}
         )
 
-    # Just generate the static fields for now.
-    rows = [list(header_row.values()) + ['Final Grade'] + list(chain.from_iterable(problems.values()))]
-    error_rows = [list(header_row.values()) + ['error_msg']]
+    # Perform the upload if any students have been successfully graded. This
+    # grades students until the first one succeeds (or all of them failed).
+    first_rows = list(islice(rows, 2))
+    if len(first_rows) > 1:
+        upload_csv_to_report_store(chain(first_rows, rows), 'problem_grade_report', course_id, start_date)
+    # If there are any error rows, write them out as well
+    if len(error_rows) > 1:
+        upload_csv_to_report_store(error_rows, 'problem_grade_report_err', course_id, start_date)
+
+    return task_progress.update_task_state(extra_meta={'step': 'Uploading CSV'})
+
+
+def _compute_problem_grade_report_rows(
+        course_id, students, task_progress, error_rows, _task_info_string=None, _action_name=None
+):
+    """
+    Return a generator of the problem grade report rows of the given
+    `students`, the first row being the header. The students are graded as
+    the rows are consumed; the rows of students that could not be graded are
+    appended to `error_rows` after its header row.
+
+    Raises `CourseStructure.DoesNotExist` if the course structure has not been
+    generated yet.
+    """
+    # This struct encapsulates both the display names of each static item in the
+    # header row as values as well as the django User field names of those items
+    # as the keys.  It is structured in this way to keep the values related.
+    header_row = OrderedDict([('id', 'Student ID'), ('email', 'Email'), ('username', 'Username')])
+
+    course_structure = CourseStructure.objects.get(course_id=course_id)
+    blocks = course_structure.ordered_blocks
+    problems = _order_problems(blocks)
+
+    error_rows.append(list(header_row.values()) + ['error_msg'])
+    return _generate_problem_grade_report_rows(course_id, students, task_progress, error_rows, header_row, problems)
+
+
+def _generate_problem_grade_report_rows(course_id, students, task_progress, error_rows, header_row, problems):
+    """
+    Generator of the problem grade report rows; see
+    `_compute_problem_grade_report_rows`.
+    """
+    status_interval = 100
     current_step = {'step': 'Calculating Grades'}
 
-    for student, gradeset, err_msg in iterate_grades_for(course_id, enrolled_students, keep_raw_scores=True):
+    # Just generate the static fields for now.
+    yield list(header_row.values()) + ['Final Grade'] + list(chain.from_iterable(problems.values()))
+
+    for student, gradeset, err_msg in iterate_grades_for(
+            course_id, students, keep_raw_scores=True, batch_size=settings.GRADE_REPORT_BATCH_SIZE
+    ):
         student_fields = [getattr(student, field_name) for field_name in header_row]
         task_progress.attempted += 1
 
@@ -965,20 +1049,248 @@ def upload_problem_grade_report(_xmodule_instance_args, _entry_id, course_id, _t
                 # the case that the student does not have access to it (e.g. A/B
                 # test or cohorted courseware).
                 earned_possible_values.append(['N/A', 'N/A'])
-        rows.append(student_fields + [final_grade] + list(chain.from_iterable(earned_possible_values)))
+        yield student_fields + [final_grade] + list(chain.from_iterable(earned_possible_values))
 
         task_progress.succeeded += 1
         if task_progress.attempted % status_interval == 0:
             task_progress.update_task_state(extra_meta=current_step)
 
-    # Perform the upload if any students have been successfully graded
-    if len(rows) > 1:
-        upload_csv_to_report_store(rows, 'problem_grade_report', course_id, start_date)
-    # If there are any error rows, write them out as well
+
+# Functions computing the rows of the reports that can be generated by
+# subtasks, keyed by report name.  Each takes the course id, the students to
+# grade, a TaskProgress, a list to append the error rows to, a log prefix and
+# the action name, and returns a generator of the report rows.
+GRADE_REPORT_ROW_FUNCTIONS = {
+    'grade_report': _compute_grade_report_rows,
+    'problem_grade_report': _compute_problem_grade_report_rows,
+}
+
+# The header of the error rows of those reports, and the User fields that
+# their error rows start with, keyed by report name.
+GRADE_REPORT_ERROR_COLUMNS = {
+    'grade_report': (['id', 'username', 'error_msg'], ['id', 'username']),
+    'problem_grade_report': (['Student ID', 'Email', 'Username', 'error_msg'], ['id', 'email', 'username']),
+}
+
+
+def queue_grade_report_subtasks(entry_id, course_id, action_name, report_name):
+    """
+    Split the enrolled students of the course into chunks of
+    settings.GRADE_REPORT_STUDENTS_PER_SUBTASK students, and queue a
+    `grade_report_subtask` to generate the part of the `report_name` report
+    for each chunk.
+    """
+    # Imported here to avoid a circular import, as the tasks module imports
+    # the functions of this module.
+    from instructor_task.tasks import grade_report_subtask
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+
+    # See perform_delegate_email_batches: if the parent task is run again after
+    # its subtasks were queued, don't queue a second set of them.
+    if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+        TASK_LOG.warning(u"Task %s has already queued its grade report subtasks", entry.task_id)
+        return json.loads(entry.task_output)
+
+    enrolled_students = CourseEnrollment.objects.users_enrolled_in(course_id).order_by('id')
+    total_students = enrolled_students.count()
+    subtask_index = [0]
+
+    def _create_grade_report_subtask(student_list, initial_subtask_status):
+        """Creates a subtask to generate the report part for the given students."""
+        part_index = subtask_index[0]
+        subtask_index[0] += 1
+        return grade_report_subtask.subtask(
+            (
+                entry_id,
+                report_name,
+                part_index,
+                [student['pk'] for student in student_list],
+                initial_subtask_status.to_dict(),
+            ),
+            task_id=initial_subtask_status.task_id,
+            routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+        )
+
+    progress = queue_subtasks_for_query(
+        entry,
+        action_name,
+        _create_grade_report_subtask,
+        [enrolled_students],
+        [],
+        settings.GRADE_REPORT_STUDENTS_PER_SUBTASK,
+        total_students,
+    )
+    if total_students == 0:
+        # There is no subtask to queue the merge, which uploads the (empty)
+        # report and completes the task.
+        _queue_grade_report_merge(entry_id, report_name)
+    return progress
+
+
+def _partial_report_filename(entry, csv_name, part_index):
+    """
+    Return the name of the partial CSV generated by one subtask of a report.
+    """
+    return u"{task_id}_{csv_name}_{part_index:06d}.csv".format(
+        task_id=entry.task_id,
+        csv_name=csv_name,
+        part_index=part_index,
+    )
+
+
+def perform_grade_report_subtask(entry_id, report_name, part_index, student_ids, subtask_status_dict):
+    """
+    Generate the part of the `report_name` report for the given students and
+    store it in the partials report store. The subtask that completes last
+    queues the merge of all the parts into the final report, which marks the
+    InstructorTask as succeeded.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+    course_id = entry.course_id
+    task_progress = TaskProgress(report_name, len(student_ids), time())
+    task_info_string = u'InstructorTask ID: {entry_id}, Course: {course_id}, Subtask: {subtask_id}'.format(
+        entry_id=entry_id,
+        course_id=course_id,
+        subtask_id=current_task_id,
+    )
+
+    try:
+        students = User.objects.filter(id__in=student_ids).order_by('id')
+        err_rows = []
+        rows = GRADE_REPORT_ROW_FUNCTIONS[report_name](
+            course_id, students, task_progress, err_rows, task_info_string, report_name
+        )
+        partials_store = ReportStore.from_config('GRADES_DOWNLOAD').partials_store()
+        partials_store.store_rows(course_id, _partial_report_filename(entry, report_name, part_index), rows)
+        partials_store.store_rows(
+            course_id, _partial_report_filename(entry, report_name + '_err', part_index), err_rows
+        )
+    except Exception:
+        TASK_LOG.exception(u'%s, Grade report subtask failed unexpectedly', task_info_string)
+        _store_failed_grade_report_part(entry, report_name, part_index, student_ids, task_info_string)
+        subtask_status.increment(failed=len(student_ids), state=FAILURE)
+        # The remaining parts must still be merged if this was the last subtask.
+        if update_subtask_status(entry_id, current_task_id, subtask_status, defer_completion=True):
+            _queue_grade_report_merge(entry_id, report_name)
+        raise
+
+    subtask_status.increment(
+        succeeded=task_progress.succeeded,
+        failed=task_progress.failed,
+        skipped=len(student_ids) - task_progress.attempted,
+        state=SUCCESS,
+    )
+    if update_subtask_status(entry_id, current_task_id, subtask_status, defer_completion=True):
+        _queue_grade_report_merge(entry_id, report_name)
+    return subtask_status.to_dict()
+
+
+def _store_failed_grade_report_part(entry, report_name, part_index, student_ids, task_info_string):
+    """
+    Store the part of the error report of a subtask that failed, which lists
+    all its students, in place of the parts it may have stored, so that the
+    merged error report includes them.
+    """
+    course_id = entry.course_id
+    partials_store = ReportStore.from_config('GRADES_DOWNLOAD').partials_store()
+    try:
+        partials_store.delete(course_id, _partial_report_filename(entry, report_name, part_index))
+    except Exception:  # pylint: disable=broad-except
+        # The subtask failed before storing its part of the report.
+        pass
+
+    header, user_fields = GRADE_REPORT_ERROR_COLUMNS[report_name]
+    err_rows = [header] + [
+        [getattr(student, field_name) for field_name in user_fields] + [u'Failed to generate the grade report']
+        for student in User.objects.filter(id__in=student_ids).order_by('id')
+    ]
+    try:
+        partials_store.store_rows(
+            course_id, _partial_report_filename(entry, report_name + '_err', part_index), err_rows
+        )
+    except Exception:  # pylint: disable=broad-except
+        TASK_LOG.exception(u'%s, Could not store the error report of the failed subtask', task_info_string)
+
+
+def _queue_grade_report_merge(entry_id, report_name):
+    """
+    Queue the merge of the parts of the `report_name` report, once all its
+    subtasks have completed.
+    """
+    # Imported here to avoid a circular import, as the tasks module imports
+    # the functions of this module.
+    from instructor_task.tasks import merge_grade_report_parts
+
+    merge_grade_report_parts.apply_async(
+        (entry_id, report_name),
+        routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+    )
+
+
+def perform_grade_report_merge(entry_id, report_name):
+    """
+    Stream the partial CSVs of the completed subtasks of the report into the
+    final report (and error report), then mark the InstructorTask as
+    succeeded and delete the partial CSVs.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    subtask_dict = json.loads(entry.subtasks)
+    course_id = entry.course_id
+    partials_store = ReportStore.from_config('GRADES_DOWNLOAD').partials_store()
+    merged_filenames = []
+
+    def _merged_rows(csv_name):
+        """Yield the rows of all existing parts, keeping only the first header."""
+        header_written = False
+        for part_index in range(subtask_dict['total']):
+            filename = _partial_report_filename(entry, csv_name, part_index)
+            try:
+                for row_index, row in enumerate(partials_store.read_rows(course_id, filename)):
+                    if row_index == 0:
+                        if header_written:
+                            continue
+                        header_written = True
+                    yield row
+            except ReportNotFoundError:
+                # A failed subtask does not leave a part of the report behind,
+                # but lists its students in its part of the error report.
+                # Any other error is raised, so that the merge is retried.
+                TASK_LOG.warning(u'Part %s of report %s for task %s is missing', part_index, csv_name, entry.task_id)
+                continue
+            merged_filenames.append(filename)
+
+    # Error reports contain a header row even when they have no errors.
+    error_rows = list(_merged_rows(report_name + '_err'))
+    upload_csv_to_report_store(_merged_rows(report_name), report_name, course_id, entry.created)
     if len(error_rows) > 1:
-        upload_csv_to_report_store(error_rows, 'problem_grade_report_err', course_id, start_date)
+        upload_csv_to_report_store(error_rows, report_name + '_err', course_id, entry.created)
 
-    return task_progress.update_task_state(extra_meta={'step': 'Uploading CSV'})
+    entry.task_state = SUCCESS
+    entry.save_now()
+
+    # The parts are only deleted once the reports are uploaded, so that the
+    # merge can be retried if that fails.
+    for filename in merged_filenames:
+        try:
+            partials_store.delete(course_id, filename)
+        except Exception:  # pylint: disable=broad-except
+            TASK_LOG.warning(u'Could not delete part %s of the report of task %s', filename, entry.task_id)
+
+
+def fail_grade_report_merge(entry_id, exception, traceback_string):
+    """
+    Mark the InstructorTask of a report whose parts could not be merged as
+    failed.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    entry.task_output = InstructorTask.create_output_for_failure(exception, traceback_string)
+    entry.task_state = FAILURE
+    entry.save_now()
 
 
 def upload_students_csv(_xmodule_instance_args, _entry_id, course_id, task_input, action_name):
@@ -1459,20 +1771,18 @@ def generate_students_certificates(
     task_progress.update_task_state(extra_meta=current_step)
 
     course = modulestore().get_course(course_id, depth=0)
-    # Generate certificate for each student
-    for student in students_require_certs:
+    # Generate certificates for the students, a batch at a time
+    statuses = generate_certificates_for_students(students_require_certs, course_id, course=course)
+    for student_count, (__, status) in enumerate(statuses, start=1):
         task_progress.attempted += 1
-        status = generate_user_certificates(
-            student,
-            course_id,
-            course=course
-        )
-
         if CertificateStatuses.is_passing_status(status):
             task_progress.succeeded += 1
         else:
             task_progress.failed += 1
 
+        if student_count % settings.CERTIFICATE_GENERATION_BATCH_SIZE == 0:
+            task_progress.update_task_state(extra_meta=current_step)
+
     return task_progress.update_task_state(extra_meta=current_step)
 
 
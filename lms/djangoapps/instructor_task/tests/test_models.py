@@ -3,12 +3,15 @@ Tests for instructor_task/models.py.
 """
 
 from cStringIO import StringIO
+from gzip import GzipFile
+import hashlib
 import mock
+import os
 import time
 from datetime import datetime
 from unittest import TestCase
 
-from instructor_task.models import LocalFSReportStore, S3ReportStore
+from instructor_task.models import LocalFSReportStore, ReportNotFoundError, S3ReportStore
 from instructor_task.tests.test_base import TestReportMixin
 from opaque_keys.edx.locator import CourseLocator
 
@@ -30,10 +33,39 @@ class MockKey(object):
         return "http://fake-edx-s3.edx.org/"
 
 
+class MockMultipartUpload(object):
+    """
+    Mocking a boto S3 MultiPartUpload object.
+    """
+    def __init__(self, key_name):
+        self.key_name = key_name
+        self.parts = []
+        self.completed = False
+
+    def upload_part_from_file(self, fp, part_num):
+        """ Expected method on a MultiPartUpload object. """
+        self.parts.append((part_num, fp.read()))
+
+    def complete_upload(self):
+        """ Expected method on a MultiPartUpload object. """
+        self.completed = True
+
+    def cancel_upload(self):
+        """ Expected method on a MultiPartUpload object. """
+        pass
+
+
 class MockBucket(object):
     """ Mocking a boto S3 Bucket object. """
     def __init__(self, _name):
         self.keys = []
+        self.multipart_uploads = []
+
+    def initiate_multipart_upload(self, key_name, headers):  # pylint: disable=unused-argument
+        """ Expected method on a Bucket object. """
+        multipart_upload = MockMultipartUpload(key_name)
+        self.multipart_uploads.append(multipart_upload)
+        return multipart_upload
 
     def store_key(self, key):
         """ Not a Bucket method, created just to store the keys in the Bucket for testing purposes. """
@@ -93,6 +125,44 @@ class LocalFSReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, TestCase
         """ Create and return a LocalFSReportStore. """
         return LocalFSReportStore.from_config(config_name='GRADES_DOWNLOAD')
 
+    def test_read_rows_and_delete(self):
+        """
+        Test that rows stored in a partials store can be read back and deleted,
+        and that they are not listed by links_for() of the main store.
+        """
+        report_store = self.create_report_store()
+        partials_store = report_store.partials_store()
+        rows = [[u'id', u'username'], [1, u'ni\xf1o']]
+        partials_store.store_rows(self.course_id, 'part.csv', rows)
+
+        self.assertEqual(
+            list(partials_store.read_rows(self.course_id, 'part.csv')),
+            [[u'id', u'username'], [u'1', u'ni\xf1o']]
+        )
+        self.assertEqual(report_store.links_for(self.course_id), [])
+
+        partials_store.delete(self.course_id, 'part.csv')
+        self.assertEqual(partials_store.links_for(self.course_id), [])
+        with self.assertRaises(ReportNotFoundError):
+            list(partials_store.read_rows(self.course_id, 'part.csv'))
+
+    def test_failed_write_leaves_no_file(self):
+        """
+        Test that a report whose rows fail to be generated is not stored,
+        neither under its name nor as a partially written file.
+        """
+        def failing_rows():
+            """ Yield a row, then fail like a report generating its rows. """
+            yield [u'id', u'username']
+            raise ValueError("Boom")
+
+        report_store = self.create_report_store()
+        with self.assertRaises(ValueError):
+            report_store.store_rows(self.course_id, 'report.csv', failing_rows())
+
+        self.assertEqual(report_store.links_for(self.course_id), [])
+        self.assertEqual(os.listdir(os.path.dirname(report_store.path_to(self.course_id, 'report.csv'))), [])
+
 
 @mock.patch('instructor_task.models.S3Connection', new=MockS3Connection)
 @mock.patch('instructor_task.models.Key', new=MockKey)
@@ -105,3 +175,24 @@ class S3ReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, TestCase):
     def create_report_store(self):
         """ Create and return a S3ReportStore. """
         return S3ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+
+    def test_store_rows_in_parts(self):
+        """
+        Test that rows are streamed as a gzip'd CSV in several upload parts.
+        """
+        report_store = self.create_report_store()
+        report_store.MULTIPART_UPLOAD_PART_SIZE = 100
+        # Hashes, so that the compressed data is large enough to need several parts.
+        rows = ([unicode(index), u'ni\xf1o {}'.format(hashlib.md5(str(index)).hexdigest())] for index in range(10000))
+        report_store.store_rows(self.course_id, 'report.csv', rows)
+
+        multipart_upload = report_store.bucket.multipart_uploads[0]
+        self.assertTrue(multipart_upload.completed)
+        self.assertGreater(len(multipart_upload.parts), 1)
+        part_nums = [part_num for part_num, __ in multipart_upload.parts]
+        self.assertEqual(part_nums, range(1, len(part_nums) + 1))
+
+        data = ''.join(part for __, part in multipart_upload.parts)
+        csv_lines = GzipFile(fileobj=StringIO(data)).read().splitlines()
+        self.assertEqual(len(csv_lines), 10000)
+        self.assertEqual(csv_lines[1].decode('utf-8'), u'1,ni\xf1o {}'.format(hashlib.md5('1').hexdigest()))
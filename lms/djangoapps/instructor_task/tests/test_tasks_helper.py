@@ -8,13 +8,16 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 
 """
 
+import json
 import os
 import shutil
 from datetime import datetime
 import urllib
+from uuid import uuid4
 
 import ddt
 from freezegun import freeze_time
+from celery.states import SUCCESS, FAILURE
 from mock import Mock, patch
 from nose.plugins.attrib import attr
 import tempfile
@@ -27,6 +30,7 @@ from capa.tests.response_xml_factory import MultipleChoiceResponseXMLFactory
 from certificates.models import CertificateStatuses, GeneratedCertificate
 from certificates.tests.factories import GeneratedCertificateFactory, CertificateWhitelistFactory
 from course_modes.models import CourseMode
+from courseware import grades
 from courseware.tests.factories import InstructorFactory
 from instructor_task.tests.test_base import InstructorTaskCourseTestCase, TestReportMixin, InstructorTaskModuleTestCase
 from openedx.core.djangoapps.course_groups.models import CourseUserGroupPartitionGroup, CohortMembership
@@ -42,10 +46,12 @@ from shoppingcart.models import Order, PaidCourseRegistration, CourseRegistratio
     CourseRegistrationCodeInvoiceItem, InvoiceTransaction, Coupon
 from student.tests.factories import UserFactory, CourseModeFactory
 from student.models import CourseEnrollment, CourseEnrollmentAllowed, ManualEnrollmentAudit, ALLOWEDTOENROLL_TO_ENROLLED
+from lms.djangoapps.verify_student.models import SoftwareSecurePhotoVerification
 from lms.djangoapps.verify_student.tests.factories import SoftwareSecurePhotoVerificationFactory
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.partitions.partitions import Group, UserPartition
-from instructor_task.models import ReportStore
+from instructor_task.models import InstructorTask, ReportStore
+from instructor_task.tests.factories import InstructorTaskFactory
 from survey.models import SurveyForm, SurveyAnswer
 from instructor_task.tasks_helper import (
     cohort_students_and_upload,
@@ -59,6 +65,7 @@ from instructor_task.tasks_helper import (
     upload_course_survey_report,
     generate_students_certificates,
     upload_ora2_data,
+    GRADE_REPORT_ROW_FUNCTIONS,
     UPDATE_STATUS_FAILED,
     UPDATE_STATUS_SUCCEEDED,
 )
@@ -306,6 +313,130 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
         self.assertDictContainsSubset({'attempted': 1, 'succeeded': 1, 'failed': 0}, result)
 
 
+@patch.dict(settings.FEATURES, {'ENABLE_GRADE_REPORT_SUBTASKS': True})
+@override_settings(GRADE_REPORT_STUDENTS_PER_SUBTASK=2)
+class TestGradeReportSubtasks(TestReportMixin, InstructorTaskCourseTestCase):
+    """
+    Tests that grade reports generated by subtasks are merged into one report.
+    """
+    def setUp(self):
+        super(TestGradeReportSubtasks, self).setUp()
+        self.course = CourseFactory.create()
+        self.students = [self.create_student(u'student{}'.format(index)) for index in range(5)]
+        self.entry = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_id=str(uuid4()),
+            task_key='dummy_task_key',
+            task_type='grade_course',
+        )
+
+    def _report_rows(self, error_report=False):
+        """
+        Return the rows of the most recent report (or error report) as a
+        list of dicts.
+        """
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        report_csv_filename = [
+            filename for filename, __ in report_store.links_for(self.course.id)
+            if ('grade_report_err' in filename) == error_report
+        ][0]
+        with open(report_store.path_to(self.course.id, report_csv_filename)) as csv_file:
+            return list(unicodecsv.DictReader(csv_file))
+
+    @patch('instructor_task.tasks_helper._get_current_task')
+    def test_grade_report(self, _mock_current_task):
+        upload_grades_csv(None, self.entry.id, self.course.id, None, 'graded')
+
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertEqual(json.loads(entry.subtasks)['succeeded'], json.loads(entry.subtasks)['total'])
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(len(report_store.links_for(self.course.id)), 1)
+        usernames = [row['username'] for row in self._report_rows()]
+        self.assertEqual(len(usernames), len(set(usernames)))
+        self.assertNotIn('username', usernames)
+        self.assertTrue(set(student.username for student in self.students).issubset(usernames))
+        self.assertEqual(report_store.partials_store().links_for(self.course.id), [])
+
+    @patch('instructor_task.tasks_helper._get_current_task')
+    @patch('instructor_task.tasks_helper.upload_csv_to_report_store')
+    def test_merge_failure(self, mock_upload_csv_to_report_store, _mock_current_task):
+        mock_upload_csv_to_report_store.side_effect = IOError('Disk full')
+        upload_grades_csv(None, self.entry.id, self.course.id, None, 'graded')
+
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        self.assertEqual(entry.task_state, FAILURE)
+        self.assertEqual(mock_upload_csv_to_report_store.call_count, settings.GRADE_REPORT_MERGE_MAX_RETRIES + 1)
+        # The parts are kept, so that the report can still be merged.
+        partials_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD').partials_store()
+        self.assertEqual(
+            len(partials_store.links_for(self.course.id)),
+            2 * json.loads(entry.subtasks)['total']
+        )
+
+    @patch('instructor_task.tasks_helper._get_current_task')
+    @patch('instructor_task.tasks_helper.iterate_grades_for')
+    def test_grading_failure(self, mock_iterate_grades_for, _mock_current_task):
+        mock_iterate_grades_for.side_effect = lambda course_id, students, **kwargs: [
+            (student, {}, 'Cannot grade student') for student in students
+        ]
+        upload_grades_csv(None, self.entry.id, self.course.id, None, 'graded')
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertTrue(any('grade_report_err' in item[0] for item in report_store.links_for(self.course.id)))
+        self.assertEqual(json.loads(InstructorTask.objects.get(pk=self.entry.id).task_output)['failed'], 5)
+
+    @patch('instructor_task.tasks_helper._get_current_task')
+    def test_subtask_failure(self, _mock_current_task):
+        compute_grade_report_rows = GRADE_REPORT_ROW_FUNCTIONS['grade_report']
+
+        def compute_rows(course_id, students, *args):
+            """ Fail to compute the rows of the part of the first student. """
+            if self.students[0] in students:
+                raise ValueError('Boom')
+            return compute_grade_report_rows(course_id, students, *args)
+
+        with patch.dict('instructor_task.tasks_helper.GRADE_REPORT_ROW_FUNCTIONS', {'grade_report': compute_rows}):
+            upload_grades_csv(None, self.entry.id, self.course.id, None, 'graded')
+
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertEqual(json.loads(entry.subtasks)['failed'], 1)
+        usernames = [row['username'] for row in self._report_rows()]
+        self.assertNotIn(self.students[0].username, usernames)
+        self.assertIn(self.students[-1].username, usernames)
+        # The students of the failed subtask are listed in the error report.
+        error_rows = {row['username']: row['error_msg'] for row in self._report_rows(error_report=True)}
+        self.assertEqual(error_rows[self.students[0].username], 'Failed to generate the grade report')
+
+    @patch('instructor_task.tasks_helper._get_current_task')
+    @patch('instructor_task.models.LocalFSReportStore.read_rows')
+    def test_merge_read_error(self, mock_read_rows, _mock_current_task):
+        mock_read_rows.side_effect = IOError('Temporarily unavailable')
+        upload_grades_csv(None, self.entry.id, self.course.id, None, 'graded')
+
+        # The parts are not skipped, so the merge is retried until it fails.
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        self.assertEqual(entry.task_state, FAILURE)
+        self.assertEqual(ReportStore.from_config(config_name='GRADES_DOWNLOAD').links_for(self.course.id), [])
+
+    @patch('instructor_task.tasks_helper._get_current_task')
+    def test_no_students(self, _mock_current_task):
+        course = CourseFactory.create()
+        entry = InstructorTaskFactory.create(
+            course_id=course.id,
+            task_id=str(uuid4()),
+            task_key='dummy_task_key',
+            task_type='grade_course',
+        )
+        upload_grades_csv(None, entry.id, course.id, None, 'graded')
+
+        self.assertEqual(InstructorTask.objects.get(pk=entry.id).task_state, SUCCESS)
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(len(report_store.links_for(course.id)), 1)
+
+
 class TestTeamGradeReport(InstructorGradeReportTestCase):
     """ Test that teams appear correctly in the grade report when it is enabled for the course. """
 
@@ -1666,8 +1797,23 @@ class TestCertificateGeneration(InstructorTaskModuleTestCase):
             'skipped': 2
         }
 
-        with self.assertNumQueries(214):
-            self.assertCertificatesGenerated(task_input, expected_results)
+        # The 8 students without a certificate are processed in 2 batches,
+        # each graded and checked for ID verification at once.
+        with override_settings(CERTIFICATE_GENERATION_BATCH_SIZE=4):
+            with patch.object(
+                grades, 'iterate_grades_for', wraps=grades.iterate_grades_for
+            ) as mock_iterate_grades_for:
+                with patch.object(
+                    SoftwareSecurePhotoVerification,
+                    'verified_user_ids',
+                    wraps=SoftwareSecurePhotoVerification.verified_user_ids
+                ) as mock_verified_user_ids:
+                    with patch.object(SoftwareSecurePhotoVerification, 'user_is_verified') as mock_user_is_verified:
+                        self.assertCertificatesGenerated(task_input, expected_results)
+
+        self.assertEqual(mock_iterate_grades_for.call_count, 2)
+        self.assertEqual(mock_verified_user_ids.call_count, 2)
+        self.assertFalse(mock_user_is_verified.called)
 
     @ddt.data(
         CertificateStatuses.downloadable,
@@ -0,0 +1,128 @@
+"""
+Video Outline Transformer
+"""
+from openedx.core.lib.block_structure.transformer import BlockStructureTransformer
+
+
+class VideoOutlineTransformer(BlockStructureTransformer):
+    """
+    Collects the data the mobile video outline shows about each video, so
+    that outlines can be built from the course's block structure rather than
+    by loading the course's modules.
+
+    No runtime transformations are performed.
+
+    The following value is stored as a transformer_block_field for each
+    video that is not hidden from the table of contents:
+
+        video_outline: (dict) with the keys
+            path: (list) the name, category and id of each of the
+                video's ancestors, from the course's child down.
+            chapter: (string) the block id of the video's chapter, if any.
+            section: (string) the url name of the video's section, if any.
+            position: (int) the position of the video's unit in its
+                section, if any.
+            summary: (dict) the data about the video itself, as stored in
+                the video block and its transcripts.
+    """
+    VERSION = 1
+    VIDEO_OUTLINE = 'video_outline'
+
+    @classmethod
+    def name(cls):
+        """
+        Unique identifier for the transformer's class;
+        same identifier used in setup.py.
+        """
+        return 'video_outline'
+
+    @classmethod
+    def collect(cls, block_structure):
+        """
+        Collects the outline data of every video in the block structure.
+        """
+        root_key = block_structure.root_block_usage_key
+        # The keys of each block's ancestors and their path entries.
+        ancestors = {root_key: ([root_key], [])}
+        hidden_keys = set()
+
+        for block_key in block_structure.topological_traversal():
+            if block_key == root_key:
+                continue
+            block = block_structure.get_xblock(block_key)
+            parent_key = block_structure.get_parents(block_key)[0]
+
+            # For now, if the 'hide_from_toc' setting is set on a block, its
+            # videos are not listed.  The reason being is that these blocks
+            # may not have human-readable names to display on the mobile
+            # clients.
+            if parent_key in hidden_keys or getattr(block, 'hide_from_toc', False):
+                hidden_keys.add(block_key)
+                continue
+
+            ancestor_keys, path = ancestors[parent_key]
+            if block.has_children:
+                ancestors[block_key] = (ancestor_keys + [block_key], path + [{
+                    # to be consistent with other edx-platform clients, return the defaulted display name
+                    'name': block.display_name_with_default_escaped,
+                    'category': block.category,
+                    'id': unicode(block_key),
+                }])
+
+            if block_key.block_type == 'video':
+                block_structure.set_transformer_block_field(
+                    block_key,
+                    cls,
+                    cls.VIDEO_OUTLINE,
+                    cls._video_outline(block_structure, block, ancestor_keys, path),
+                )
+
+    @classmethod
+    def _video_outline(cls, block_structure, video_descriptor, ancestor_keys, path):
+        """
+        Returns the outline data of the given video, whose ancestors are
+        `ancestor_keys`, from the course down, and are described by `path`.
+        """
+        chapter = ancestor_keys[1].block_id if len(ancestor_keys) > 1 else None
+        section = ancestor_keys[2].block_id if len(ancestor_keys) > 2 else None
+        position = None
+        if len(ancestor_keys) > 3:
+            section_children = block_structure.get_xblock(ancestor_keys[2]).children
+            position = [child.block_id for child in section_children].index(ancestor_keys[3].block_id) + 1
+
+        summary = {
+            'name': video_descriptor.display_name,
+            'category': video_descriptor.category,
+            'id': unicode(video_descriptor.scope_ids.usage_id),
+            'block_id': video_descriptor.scope_ids.usage_id.block_id,
+            'only_on_web': video_descriptor.only_on_web,
+        }
+        if not video_descriptor.only_on_web:
+            transcripts_info = video_descriptor.get_transcripts_info()
+            summary.update({
+                'edx_video_id': video_descriptor.edx_video_id,
+                # Used when the video isn't in VAL or has no encoding for the
+                # requested profiles.
+                'video_url': (
+                    video_descriptor.html5_sources[0] if video_descriptor.html5_sources
+                    else video_descriptor.source
+                ),
+                'transcript_languages': video_descriptor.available_translations(
+                    transcripts_info, verify_assets=False
+                ),
+                'language': video_descriptor.get_default_transcript_language(transcripts_info),
+            })
+
+        return {
+            'path': path,
+            'chapter': chapter,
+            'section': section,
+            'position': position,
+            'summary': summary,
+        }
+
+    def transform(self, usage_info, block_structure):
+        """
+        Perform no transformations.
+        """
+        pass
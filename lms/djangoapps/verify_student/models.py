@@ -220,6 +220,19 @@ class PhotoVerification(StatusModel):
                              or cls._earliest_allowed_date())
         ).exists()
 
+    @classmethod
+    def verified_user_ids(cls, users, earliest_allowed_date=None):
+        """
+        Return the set of ids of those of `users` who have satisfactorily
+        proved their identity, as `user_is_verified` would for each of them.
+        """
+        return set(cls.objects.filter(
+            user__in=users,
+            status="approved",
+            created_at__gte=(earliest_allowed_date
+                             or cls._earliest_allowed_date())
+        ).values_list('user_id', flat=True))
+
     @classmethod
     def verification_valid_or_pending(cls, user, earliest_allowed_date=None, queryset=None):
         """
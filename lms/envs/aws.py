@@ -249,6 +249,7 @@ BULK_EMAIL_MAX_RETRIES = ENV_TOKENS.get('BULK_EMAIL_MAX_RETRIES', BULK_EMAIL_MAX
 BULK_EMAIL_INFINITE_RETRY_CAP = ENV_TOKENS.get('BULK_EMAIL_INFINITE_RETRY_CAP', BULK_EMAIL_INFINITE_RETRY_CAP)
 BULK_EMAIL_LOG_SENT_EMAILS = ENV_TOKENS.get('BULK_EMAIL_LOG_SENT_EMAILS', BULK_EMAIL_LOG_SENT_EMAILS)
 BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = ENV_TOKENS.get('BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS', BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS)
+BULK_EMAIL_MAX_SENDS_PER_SECOND = ENV_TOKENS.get('BULK_EMAIL_MAX_SENDS_PER_SECOND', BULK_EMAIL_MAX_SENDS_PER_SECOND)
 # We want Bulk Email running on the high-priority queue, so we define the
 # routing key that points to it. At the moment, the name is the same.
 # We have to reset the value here, since we have changed the value of the queue name.
@@ -304,6 +305,9 @@ VIRTUAL_UNIVERSITIES = ENV_TOKENS.get('VIRTUAL_UNIVERSITIES', [])
 META_UNIVERSITIES = ENV_TOKENS.get('META_UNIVERSITIES', {})
 COMMENTS_SERVICE_URL = ENV_TOKENS.get("COMMENTS_SERVICE_URL", '')
 COMMENTS_SERVICE_KEY = ENV_TOKENS.get("COMMENTS_SERVICE_KEY", '')
+COMMENTS_SERVICE_POOL_SIZE = ENV_TOKENS.get("COMMENTS_SERVICE_POOL_SIZE", COMMENTS_SERVICE_POOL_SIZE)
+COMMENTS_SERVICE_MAX_RETRIES = ENV_TOKENS.get("COMMENTS_SERVICE_MAX_RETRIES", COMMENTS_SERVICE_MAX_RETRIES)
+COMMENTS_SERVICE_CONCURRENCY = ENV_TOKENS.get("COMMENTS_SERVICE_CONCURRENCY", COMMENTS_SERVICE_CONCURRENCY)
 CERT_QUEUE = ENV_TOKENS.get("CERT_QUEUE", 'test-pull')
 ZENDESK_URL = ENV_TOKENS.get("ZENDESK_URL")
 FEEDBACK_SUBMISSION_EMAIL = ENV_TOKENS.get("FEEDBACK_SUBMISSION_EMAIL")
@@ -573,6 +577,12 @@ VERIFY_STUDENT = AUTH_TOKENS.get("VERIFY_STUDENT", VERIFY_STUDENT)
 GRADES_DOWNLOAD_ROUTING_KEY = HIGH_MEM_QUEUE
 
 GRADES_DOWNLOAD = ENV_TOKENS.get("GRADES_DOWNLOAD", GRADES_DOWNLOAD)
+GRADE_REPORT_BATCH_SIZE = ENV_TOKENS.get("GRADE_REPORT_BATCH_SIZE", GRADE_REPORT_BATCH_SIZE)
+GRADE_REPORT_STUDENTS_PER_SUBTASK = ENV_TOKENS.get(
+    "GRADE_REPORT_STUDENTS_PER_SUBTASK", GRADE_REPORT_STUDENTS_PER_SUBTASK
+)
+GRADE_REPORT_MERGE_RETRY_DELAY = ENV_TOKENS.get("GRADE_REPORT_MERGE_RETRY_DELAY", GRADE_REPORT_MERGE_RETRY_DELAY)
+GRADE_REPORT_MERGE_MAX_RETRIES = ENV_TOKENS.get("GRADE_REPORT_MERGE_MAX_RETRIES", GRADE_REPORT_MERGE_MAX_RETRIES)
 
 # financial reports
 FINANCIAL_REPORTS = ENV_TOKENS.get("FINANCIAL_REPORTS", FINANCIAL_REPORTS)
@@ -742,6 +752,7 @@ if FEATURES.get('CUSTOM_COURSES_EDX'):
         'lms.djangoapps.ccx.overrides.CustomCoursesForEdxOverrideProvider',
     )
 CCX_MAX_STUDENTS_ALLOWED = ENV_TOKENS.get('CCX_MAX_STUDENTS_ALLOWED', CCX_MAX_STUDENTS_ALLOWED)
+CCX_OVERRIDES_CACHE_TIMEOUT = ENV_TOKENS.get('CCX_OVERRIDES_CACHE_TIMEOUT', CCX_OVERRIDES_CACHE_TIMEOUT)
 
 ##### Individual Due Date Extensions #####
 if FEATURES.get('INDIVIDUAL_DUE_DATES'):
@@ -825,6 +836,12 @@ STUDENTMODULEHISTORYEXTENDED_OFFSET = ENV_TOKENS.get(
 # Cutoff date for granting audit certificates
 if ENV_TOKENS.get('AUDIT_CERT_CUTOFF_DATE', None):
     AUDIT_CERT_CUTOFF_DATE = dateutil.parser.parse(ENV_TOKENS.get('AUDIT_CERT_CUTOFF_DATE'))
+CERTIFICATE_GENERATION_BATCH_SIZE = ENV_TOKENS.get(
+    'CERTIFICATE_GENERATION_BATCH_SIZE', CERTIFICATE_GENERATION_BATCH_SIZE
+)
+CERTIFICATE_XQUEUE_SUBMISSION_WORKERS = ENV_TOKENS.get(
+    'CERTIFICATE_XQUEUE_SUBMISSION_WORKERS', CERTIFICATE_XQUEUE_SUBMISSION_WORKERS
+)
 
 ################################ Settings for Credentials Service ################################
 
@@ -840,4 +857,18 @@ API_ACCESS_FROM_EMAIL = ENV_TOKENS.get('API_ACCESS_FROM_EMAIL')
 # Mobile App Version Upgrade config
 APP_UPGRADE_CACHE_TIMEOUT = ENV_TOKENS.get('APP_UPGRADE_CACHE_TIMEOUT', APP_UPGRADE_CACHE_TIMEOUT)
 
+BLOCK_STRUCTURES_LOCAL_CACHE_MAX_SIZE = ENV_TOKENS.get(
+    'BLOCK_STRUCTURES_LOCAL_CACHE_MAX_SIZE', BLOCK_STRUCTURES_LOCAL_CACHE_MAX_SIZE
+)
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_SIZE = ENV_TOKENS.get(
+    'COURSE_STRUCTURE_LOCAL_CACHE_MAX_SIZE', COURSE_STRUCTURE_LOCAL_CACHE_MAX_SIZE
+)
+CONFIGURATION_MODEL_LOCAL_CACHE_TIMEOUT = ENV_TOKENS.get(
+    'CONFIGURATION_MODEL_LOCAL_CACHE_TIMEOUT', CONFIGURATION_MODEL_LOCAL_CACHE_TIMEOUT
+)
+EMBARGO_IP_COUNTRY_CACHE_SIZE = ENV_TOKENS.get('EMBARGO_IP_COUNTRY_CACHE_SIZE', EMBARGO_IP_COUNTRY_CACHE_SIZE)
+USER_STATE_WRITE_BEHIND_FIELDS = ENV_TOKENS.get('USER_STATE_WRITE_BEHIND_FIELDS', USER_STATE_WRITE_BEHIND_FIELDS)
+USER_STATE_WRITE_BEHIND_DELAY = ENV_TOKENS.get('USER_STATE_WRITE_BEHIND_DELAY', USER_STATE_WRITE_BEHIND_DELAY)
+PERSISTENT_GRADES_UPDATE_DELAY = ENV_TOKENS.get('PERSISTENT_GRADES_UPDATE_DELAY', PERSISTENT_GRADES_UPDATE_DELAY)
+
 AFFILIATE_COOKIE_NAME = ENV_TOKENS.get('AFFILIATE_COOKIE_NAME', AFFILIATE_COOKIE_NAME)
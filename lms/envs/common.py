@@ -60,6 +60,14 @@ DISCUSSION_SETTINGS = {
     'MAX_COMMENT_DEPTH': 2,
 }
 
+# The number of connections to the comments service kept alive by each process,
+# the number of times a failed connection is retried, and the number of threads
+# each process makes concurrent requests in, when
+# FEATURES['ENABLE_FORUM_REQUEST_POOLING'] is enabled.
+COMMENTS_SERVICE_POOL_SIZE = 10
+COMMENTS_SERVICE_MAX_RETRIES = 2
+COMMENTS_SERVICE_CONCURRENCY = 4
+
 
 # Features
 FEATURES = {
@@ -363,6 +371,38 @@ FEATURES = {
 
     # WIP -- will be removed in Ticket #TNL-4750.
     'ENABLE_TIME_ZONE_PREFERENCE': False,
+
+    # Persist subsection and course grades and update them incrementally when
+    # a score changes, instead of recomputing the full grade on every read.
+    'ENABLE_PERSISTENT_GRADES': False,
+
+    # Keep per-problem grade counts up to date as student grades change, and
+    # read grade distributions and histograms from them.  Run the
+    # rebuild_problem_grade_counts command for existing courses when enabling.
+    'ENABLE_GRADE_DISTRIBUTION_TABLE': False,
+
+    # Generate grade reports with subtasks that each grade a range of
+    # students, merging their partial CSVs once all of them complete.
+    'ENABLE_GRADE_REPORT_SUBTASKS': False,
+
+    # Cache the course blocks transformed for a user and share them with all
+    # users whose access to the blocks is the same, such as learners in the
+    # same partition groups.
+    'ENABLE_COURSE_BLOCKS_TRANSFORM_CACHE': False,
+
+    # Tag the responses of the Course Blocks API with an ETag derived from
+    # the course's cached block structure and the user's access to it, and
+    # answer conditional requests for unchanged blocks with a 304.
+    'ENABLE_COURSE_BLOCKS_API_ETAG': False,
+
+    # Load the user's state for every block of the course's cached block
+    # structure in one batch on the courseware page, rather than once for the
+    # course outline and again for the requested section.
+    'ENABLE_COURSEWARE_USER_STATE_PREFETCH': False,
+
+    # Send requests to the comments service over a pool of kept-alive
+    # connections, and make independent requests of a page concurrently.
+    'ENABLE_FORUM_REQUEST_POOLING': False,
 }
 
 # Ignore static asset files on import which match this pattern
@@ -407,6 +447,10 @@ NODE_PATH = ':'.join(node_paths)
 GEOIP_PATH = REPO_ROOT / "common/static/data/geoip/GeoIP.dat"
 GEOIPV6_PATH = REPO_ROOT / "common/static/data/geoip/GeoIPv6.dat"
 
+# Number of recently looked up IP addresses whose country codes are kept in
+# memory by the embargo app.  Zero disables the cache.
+EMBARGO_IP_COUNTRY_CACHE_SIZE = 10000
+
 # Where to look for a status message
 STATUS_MESSAGE_PATH = ENV_ROOT / "status_message.json"
 
@@ -1810,6 +1854,11 @@ BULK_EMAIL_LOG_SENT_EMAILS = False
 # parallel, and what the SES rate is.
 BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = 0.02
 
+# Maximum number of bulk email messages to send per second, across all
+# workers.  When set, it replaces the delay above as the way sends are
+# throttled.  Zero means no limit.
+BULK_EMAIL_MAX_SENDS_PER_SECOND = 0
+
 ############################# Email Opt In ####################################
 
 # Minimum age for organization-wide email opt in
@@ -2349,6 +2398,19 @@ FINANCIAL_REPORTS = {
     'ROOT_PATH': '/tmp/edx-s3/financial_reports',
 }
 
+# Number of students graded together (sharing a single score query and
+# grading context) when generating grade reports.
+GRADE_REPORT_BATCH_SIZE = 100
+
+# Number of students graded by each subtask of a grade report, when grade
+# report subtasks are enabled with FEATURES['ENABLE_GRADE_REPORT_SUBTASKS'].
+GRADE_REPORT_STUDENTS_PER_SUBTASK = 5000
+
+# Number of seconds between the attempts to merge the parts of a grade report
+# generated by subtasks, and number of times a failed merge is retried.
+GRADE_REPORT_MERGE_RETRY_DELAY = 60
+GRADE_REPORT_MERGE_MAX_RETRIES = 5
+
 #### PASSWORD POLICY SETTINGS #####
 PASSWORD_MIN_LENGTH = 8
 PASSWORD_MAX_LENGTH = None
@@ -2868,6 +2930,11 @@ PROCTORING_SETTINGS = {}
 # to compete with the MOOC.
 CCX_MAX_STUDENTS_ALLOWED = 200
 
+# Number of seconds the field overrides of a CCX are kept in the cache.  Editing
+# them changes the CCX's override version, so they are reread from the
+# database from then on.  Set to 0 to disable.
+CCX_OVERRIDES_CACHE_TIMEOUT = 60 * 60
+
 # Financial assistance settings
 
 # Maximum and minimum length of answers, in characters, for the
@@ -2897,6 +2964,34 @@ MOBILE_APP_USER_AGENT_REGEXES = [
 # cache timeout in seconds for Mobile App Version Upgrade
 APP_UPGRADE_CACHE_TIMEOUT = 3600
 
+# Maximum size, in bytes, of the serialized Block Structures kept in each
+# process' in-memory cache in front of the shared cache.  Set to 0 to disable.
+BLOCK_STRUCTURES_LOCAL_CACHE_MAX_SIZE = 64 * 1024 * 1024
+
+# Maximum size, in bytes, of the pickled split modulestore course structures
+# kept in each process' in-memory cache in front of the course_structure_cache.
+# Set to 0 to disable.
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_SIZE = 128 * 1024 * 1024
+
+# Number of seconds ConfigurationModel entries are kept in each process'
+# memory in front of the configuration cache.  Saving an entry invalidates
+# them in all processes from their next request.  Set to 0 to disable.
+CONFIGURATION_MODEL_LOCAL_CACHE_TIMEOUT = 60
+
+# Scope.user_state fields, by block type, whose updates are buffered in the
+# cache and written to StudentModule by a celery task
+# USER_STATE_WRITE_BEHIND_DELAY seconds later, so that repeated updates by a
+# user are written once.  Only list fields whose loss wouldn't matter much, e.g.
+# {'video': ['saved_video_position'], 'sequential': ['position']}: updates
+# that set any other field, such as scores, are written immediately.
+USER_STATE_WRITE_BEHIND_FIELDS = {}
+USER_STATE_WRITE_BEHIND_DELAY = 30
+
+# Number of seconds after a score change that a celery task updates the
+# persisted grades of the user, when ENABLE_PERSISTENT_GRADES is set.  Until
+# then, their course grade is recomputed when read.
+PERSISTENT_GRADES_UPDATE_DELAY = 10
+
 # Offset for courseware.StudentModuleHistoryExtended which is used to
 # calculate the starting primary key for the underlying table.  This gap
 # should be large enough that you do not generate more than N courseware.StudentModuleHistory
@@ -2912,6 +3007,14 @@ DEPRECATED_ADVANCED_COMPONENT_TYPES = []
 
 AUDIT_CERT_CUTOFF_DATE = None
 
+# Number of students graded and given certificates together when generating
+# the certificates of a course.
+CERTIFICATE_GENERATION_BATCH_SIZE = 100
+
+# Number of threads sending the certificate generation tasks of a course to the
+# XQueue.  Set to 0 to send them one after the other.
+CERTIFICATE_XQUEUE_SUBMISSION_WORKERS = 0
+
 ################################ Settings for Credentials Service ################################
 
 CREDENTIALS_SERVICE_USERNAME = 'credentials_service_user'
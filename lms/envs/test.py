@@ -231,6 +231,15 @@ CACHES = {
     },
 }
 
+# Like the caches above, don't keep course structures between tests.
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_SIZE = 0
+
+# Tests mock GeoIP lookups, so don't remember their results between tests.
+EMBARGO_IP_COUNTRY_CACHE_SIZE = 0
+
+# Tests change configuration directly, so only keep it in the caches above.
+CONFIGURATION_MODEL_LOCAL_CACHE_TIMEOUT = 0
+
 # Dummy secret key for dev
 SECRET_KEY = '85920908f28904ed733fe576320db18cabd7b6cd'
 
@@ -2,7 +2,13 @@
 from contextlib import contextmanager
 import dogstats_wrapper as dog_stats_api
 import logging
+from multiprocessing.pool import ThreadPool
+import os
 import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
+import sys
+from threading import local, Lock
 from django.conf import settings
 from time import time
 from uuid import uuid4
@@ -10,6 +16,21 @@ from django.utils.translation import get_language
 
 log = logging.getLogger(__name__)
 
+# The process-wide session used to send requests to the comments service
+# when FEATURES['ENABLE_FORUM_REQUEST_POOLING'] is enabled.
+_SESSION = None
+_SESSION_LOCK = Lock()
+
+# The process-wide pool of threads perform_concurrently calls functions in,
+# and the id of the process that created it.
+_WORKER_POOL = None
+_WORKER_POOL_PID = None
+_WORKER_POOL_LOCK = Lock()
+
+# Request settings of the calling thread, for requests sent from the
+# worker threads of perform_concurrently.
+_WORKER_CONTEXT = local()
+
 
 def strip_none(dic):
     return dict([(k, v) for k, v in dic.iteritems() if v is not None])
@@ -51,11 +72,131 @@ def request_timer(request_id, method, url, tags=None):
     )
 
 
-def perform_request(method, url, data_or_params=None, raw=False,
-                    metric_action=None, metric_tags=None, paged_results=False):
+def request_pooling_enabled():
+    """
+    Returns whether requests to the comments service are sent over a
+    pooled session and may be made concurrently.
+    """
+    return settings.FEATURES.get('ENABLE_FORUM_REQUEST_POOLING', False)
+
+
+def get_session():
+    """
+    Returns the process-wide requests.Session used to send requests to
+    the comments service, which keeps up to COMMENTS_SERVICE_POOL_SIZE
+    connections alive and retries failed connection attempts up to
+    COMMENTS_SERVICE_MAX_RETRIES times.
+    """
+    global _SESSION  # pylint: disable=global-statement
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                pool_size = getattr(settings, 'COMMENTS_SERVICE_POOL_SIZE', 10)
+                # Only retry connecting, since other requests may not be idempotent.
+                max_retries = Retry(
+                    total=getattr(settings, 'COMMENTS_SERVICE_MAX_RETRIES', 0),
+                    read=False,
+                )
+                session = requests.Session()
+                for prefix in ('http://', 'https://'):
+                    session.mount(
+                        prefix,
+                        HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=max_retries),
+                    )
+                _SESSION = session
+    return _SESSION
+
+
+def get_worker_pool():
+    """
+    Returns the process-wide pool of COMMENTS_SERVICE_CONCURRENCY threads
+    that perform_concurrently calls functions in.
+    """
+    global _WORKER_POOL, _WORKER_POOL_PID  # pylint: disable=global-statement
+    # The threads of a pool created before the process was forked don't
+    # exist in the forked process.
+    if _WORKER_POOL is None or _WORKER_POOL_PID != os.getpid():
+        with _WORKER_POOL_LOCK:
+            if _WORKER_POOL is None or _WORKER_POOL_PID != os.getpid():
+                _WORKER_POOL = ThreadPool(getattr(settings, 'COMMENTS_SERVICE_CONCURRENCY', 4))
+                _WORKER_POOL_PID = os.getpid()
+    return _WORKER_POOL
+
+
+def _get_connection_timeout():
+    """
+    Returns the timeout for requests to the comments service.
+    """
+    timeout = getattr(_WORKER_CONTEXT, 'connection_timeout', None)
+    if timeout is not None:
+        return timeout
+
     # To avoid dependency conflict
     from django_comment_common.models import ForumsConfig
 
+    return ForumsConfig.current().connection_timeout
+
+
+def perform_concurrently(*funcs):
+    """
+    Calls the given functions and returns the list of their results.
+
+    When request pooling is enabled, all functions but the first are
+    called in the threads of the worker pool, so the requests they send
+    to the comments service are made concurrently.  Those functions must
+    not use the database or other per-thread state besides making
+    requests with perform_request, nor call perform_concurrently.  The
+    first function is called in the calling thread and has no such
+    restriction.
+
+    If any function raises an exception, the first one raised (in the
+    order of the given functions) is re-raised once all functions have
+    returned.
+    """
+    if not request_pooling_enabled() or len(funcs) < 2:
+        return [func() for func in funcs]
+
+    results = [None] * len(funcs)
+    exc_infos = [None] * len(funcs)
+    connection_timeout = _get_connection_timeout()
+    language = get_language()
+
+    def call(index):
+        """
+        Calls the function at the given index and records its outcome.
+        """
+        try:
+            results[index] = funcs[index]()
+        except Exception:  # pylint: disable=broad-except
+            exc_infos[index] = sys.exc_info()
+
+    def call_in_worker(index):
+        """
+        Calls the function at the given index with the calling thread's
+        request settings.
+        """
+        _WORKER_CONTEXT.connection_timeout = connection_timeout
+        _WORKER_CONTEXT.language = language
+        try:
+            call(index)
+        finally:
+            # The worker goes on to call functions for other requests.
+            del _WORKER_CONTEXT.connection_timeout
+            del _WORKER_CONTEXT.language
+
+    pending = [get_worker_pool().apply_async(call_in_worker, (index,)) for index in range(1, len(funcs))]
+    call(0)
+    for async_result in pending:
+        async_result.wait()
+
+    for exc_info in exc_infos:
+        if exc_info is not None:
+            raise exc_info[0], exc_info[1], exc_info[2]
+    return results
+
+
+def perform_request(method, url, data_or_params=None, raw=False,
+                    metric_action=None, metric_tags=None, paged_results=False):
     if metric_tags is None:
         metric_tags = []
 
@@ -67,7 +208,7 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data_or_params = {}
     headers = {
         'X-Edx-Api-Key': getattr(settings, "COMMENTS_SERVICE_KEY", None),
-        'Accept-Language': get_language(),
+        'Accept-Language': getattr(_WORKER_CONTEXT, 'language', None) or get_language(),
     }
     request_id = uuid4()
     request_id_dict = {'request_id': request_id}
@@ -79,14 +220,14 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data = None
         params = merge_dict(data_or_params, request_id_dict)
     with request_timer(request_id, method, url, metric_tags):
-        config = ForumsConfig.current()
-        response = requests.request(
+        send_request = get_session().request if request_pooling_enabled() else requests.request
+        response = send_request(
             method,
             url,
             data=data,
             params=params,
             headers=headers,
-            timeout=config.connection_timeout
+            timeout=_get_connection_timeout()
         )
 
     metric_tags.append(u'status_code:{}'.format(response.status_code))
@@ -1,7 +1,9 @@
 """
 Higher order functions built on the BlockStructureManager to interact with a django cache.
 """
+from django.conf import settings
 from django.core.cache import cache
+from openedx.core.lib.block_structure.cache import BlockStructureLocalCache
 from openedx.core.lib.block_structure.manager import BlockStructureManager
 from xmodule.modulestore.django import modulestore
 
@@ -48,7 +50,7 @@ def get_block_structure_manager(course_key):
     """
     store = modulestore()
     course_usage_key = store.make_course_usage_key(course_key)
-    return BlockStructureManager(course_usage_key, store, get_cache())
+    return BlockStructureManager(course_usage_key, store, get_cache(), get_local_cache())
 
 
 def get_cache():
@@ -56,3 +58,19 @@ def get_cache():
     Returns the storage for caching Block Structures.
     """
     return cache
+
+
+# Per-process cache of serialized Block Structures, created on first use.
+_LOCAL_CACHE = []
+
+
+def get_local_cache():
+    """
+    Returns the in-process cache that is checked before reading
+    Block Structures from the storage returned by get_cache, or None if
+    the in-process cache is disabled.
+    """
+    if not _LOCAL_CACHE:
+        max_size = getattr(settings, 'BLOCK_STRUCTURES_LOCAL_CACHE_MAX_SIZE', 0)
+        _LOCAL_CACHE.append(BlockStructureLocalCache(max_size) if max_size else None)
+    return _LOCAL_CACHE[0]
@@ -5,9 +5,11 @@ Module with family of classes for block structures.
     BlockStructureModulestoreData - responsible for xBlock data.
 
 The following internal data structures are implemented:
-    _BlockRelations - Data structure for a single block's relations.
+    _Adjacency - Data structure for one direction of the blocks' relations.
+    _BlockRelations - Data structure for the relations of all blocks.
     _BlockData - Data structure for a single block's data.
 """
+from array import array
 from functools import partial
 from logging import getLogger
 
@@ -23,20 +25,287 @@ logger = getLogger(__name__)  # pylint: disable=invalid-name
 TRANSFORMER_VERSION_KEY = '_version'
 
 
+class _Adjacency(object):
+    """
+    Data structure for one direction of the relations between blocks,
+    identified by their integer indices, e.g. the children of each
+    block.
+
+    The relations are stored in compressed sparse row arrays: the
+    related blocks of block i are targets[offsets[i]:offsets[i + 1]].
+    A block whose relations change after construction is given its own
+    list, which takes precedence over the arrays.
+    """
+    # Type code of the arrays.
+    TYPECODE = 'i'
+
+    def __init__(self, offsets=None, targets=None):
+
+        # Offsets of each block's relations in targets.
+        # array [int]
+        self.offsets = offsets if offsets is not None else array(self.TYPECODE, [0])
+
+        # Indices of the related blocks, grouped by block.
+        # array [int]
+        self.targets = targets if targets is not None else array(self.TYPECODE)
+
+        # Map of a block's index to its changed relations.
+        # dict {int: [int]}
+        self._changed = {}
+
+    @classmethod
+    def from_lists(cls, lists):
+        """
+        Returns an _Adjacency for the given list of lists of indices,
+        where the list at position i holds the related blocks of
+        block i.
+        """
+        offsets = array(cls.TYPECODE, [0])
+        targets = array(cls.TYPECODE)
+        for targets_of_block in lists:
+            targets.extend(targets_of_block)
+            offsets.append(len(targets))
+        return cls(offsets, targets)
+
+    def get(self, index):
+        """
+        Returns the list of indices related to the block at the given
+        index.  The list must not be mutated.
+        """
+        targets = self._changed.get(index)
+        if targets is None:
+            if index + 1 < len(self.offsets):
+                return self.targets[self.offsets[index]:self.offsets[index + 1]].tolist()
+            return []
+        return targets
+
+    def set(self, index, targets):
+        """
+        Replaces the related blocks of the block at the given index.
+        """
+        self._changed[index] = targets
+
+    def append(self, index, target):
+        """
+        Adds target to the related blocks of the block at the given
+        index.
+        """
+        self._get_changed(index).append(target)
+
+    def remove(self, index, target):
+        """
+        Removes target from the related blocks of the block at the
+        given index.
+        """
+        self._get_changed(index).remove(target)
+
+    def _get_changed(self, index):
+        """
+        Returns the changeable list of related blocks of the block at
+        the given index.
+        """
+        targets = self._changed.get(index)
+        if targets is None:
+            targets = self._changed[index] = self.get(index)
+        return targets
+
+
 class _BlockRelations(object):
     """
-    Data structure to encapsulate relationships for a single block,
-    including its children and parents.
+    Data structure to encapsulate the relationships between the blocks
+    of a block structure, including their children and parents.
+
+    Usage keys are interned to integer indices, and the relations and
+    traversals operate on those indices, which are cheaper to hash and
+    compare than usage keys.  The parents and children of all blocks
+    are held in two _Adjacency arrays rather than in lists per block.
     """
-    def __init__(self):
+    def __init__(self, block_keys=None, parents=None, children=None):
 
-        # List of usage keys of this block's parents.
+        # List of the usage keys of the blocks, by index.  A removed
+        # block's key is left in place so indices remain stable.
         # list [UsageKey]
-        self.parents = []
+        self.block_keys = block_keys if block_keys is not None else []
 
-        # List of usage keys of this block's children.
-        # list [UsageKey]
-        self.children = []
+        # Map of the usage key of each block in the structure to its
+        # index.  The existence of a block in the structure is
+        # determined by its presence in this map.
+        # dict {UsageKey: int}
+        self.indices = {block_key: index for index, block_key in enumerate(self.block_keys)}
+
+        # Indices of each block's parents.
+        # _Adjacency
+        self.parents = parents if parents is not None else _Adjacency()
+
+        # Indices of each block's children.
+        # _Adjacency
+        self.children = children if children is not None else _Adjacency()
+
+    def __contains__(self, usage_key):
+        return usage_key in self.indices
+
+    def __iter__(self):
+        return self.indices.iterkeys()
+
+    def __len__(self):
+        return len(self.indices)
+
+    def get_parents(self, usage_key):
+        """
+        Returns the usage keys of the given block's parents.
+        """
+        block_keys = self.block_keys
+        return [block_keys[index] for index in self.parents.get(self.indices[usage_key])]
+
+    def get_children(self, usage_key):
+        """
+        Returns the usage keys of the given block's children.
+        """
+        block_keys = self.block_keys
+        return [block_keys[index] for index in self.children.get(self.indices[usage_key])]
+
+    def add_block(self, usage_key):
+        """
+        Adds the given block, if not already present, and returns its
+        index.
+        """
+        index = self.indices.get(usage_key)
+        if index is None:
+            index = self.indices[usage_key] = len(self.block_keys)
+            self.block_keys.append(usage_key)
+        return index
+
+    def add_relation(self, parent_key, child_key):
+        """
+        Adds a parent to child relationship, adding the blocks if
+        needed.
+        """
+        self._add_relation(self.add_block(parent_key), self.add_block(child_key))
+
+    def clear_parents(self, usage_key):
+        """
+        Removes all parents of the given block.  The relations of the
+        parents themselves are not updated.
+        """
+        self.parents.set(self.indices[usage_key], [])
+
+    def remove_block(self, usage_key, keep_descendants):
+        """
+        Removes the given block and its relations.  See
+        BlockStructureBlockData.remove_block.
+        """
+        index = self.indices.pop(usage_key)
+        children = self.children.get(index)
+        parents = self.parents.get(index)
+
+        # Remove block from its children.
+        for child in children:
+            self.parents.remove(child, index)
+
+        # Remove block from its parents.
+        for parent in parents:
+            self.children.remove(parent, index)
+
+        self.children.set(index, [])
+        self.parents.set(index, [])
+
+        # Recreate the graph connections if descendants are to be kept.
+        if keep_descendants:
+            for child in children:
+                for parent in parents:
+                    self._add_relation(parent, child)
+
+    def traverse(self, traversal_func, start_node, filter_func=None, use_parents=False, **kwargs):
+        """
+        Returns a generator of the usage keys of the blocks yielded by
+        the given graph traversal function, which runs on the indices
+        of the blocks.
+
+        Arguments:
+            traversal_func (function) - A traversal function from
+                openedx.core.lib.graph_traversals.
+
+            start_node (UsageKey) - The block to start the traversal at.
+
+            filter_func ((UsageKey)->bool) - See the description in
+                openedx.core.lib.graph_traversals.
+
+            use_parents (bool) - Whether the traversal function takes
+                a get_parents accessor.
+
+            kwargs (dict) - Other keyword arguments to pass to the
+                traversal function.
+        """
+        start_index = self.indices.get(start_node)
+        if start_index is None:
+            # A block that is not in the structure has no relations.
+            return iter([start_node] if filter_func is None or filter_func(start_node) else [])
+
+        block_keys = self.block_keys
+        if filter_func is not None:
+            kwargs['filter_func'] = lambda index: filter_func(block_keys[index])
+        if use_parents:
+            kwargs['get_parents'] = self.parents.get
+        return (
+            block_keys[index]
+            for index in traversal_func(start_node=start_index, get_children=self.children.get, **kwargs)
+        )
+
+    def compacted(self, order=None):
+        """
+        Returns new relations holding only the blocks in the structure,
+        indexed consecutively with their relations in a single pair of
+        arrays.
+
+        Arguments:
+            order ([int]) - Indices of the blocks to keep, in their new
+                order.  Relations to other blocks are dropped, and each
+                block's parents are then ordered as in this list.  If
+                None, all blocks in the structure are kept with their
+                relations unchanged.
+        """
+        derive_parents = order is not None
+        if order is None:
+            order = sorted(self.indices.itervalues())
+        new_indices = {old_index: new_index for new_index, old_index in enumerate(order)}
+
+        children = [
+            [new_indices[child] for child in self.children.get(index) if child in new_indices]
+            for index in order
+        ]
+        if derive_parents:
+            parents = [[] for __ in order]
+            for parent, children_of_parent in enumerate(children):
+                for child in children_of_parent:
+                    parents[child].append(parent)
+        else:
+            parents = [
+                [new_indices[parent] for parent in self.parents.get(index) if parent in new_indices]
+                for index in order
+            ]
+
+        return _BlockRelations(
+            [self.block_keys[index] for index in order],
+            _Adjacency.from_lists(parents),
+            _Adjacency.from_lists(children),
+        )
+
+    def pruned(self, root_block_usage_key):
+        """
+        Returns new relations holding only the blocks reachable from the
+        given root block.
+        """
+        root_index = self.indices.get(root_block_usage_key)
+        if root_index is None:
+            return _BlockRelations()
+        return self.compacted(list(traverse_post_order(start_node=root_index, get_children=self.children.get)))
+
+    def _add_relation(self, parent_index, child_index):
+        """
+        Adds a parent to child relationship between the given indices.
+        """
+        self.parents.append(child_index, parent_index)
+        self.children.append(parent_index, child_index)
 
 
 class BlockStructure(object):
@@ -55,14 +324,14 @@ class BlockStructure(object):
         # UsageKey
         self.root_block_usage_key = root_block_usage_key
 
-        # Map of a block's usage key to its block relations. The
+        # Relations between the blocks in the structure. The
         # existence of a block in the structure is determined by its
-        # presence in this map.
-        # dict {UsageKey: _BlockRelations}
-        self._block_relations = {}
+        # presence in these relations.
+        # _BlockRelations
+        self._block_relations = _BlockRelations()
 
         # Add the root block.
-        self._add_block(self._block_relations, root_block_usage_key)
+        self._block_relations.add_block(root_block_usage_key)
 
     def __iter__(self):
         """
@@ -90,7 +359,7 @@ class BlockStructure(object):
         Returns:
             [UsageKey] - A list of usage keys of the block's parents.
         """
-        return self._block_relations[usage_key].parents if usage_key in self else []
+        return self._block_relations.get_parents(usage_key) if usage_key in self else []
 
     def get_children(self, usage_key):
         """
@@ -104,7 +373,7 @@ class BlockStructure(object):
         Returns:
             [UsageKey] - A list of usage keys of the block's children.
         """
-        return self._block_relations[usage_key].children if usage_key in self else []
+        return self._block_relations.get_children(usage_key) if usage_key in self else []
 
     def set_root_block(self, usage_key):
         """
@@ -119,7 +388,7 @@ class BlockStructure(object):
                 new root of the block structure.
         """
         self.root_block_usage_key = usage_key
-        self._block_relations[usage_key].parents = []
+        self._block_relations.clear_parents(usage_key)
 
     def __contains__(self, usage_key):
         """
@@ -144,7 +413,7 @@ class BlockStructure(object):
             iterator(UsageKey) - An iterator of the usage
             keys of all the blocks in the block structure.
         """
-        return self._block_relations.iterkeys()
+        return iter(self._block_relations)
 
     #--- Block structure traversal methods ---#
 
@@ -166,11 +435,11 @@ class BlockStructure(object):
             generator - A generator object created from the
                 traverse_topologically method.
         """
-        return traverse_topologically(
+        return self._block_relations.traverse(
+            traverse_topologically,
             start_node=start_node or self.root_block_usage_key,
-            get_parents=self.get_parents,
-            get_children=self.get_children,
             filter_func=filter_func,
+            use_parents=True,
             yield_descendants_of_unyielded=yield_descendants_of_unyielded,
         )
 
@@ -191,9 +460,9 @@ class BlockStructure(object):
             generator - A generator object created from the
                 traverse_post_order method.
         """
-        return traverse_post_order(
+        return self._block_relations.traverse(
+            traverse_post_order,
             start_node=start_node or self.root_block_usage_key,
-            get_children=self.get_children,
             filter_func=filter_func,
         )
 
@@ -204,29 +473,7 @@ class BlockStructure(object):
         """
         Mutates this block structure by removing any unreachable blocks.
         """
-
-        # Create a new block relations map to store only those blocks
-        # that are still linked
-        pruned_block_relations = {}
-        old_block_relations = self._block_relations
-
-        # Build the structure from the leaves up by doing a post-order
-        # traversal of the old structure, thereby encountering only
-        # reachable blocks.
-        for block_key in self.post_order_traversal():
-            # If the block is in the old structure,
-            if block_key in old_block_relations:
-                # Add it to the new pruned structure
-                self._add_block(pruned_block_relations, block_key)
-
-                # Add a relationship to only those old children that
-                # were also added to the new pruned structure.
-                for child in old_block_relations[block_key].children:
-                    if child in pruned_block_relations:
-                        self._add_to_relations(pruned_block_relations, block_key, child)
-
-        # Replace this structure's relations with the newly pruned one.
-        self._block_relations = pruned_block_relations
+        self._block_relations = self._block_relations.pruned(self.root_block_usage_key)
 
     def _add_relation(self, parent_key, child_key):
         """
@@ -236,44 +483,7 @@ class BlockStructure(object):
             parent_key (UsageKey) - Usage key of the parent block.
             child_key (UsageKey) - Usage key of the child block.
         """
-        self._add_to_relations(self._block_relations, parent_key, child_key)
-
-    @staticmethod
-    def _add_to_relations(block_relations, parent_key, child_key):
-        """
-        Adds a parent to child relationship in the given block
-        relations map.
-
-        Arguments:
-            block_relations (dict({UsageKey: _BlockRelations})) -
-                Internal map of a block's usage key to its
-                parents/children relations.
-
-            parent_key (UsageKey) - Usage key of the parent block.
-
-            child_key (UsageKey) - Usage key of the child block.
-        """
-        BlockStructure._add_block(block_relations, parent_key)
-        BlockStructure._add_block(block_relations, child_key)
-
-        block_relations[child_key].parents.append(parent_key)
-        block_relations[parent_key].children.append(child_key)
-
-    @staticmethod
-    def _add_block(block_relations, usage_key):
-        """
-        Adds the given usage_key to the given block_relations map.
-
-        Arguments:
-            block_relations (dict({UsageKey: _BlockRelations})) -
-                Internal map of a block's usage key to its
-                parents/children relations.
-
-            usage_key (UsageKey) - Usage key of the block that is to
-                be added to the given block_relations.
-        """
-        if usage_key not in block_relations:
-            block_relations[usage_key] = _BlockRelations()
+        self._block_relations.add_relation(parent_key, child_key)
 
 
 class FieldData(object):
@@ -588,27 +798,9 @@ class BlockStructureBlockData(BlockStructure):
                 removed block's children become children of the
                 removed block's parents.
         """
-        children = self._block_relations[usage_key].children
-        parents = self._block_relations[usage_key].parents
-
-        # Remove block from its children.
-        for child in children:
-            self._block_relations[child].parents.remove(usage_key)
-
-        # Remove block from its parents.
-        for parent in parents:
-            self._block_relations[parent].children.remove(usage_key)
-
-        # Remove block.
-        self._block_relations.pop(usage_key, None)
+        self._block_relations.remove_block(usage_key, keep_descendants)
         self._block_data_map.pop(usage_key, None)
 
-        # Recreate the graph connections if descendants are to be kept.
-        if keep_descendants:
-            for child in children:
-                for parent in parents:
-                    self._add_relation(parent, child)
-
     def create_universal_filter(self):
         """
         Returns a filter function that always returns True for all blocks.
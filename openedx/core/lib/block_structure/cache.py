@@ -2,62 +2,179 @@
 Module for the Cache class for BlockStructure objects.
 """
 # pylint: disable=protected-access
+from array import array
+from collections import OrderedDict
+import cPickle as pickle
+from hashlib import md5
+from itertools import chain
 from logging import getLogger
+from threading import Lock
+import zlib
 
-from openedx.core.lib.cache_utils import zpickle, zunpickle
-
-from .block_structure import BlockStructureModulestoreData, BlockStructureBlockData
+from .block_structure import (
+    BlockData,
+    BlockStructureBlockData,
+    BlockStructureModulestoreData,
+    TransformerData,
+    TransformerDataMap,
+    _Adjacency,
+    _BlockRelations,
+)
 
 
 logger = getLogger(__name__)  # pylint: disable=C0103
 
 
+# The version of the serialization format written by
+# BlockStructureCache.  Update this value whenever the format changes
+# so previously cached data is no longer read.
+SERIALIZATION_VERSION = 3
+
+
+class BlockStructureLocalCache(object):
+    """
+    A size-bounded, least-recently-used, in-process cache of serialized
+    block structures.  It sits in front of the shared cache used by
+    BlockStructureCache so a process does not need to fetch and
+    decompress the same structure for every request.
+
+    Entries are keyed by the root block usage key and record the
+    version of the structure they hold, so an entry is only used while
+    it matches the version found in the shared cache.
+    """
+    def __init__(self, max_size):
+        """
+        Arguments:
+            max_size (int) - The maximum total size, in bytes, of the
+                serialized data held by the cache.  The least recently
+                used entries are evicted once this size is exceeded.
+        """
+        self.max_size = max_size
+        self._size = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        """
+        The total size, in bytes, of the serialized data in the cache.
+        """
+        return self._size
+
+    def get(self, root_block_usage_key, version):
+        """
+        Returns the serialized data for the given root_block_usage_key
+        if the cache holds it for the given version; returns None
+        otherwise.
+        """
+        with self._lock:
+            entry = self._entries.pop(root_block_usage_key, None)
+            if entry is None:
+                return None
+            # Re-insert the entry as the most recently used one.
+            self._entries[root_block_usage_key] = entry
+        entry_version, data = entry
+        return data if entry_version == version else None
+
+    def set(self, root_block_usage_key, version, data):
+        """
+        Stores the given serialized data for the given
+        root_block_usage_key and version, replacing any other version
+        held for the same key.
+        """
+        with self._lock:
+            self._discard(root_block_usage_key)
+            if len(data) > self.max_size:
+                return
+            self._entries[root_block_usage_key] = (version, data)
+            self._size += len(data)
+            while self._size > self.max_size:
+                __, (__, evicted_data) = self._entries.popitem(last=False)
+                self._size -= len(evicted_data)
+
+    def delete(self, root_block_usage_key):
+        """
+        Removes any data held for the given root_block_usage_key.
+        """
+        with self._lock:
+            self._discard(root_block_usage_key)
+
+    def clear(self):
+        """
+        Removes all entries from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _discard(self, root_block_usage_key):
+        """
+        Removes the entry for the given key.  Must be called while
+        holding the lock.
+        """
+        entry = self._entries.pop(root_block_usage_key, None)
+        if entry is not None:
+            self._size -= len(entry[1])
+
+
 class BlockStructureCache(object):
     """
     Cache for BlockStructure objects.
     """
-    def __init__(self, cache):
+    def __init__(self, cache, local_cache=None):
         """
         Arguments:
             cache (django.core.cache.backends.base.BaseCache) - The
                 cache into which cacheable data of the block structure
                 is to be serialized.
+
+            local_cache (BlockStructureLocalCache) - An optional
+                in-process cache that is checked before reading the
+                serialized data from the given cache.
         """
         self._cache = cache
+        self._local_cache = local_cache
 
     def add(self, block_structure):
         """
-        Store a compressed and pickled serialization of the given
-        block structure into the given cache.
+        Store a compressed serialization of the given block structure
+        into the given cache.
 
-        The key in the cache is 'root.key.<root_block_usage_key>'.
-        The data stored in the cache includes the structure's
-        block relations, transformer data, and block data.
+        The data is stored under a key that includes a hash of the
+        serialized data, and that hash is stored as the structure's
+        version under 'root.key.<root_block_usage_key>'.  The data
+        stored in the cache includes the structure's block relations,
+        transformer data, and block data.
 
         Arguments:
             block_structure (BlockStructure) - The block structure
                 that is to be serialized to the given cache.
         """
-        data_to_cache = (
-            block_structure._block_relations,
-            block_structure.transformer_data,
-            block_structure._block_data_map,
-        )
-        zp_data_to_cache = zpickle(data_to_cache)
+        root_block_usage_key = block_structure.root_block_usage_key
+        data = serialize_block_structure(block_structure)
+        zdata = zlib.compress(data)
+        version = md5(zdata).hexdigest()
 
         # Set the timeout value for the cache to 1 day as a fail-safe
         # in case the signal to invalidate the cache doesn't come through.
         timeout_in_seconds = 60 * 60 * 24
-        self._cache.set(
-            self._encode_root_cache_key(block_structure.root_block_usage_key),
-            zp_data_to_cache,
+        self._cache.set_many(
+            {
+                self._encode_data_cache_key(root_block_usage_key, version): zdata,
+                self._encode_root_cache_key(root_block_usage_key): version,
+            },
             timeout=timeout_in_seconds,
         )
+        if self._local_cache is not None:
+            self._local_cache.set(root_block_usage_key, version, data)
 
         logger.info(
             "Wrote BlockStructure %s to cache, size: %s",
-            block_structure.root_block_usage_key,
-            len(zp_data_to_cache),
+            root_block_usage_key,
+            len(zdata),
         )
 
     def get(self, root_block_usage_key):
@@ -68,6 +185,9 @@ class BlockStructureCache(object):
         The given root_block_usage_key must equate the root_block_usage_key
         previously passed to serialize_to_cache.
 
+        Only the small version entry is read from the given cache when
+        the local cache already holds the current version of the data.
+
         Arguments:
             root_block_usage_key (UsageKey) - The usage_key for the root
                 of the block structure that is to be deserialized from
@@ -79,54 +199,261 @@ class BlockStructureCache(object):
 
             NoneType - If the root_block_usage_key is not found in the cache.
         """
+        version = self._cache.get(self._encode_root_cache_key(root_block_usage_key))
+        data = None
+        if version:
+            if self._local_cache is not None:
+                data = self._local_cache.get(root_block_usage_key, version)
+            if data is None:
+                zdata = self._cache.get(self._encode_data_cache_key(root_block_usage_key, version))
+                if zdata:
+                    logger.info(
+                        "Read BlockStructure %r from cache, size: %s",
+                        root_block_usage_key,
+                        len(zdata),
+                    )
+                    data = zlib.decompress(zdata)
+                    if self._local_cache is not None:
+                        self._local_cache.set(root_block_usage_key, version, data)
 
-        # Find root_block_usage_key in the cache.
-        zp_data_from_cache = self._cache.get(self._encode_root_cache_key(root_block_usage_key))
-        if not zp_data_from_cache:
+        if data is None:
             logger.info(
                 "Did not find BlockStructure %r in the cache.",
                 root_block_usage_key,
             )
             return None
-        else:
-            logger.info(
-                "Read BlockStructure %r from cache, size: %s",
-                root_block_usage_key,
-                len(zp_data_from_cache),
-            )
 
-        # Deserialize and construct the block structure.
-        block_relations, transformer_data, block_data_map = zunpickle(zp_data_from_cache)
-        block_structure = BlockStructureModulestoreData(root_block_usage_key)
-        block_structure._block_relations = block_relations
-        block_structure.transformer_data = transformer_data
-        block_structure._block_data_map = block_data_map
-
-        return block_structure
+        return deserialize_block_structure(root_block_usage_key, data)
 
     def delete(self, root_block_usage_key):
         """
         Deletes the block structure for the given root_block_usage_key
         from the given cache.
 
+        Only the version entry is deleted from the given cache; the
+        serialized data it referred to is left to expire.
+
         Arguments:
             root_block_usage_key (UsageKey) - The usage_key for the root
                 of the block structure that is to be removed from
                 the cache.
         """
         self._cache.delete(self._encode_root_cache_key(root_block_usage_key))
+        if self._local_cache is not None:
+            self._local_cache.delete(root_block_usage_key)
         logger.info(
             "Deleted BlockStructure %r from the cache.",
             root_block_usage_key,
         )
 
+    def get_version(self, root_block_usage_key):
+        """
+        Returns the version of the block structure for the given
+        root_block_usage_key that is in the given cache, or None if it
+        is not in the cache.
+        """
+        return self._cache.get(self._encode_root_cache_key(root_block_usage_key))
+
+    def add_transformed(self, block_structure, root_block_usage_key, version, equivalence_key):
+        """
+        Stores a serialization of the given transformed block structure
+        into the given cache, so it can be shared by all usages with
+        the given equivalence_key.
+
+        Arguments:
+            block_structure (BlockStructureBlockData) - The transformed
+                block structure, which may start at a block other than
+                root_block_usage_key.
+
+            root_block_usage_key (UsageKey) - The usage_key for the root
+                of the collected block structure that was transformed.
+
+            version (string) - The version of the collected block
+                structure that was transformed, as returned by
+                get_version.
+
+            equivalence_key (tuple) - The value returned by the
+                transformers' get_equivalence_key method.
+        """
+        cache_key = self._encode_transformed_cache_key(
+            root_block_usage_key, version, block_structure.root_block_usage_key, equivalence_key,
+        )
+        data = serialize_block_structure(block_structure)
+
+        # The version in the key keeps outdated entries from being read,
+        # so the timeout only bounds the space they use.
+        timeout_in_seconds = 60 * 60 * 24
+        self._cache.set(cache_key, zlib.compress(data), timeout=timeout_in_seconds)
+        if self._local_cache is not None:
+            self._local_cache.set(cache_key, version, data)
+
+    def get_transformed(self, root_block_usage_key, version, starting_block_usage_key, equivalence_key):
+        """
+        Deserializes and returns the block structure previously stored
+        by add_transformed for the given arguments, if it's found in
+        the cache; returns None otherwise.
+
+        Arguments:
+            root_block_usage_key (UsageKey) - The usage_key for the root
+                of the collected block structure.
+
+            version (string) - The version of the collected block
+                structure, as returned by get_version.
+
+            starting_block_usage_key (UsageKey) - The usage_key for the
+                root of the transformed block structure.
+
+            equivalence_key (tuple) - The value returned by the
+                transformers' get_equivalence_key method.
+        """
+        cache_key = self._encode_transformed_cache_key(
+            root_block_usage_key, version, starting_block_usage_key, equivalence_key,
+        )
+        data = self._local_cache.get(cache_key, version) if self._local_cache is not None else None
+        if data is None:
+            zdata = self._cache.get(cache_key)
+            if not zdata:
+                return None
+            data = zlib.decompress(zdata)
+            if self._local_cache is not None:
+                self._local_cache.set(cache_key, version, data)
+        return deserialize_block_structure(starting_block_usage_key, data)
+
     @classmethod
     def _encode_root_cache_key(cls, root_block_usage_key):
         """
-        Returns the cache key to use for storing the block structure
-        for the given root_block_usage_key.
+        Returns the cache key to use for storing the version of the
+        block structure for the given root_block_usage_key.
         """
-        return "v{version}.root.key.{root_usage_key}".format(
+        return "v{version}.s{serialization_version}.root.key.{root_usage_key}".format(
             version=unicode(BlockStructureBlockData.VERSION),
+            serialization_version=unicode(SERIALIZATION_VERSION),
             root_usage_key=unicode(root_block_usage_key),
         )
+
+    @classmethod
+    def _encode_data_cache_key(cls, root_block_usage_key, version):
+        """
+        Returns the cache key to use for storing the given version of
+        the serialized block structure for the given
+        root_block_usage_key.
+        """
+        return "{root_cache_key}.data.{version}".format(
+            root_cache_key=cls._encode_root_cache_key(root_block_usage_key),
+            version=version,
+        )
+
+    @classmethod
+    def _encode_transformed_cache_key(cls, root_block_usage_key, version, starting_block_usage_key, equivalence_key):
+        """
+        Returns the cache key to use for storing the transformed block
+        structure starting at starting_block_usage_key for the given
+        version of the collected block structure and equivalence_key.
+        """
+        return "{root_cache_key}.transformed.{version}.{hash}".format(
+            root_cache_key=cls._encode_root_cache_key(root_block_usage_key),
+            version=version,
+            hash=md5(repr((unicode(starting_block_usage_key), equivalence_key))).hexdigest(),
+        )
+
+
+def serialize_block_structure(block_structure):
+    """
+    Returns a compact serialization of the given block structure's
+    block relations, transformer data, and block data.
+
+    Each usage key is pickled only once: relations are stored as the
+    raw bytes of their index arrays, and the block and transformer data
+    refer to blocks by index and are stored as plain dicts instead of
+    pickled objects, which makes the data both smaller and faster to
+    load.
+
+    Arguments:
+        block_structure (BlockStructureBlockData) - The block structure
+            that is to be serialized.
+    """
+    block_relations = block_structure._block_relations.compacted()
+    block_data_map = block_structure._block_data_map
+
+    # Blocks may have data without being in the structure's relations.
+    block_keys = block_relations.block_keys
+    other_block_keys = [block_key for block_key in block_data_map if block_key not in block_relations]
+    block_indices = {block_key: index for index, block_key in enumerate(chain(block_keys, other_block_keys))}
+
+    block_data = [
+        (
+            block_indices[block_key],
+            data_for_block.fields,
+            _serialize_transformer_data_map(data_for_block.transformer_data),
+        )
+        for block_key, data_for_block in block_data_map.iteritems()
+    ]
+    return pickle.dumps(
+        (
+            block_keys,
+            other_block_keys,
+            tuple(
+                adjacency_array.tostring()
+                for adjacency in (block_relations.parents, block_relations.children)
+                for adjacency_array in (adjacency.offsets, adjacency.targets)
+            ),
+            _serialize_transformer_data_map(block_structure.transformer_data),
+            block_data,
+        ),
+        pickle.HIGHEST_PROTOCOL,
+    )
+
+
+def deserialize_block_structure(root_block_usage_key, data):
+    """
+    Returns a new block structure starting at root_block_usage_key
+    from the given data returned by serialize_block_structure.
+    """
+    block_keys, other_block_keys, adjacency_data, transformer_data, block_data = pickle.loads(data)
+
+    adjacency_arrays = []
+    for array_data in adjacency_data:
+        adjacency_array = array(_Adjacency.TYPECODE)
+        adjacency_array.fromstring(array_data)
+        adjacency_arrays.append(adjacency_array)
+    parent_offsets, parent_targets, child_offsets, child_targets = adjacency_arrays
+
+    all_block_keys = block_keys + other_block_keys
+    block_data_map = {}
+    for index, fields, block_transformer_data in block_data:
+        block_key = all_block_keys[index]
+        data_for_block = BlockData(block_key)
+        data_for_block.fields = fields
+        data_for_block.transformer_data = _deserialize_transformer_data_map(block_transformer_data)
+        block_data_map[block_key] = data_for_block
+
+    block_structure = BlockStructureModulestoreData(root_block_usage_key)
+    block_structure._block_relations = _BlockRelations(
+        block_keys,
+        _Adjacency(parent_offsets, parent_targets),
+        _Adjacency(child_offsets, child_targets),
+    )
+    block_structure.transformer_data = _deserialize_transformer_data_map(transformer_data)
+    block_structure._block_data_map = block_data_map
+    return block_structure
+
+
+def _serialize_transformer_data_map(transformer_data_map):
+    """
+    Returns a dict of transformer name to the fields of its
+    TransformerData in the given TransformerDataMap.
+    """
+    return {name: transformer_data.fields for name, transformer_data in transformer_data_map.iteritems()}
+
+
+def _deserialize_transformer_data_map(serialized_data):
+    """
+    Returns a TransformerDataMap for the data returned by
+    _serialize_transformer_data_map.
+    """
+    transformer_data_map = TransformerDataMap()
+    for name, fields in serialized_data.iteritems():
+        transformer_data = TransformerData()
+        transformer_data.fields = fields
+        dict.__setitem__(transformer_data_map, name, transformer_data)
+    return transformer_data_map
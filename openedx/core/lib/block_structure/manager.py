@@ -3,6 +3,7 @@ Top-level module for the Block Structure framework with a class for managing
 BlockStructures.
 """
 from contextlib import contextmanager
+from hashlib import md5
 
 from .cache import BlockStructureCache
 from .factory import BlockStructureFactory
@@ -15,7 +16,7 @@ class BlockStructureManager(object):
     Top-level class for managing Block Structures.
     """
 
-    def __init__(self, root_block_usage_key, modulestore, cache):
+    def __init__(self, root_block_usage_key, modulestore, cache, local_cache=None):
         """
         Arguments:
             root_block_usage_key (UsageKey) - The usage_key for the root
@@ -28,12 +29,16 @@ class BlockStructureManager(object):
             cache (django.core.cache.backends.base.BaseCache) - The
                 cache to use for storing/retrieving the block structure's
                 collected data.
+
+            local_cache (BlockStructureLocalCache) - An optional
+                in-process cache to check before reading the block
+                structure's collected data from the given cache.
         """
         self.root_block_usage_key = root_block_usage_key
         self.modulestore = modulestore
-        self.block_structure_cache = BlockStructureCache(cache)
+        self.block_structure_cache = BlockStructureCache(cache, local_cache)
 
-    def get_transformed(self, transformers, starting_block_usage_key=None):
+    def get_transformed(self, transformers, starting_block_usage_key=None, share_transformed=False):
         """
         Returns the transformed Block Structure for the root_block_usage_key,
         starting at starting_block_usage_key, getting block data from the cache
@@ -50,10 +55,19 @@ class BlockStructureManager(object):
                 in the block structure that is to be transformed.
                 If None, root_block_usage_key is used.
 
+            share_transformed (bool) - Whether the transformed Block
+                Structure may be read from and stored into the cache,
+                to be shared with all usages for which the transformers
+                return the same equivalence key.  See
+                BlockStructureTransformers.get_equivalence_key.
+
         Returns:
             BlockStructureBlockData - A transformed block structure,
                 starting at starting_block_usage_key.
         """
+        # Read the version before the collected structure so a transformed
+        # structure is never stored under a version newer than its data.
+        version = self.block_structure_cache.get_version(self.root_block_usage_key) if share_transformed else None
         block_structure = self.get_collected()
         if starting_block_usage_key:
             # Override the root_block_usage_key so traversals start at the
@@ -65,10 +79,70 @@ class BlockStructureManager(object):
                     unicode(starting_block_usage_key),
                     unicode(self.root_block_usage_key),
                 )
+
+        equivalence_key = transformers.get_equivalence_key(block_structure) if version else None
+        if equivalence_key is not None:
+            transformed_block_structure = self.block_structure_cache.get_transformed(
+                self.root_block_usage_key,
+                version,
+                starting_block_usage_key or self.root_block_usage_key,
+                equivalence_key,
+            )
+            if transformed_block_structure is not None:
+                return transformed_block_structure
+
+        if starting_block_usage_key:
             block_structure.set_root_block(starting_block_usage_key)
         transformers.transform(block_structure)
+
+        if equivalence_key is not None:
+            self.block_structure_cache.add_transformed(
+                block_structure, self.root_block_usage_key, version, equivalence_key,
+            )
         return block_structure
 
+    def get_transformed_fingerprint(self, transformers, starting_block_usage_key=None):
+        """
+        Returns a string identifying the Block Structure get_transformed
+        returns for the given arguments, without transforming it, or None if
+        it can't be identified.
+
+        The fingerprint is built from the version of the cached collected
+        Block Structure and from the transformers' equivalence key, so it
+        changes whenever the collected data changes, and is shared by all
+        usages that are transformed in the same way.
+
+        Arguments:
+            transformers (BlockStructureTransformers) - Collection of
+                transformers to apply.
+
+            starting_block_usage_key (UsageKey) - Specifies the starting block
+                in the block structure that is to be transformed.
+                If None, root_block_usage_key is used.
+
+        Returns:
+            string - The fingerprint, or None if the collected Block
+                Structure isn't cached yet, doesn't contain
+                starting_block_usage_key, or if any transformer's transform
+                is specific to the transformers' usage_info.
+        """
+        # As in get_transformed, read the version before the collected
+        # structure, so the fingerprint never claims a newer version than
+        # the data it's computed from.
+        version = self.block_structure_cache.get_version(self.root_block_usage_key)
+        if not version:
+            return None
+
+        starting_block_usage_key = starting_block_usage_key or self.root_block_usage_key
+        block_structure = self.get_collected()
+        if starting_block_usage_key not in block_structure:
+            return None
+
+        equivalence_key = transformers.get_equivalence_key(block_structure)
+        if equivalence_key is None:
+            return None
+        return md5(repr((version, unicode(starting_block_usage_key), equivalence_key))).hexdigest()
+
     def get_collected(self):
         """
         Returns the collected Block Structure for the root_block_usage_key,
@@ -95,6 +95,14 @@ class MockCache(object):
         self.map[key] = val
         self.timeout_from_last_call = timeout
 
+    def set_many(self, data, timeout):
+        """
+        Associates each key in the given dict with its value in the cache.
+        """
+        self.set_call_count += 1
+        self.map.update(data)
+        self.timeout_from_last_call = timeout
+
     def get(self, key, default=None):
         """
         Returns the value associated with the given key in the cache;
@@ -9,7 +9,7 @@ import itertools
 from nose.plugins.attrib import attr
 from unittest import TestCase
 
-from openedx.core.lib.graph_traversals import traverse_post_order
+from openedx.core.lib.graph_traversals import traverse_post_order, traverse_topologically
 
 from ..block_structure import BlockStructure, BlockStructureModulestoreData
 from ..exceptions import TransformerException
@@ -23,13 +23,21 @@ class TestBlockStructure(TestCase, ChildrenMapTestMixin):
     Tests for BlockStructure
     """
     @ddt.data(
-        [],
-        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
-        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
-        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+        *itertools.product(
+            [
+                [],
+                ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+                ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+                ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+            ],
+            [True, False],
+        )
     )
-    def test_relations(self, children_map):
+    @ddt.unpack
+    def test_relations(self, children_map, compact):
         block_structure = self.create_block_structure(children_map, BlockStructure)
+        if compact:
+            block_structure._block_relations = block_structure._block_relations.compacted()
 
         # get_children
         for parent, children in enumerate(children_map):
@@ -44,6 +52,28 @@ class TestBlockStructure(TestCase, ChildrenMapTestMixin):
             self.assertIn(node, block_structure)
         self.assertNotIn(len(children_map) + 1, block_structure)
 
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_traversals(self, children_map):
+        block_structure = self.create_block_structure(children_map, BlockStructure)
+        parents_map = self.get_parents_map(children_map)
+        topological_order = list(block_structure.topological_traversal())
+        post_order = list(block_structure.post_order_traversal())
+
+        self.assertEquals(
+            topological_order,
+            list(traverse_topologically(0, lambda block: parents_map[block], lambda block: children_map[block])),
+        )
+        self.assertEquals(post_order, list(traverse_post_order(0, lambda block: children_map[block])))
+
+        # The traversals are the same once the relations are compacted.
+        block_structure._block_relations = block_structure._block_relations.compacted()
+        self.assertEquals(list(block_structure.topological_traversal()), topological_order)
+        self.assertEquals(list(block_structure.post_order_traversal()), post_order)
+
 
 @attr('shard_2')
 @ddt.ddt
@@ -163,16 +193,19 @@ class TestBlockStructureData(TestCase, ChildrenMapTestMixin):
                 ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
                 ChildrenMapTestMixin.DAG_CHILDREN_MAP,
             ],
+            [True, False],
         )
     )
     @ddt.unpack
-    def test_remove_block(self, keep_descendants, block_to_remove, children_map):
+    def test_remove_block(self, keep_descendants, block_to_remove, children_map, compact):
         ### skip test if invalid
         if (block_to_remove >= len(children_map)) or (keep_descendants and block_to_remove == 0):
             return
 
         ### create structure
         block_structure = self.create_block_structure(children_map)
+        if compact:
+            block_structure._block_relations = block_structure._block_relations.compacted()
         parents_map = self.get_parents_map(children_map)
 
         ### verify blocks pre-exist
@@ -1,10 +1,11 @@
 """
 Tests for block_structure/cache.py
 """
+from mock import patch
 from nose.plugins.attrib import attr
 from unittest import TestCase
 
-from ..cache import BlockStructureCache
+from ..cache import BlockStructureCache, BlockStructureLocalCache
 from .helpers import ChildrenMapTestMixin, MockCache, MockTransformer
 
 
@@ -54,3 +55,102 @@ class TestBlockStructureCache(ChildrenMapTestMixin, TestCase):
         self.assertIsNone(
             self.block_structure_cache.get(self.block_structure.root_block_usage_key)
         )
+
+    def test_transformer_data(self):
+        self.add_transformers()
+        self.block_structure.set_transformer_data(MockTransformer, 'course_data', {'a': 1})
+        self.block_structure_cache.add(self.block_structure)
+
+        cached_value = self.block_structure_cache.get(self.block_structure.root_block_usage_key)
+        self.assertEquals(cached_value.get_transformer_data(MockTransformer, 'course_data'), {'a': 1})
+        self.assertEquals(
+            cached_value.get_transformer_block_field(0, MockTransformer, 'test'),
+            '{} val'.format(MockTransformer.name()),
+        )
+        self.assertEquals(
+            cached_value._get_transformer_data_version(MockTransformer),  # pylint: disable=protected-access
+            MockTransformer.VERSION,
+        )
+
+
+@attr('shard_2')
+class TestBlockStructureLocalCache(ChildrenMapTestMixin, TestCase):
+    """
+    Tests for BlockStructureCache with a BlockStructureLocalCache
+    """
+    def setUp(self):
+        super(TestBlockStructureLocalCache, self).setUp()
+        self.children_map = self.SIMPLE_CHILDREN_MAP
+        self.block_structure = self.create_block_structure(self.children_map)
+        self.root_block_usage_key = self.block_structure.root_block_usage_key
+        self.mock_cache = MockCache()
+        self.local_cache = BlockStructureLocalCache(max_size=1024 * 1024)
+        self.block_structure_cache = BlockStructureCache(self.mock_cache, self.local_cache)
+
+    def test_get_from_local_cache(self):
+        self.block_structure_cache.add(self.block_structure)
+        self.assertEquals(len(self.local_cache), 1)
+
+        # Only the version is read from the shared cache.
+        with patch.object(self.mock_cache, 'get', wraps=self.mock_cache.get) as mock_get:
+            cached_value = self.block_structure_cache.get(self.root_block_usage_key)
+        self.assertEquals(mock_get.call_count, 1)
+        self.assert_block_structure(cached_value, self.children_map)
+
+    def test_get_returns_new_structure(self):
+        self.block_structure_cache.add(self.block_structure)
+        cached_value = self.block_structure_cache.get(self.root_block_usage_key)
+        cached_value.remove_block(1, keep_descendants=False)
+
+        self.assert_block_structure(
+            self.block_structure_cache.get(self.root_block_usage_key),
+            self.children_map,
+        )
+
+    def test_outdated_local_cache(self):
+        self.block_structure_cache.add(self.block_structure)
+
+        # Another process updates the shared cache.
+        updated_children_map = [[1, 2], [3], [], []]
+        BlockStructureCache(self.mock_cache).add(self.create_block_structure(updated_children_map))
+
+        self.assert_block_structure(
+            self.block_structure_cache.get(self.root_block_usage_key),
+            updated_children_map,
+        )
+
+    def test_deleted_from_shared_cache(self):
+        self.block_structure_cache.add(self.block_structure)
+        BlockStructureCache(self.mock_cache).delete(self.root_block_usage_key)
+        self.assertIsNone(self.block_structure_cache.get(self.root_block_usage_key))
+
+    def test_populated_on_read(self):
+        BlockStructureCache(self.mock_cache).add(self.block_structure)
+        self.assertEquals(len(self.local_cache), 0)
+        self.block_structure_cache.get(self.root_block_usage_key)
+        self.assertEquals(len(self.local_cache), 1)
+
+    def test_size_eviction(self):
+        local_cache = BlockStructureLocalCache(max_size=10)
+        local_cache.set('a', 'v1', '12345')
+        local_cache.set('b', 'v1', '12345')
+        self.assertEquals(local_cache.get('a', 'v1'), '12345')
+
+        # 'b' is now the least recently used entry.
+        local_cache.set('c', 'v1', '123')
+        self.assertIsNone(local_cache.get('b', 'v1'))
+        self.assertEquals(local_cache.get('a', 'v1'), '12345')
+        self.assertEquals(local_cache.size, 8)
+
+        # Entries larger than the cache are not stored.
+        local_cache.set('d', 'v1', '12345678901')
+        self.assertIsNone(local_cache.get('d', 'v1'))
+        self.assertEquals(local_cache.size, 8)
+
+    def test_version_mismatch(self):
+        local_cache = BlockStructureLocalCache(max_size=10)
+        local_cache.set('a', 'v1', '12345')
+        self.assertIsNone(local_cache.get('a', 'v2'))
+        local_cache.set('a', 'v2', '123')
+        self.assertEquals(local_cache.get('a', 'v2'), '123')
+        self.assertEquals(local_cache.size, 3)
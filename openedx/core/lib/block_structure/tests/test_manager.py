@@ -85,6 +85,23 @@ class TestTransformer1(MockTransformer):
         return data_key + 't1.val1.' + unicode(block_key)
 
 
+class TestSharedTransformer(MockTransformer):
+    """
+    Test Transformer class whose transform depends only on the usage_info.
+    """
+    transform_call_count = 0
+
+    def transform(self, usage_info, block_structure):
+        """
+        Transforms the block structure by removing block 2.
+        """
+        TestSharedTransformer.transform_call_count += 1
+        block_structure.remove_block(2, keep_descendants=False)
+
+    def transform_equivalence_key(self, usage_info, block_structure):
+        return usage_info
+
+
 @attr('shard_2')
 class TestBlockStructureManager(TestCase, ChildrenMapTestMixin):
     """
@@ -139,6 +156,89 @@ class TestBlockStructureManager(TestCase, ChildrenMapTestMixin):
         TestTransformer1.assert_collected(block_structure)
         TestTransformer1.assert_transformed(block_structure)
 
+    def get_shared_transformed(self, usage_info, starting_block_usage_key=None, share_transformed=True):
+        """
+        Returns the structure transformed by TestSharedTransformer for the
+        given usage_info.
+        """
+        with mock_registered_transformers(self.registered_transformers + [TestSharedTransformer()]):
+            transformers = BlockStructureTransformers([TestSharedTransformer()], usage_info=usage_info)
+            return self.bs_manager.get_transformed(
+                transformers,
+                starting_block_usage_key=starting_block_usage_key,
+                share_transformed=share_transformed,
+            )
+
+    def test_get_transformed_shared(self):
+        # Transformed structures are only shared once the collected
+        # structure is in the cache.
+        with mock_registered_transformers(self.registered_transformers + [TestSharedTransformer()]):
+            self.bs_manager.get_collected()
+
+        TestSharedTransformer.transform_call_count = 0
+        expected_children_map = [[1], [3, 4], [], [], []]
+        for usage_info, expected_call_count in [('a', 1), ('a', 1), ('b', 2), ('a', 2)]:
+            block_structure = self.get_shared_transformed(usage_info)
+            self.assert_block_structure(block_structure, expected_children_map, missing_blocks=[2])
+            self.assertEquals(TestSharedTransformer.transform_call_count, expected_call_count)
+
+        # Sub-structures are shared separately.
+        block_structure = self.get_shared_transformed('a', starting_block_usage_key=1)
+        self.assertEquals(block_structure.root_block_usage_key, 1)
+        self.assert_block_structure(block_structure, [[], [3, 4], [], [], []], missing_blocks=[0, 2])
+        self.assertEquals(TestSharedTransformer.transform_call_count, 3)
+
+        # Shared structures are no longer used once the collected structure
+        # is cleared from the cache.
+        self.bs_manager.clear()
+        self.get_shared_transformed('a')
+        self.assertEquals(TestSharedTransformer.transform_call_count, 4)
+
+    def test_get_transformed_not_shared(self):
+        TestSharedTransformer.transform_call_count = 0
+        self.get_shared_transformed('a', share_transformed=False)
+        self.get_shared_transformed('a', share_transformed=False)
+        self.assertEquals(TestSharedTransformer.transform_call_count, 2)
+
+    def test_get_transformed_usage_specific(self):
+        # TestTransformer1 does not return an equivalence key.
+        with mock_registered_transformers(self.registered_transformers):
+            for __ in range(2):
+                block_structure = self.bs_manager.get_transformed(self.transformers, share_transformed=True)
+                TestTransformer1.assert_transformed(block_structure)
+        self.assertFalse(any('.transformed.' in key for key in self.cache.map))
+
+    def get_fingerprint(self, usage_info, starting_block_usage_key=None):
+        """
+        Returns the fingerprint of the structure transformed by
+        TestSharedTransformer for the given usage_info.
+        """
+        with mock_registered_transformers(self.registered_transformers + [TestSharedTransformer()]):
+            transformers = BlockStructureTransformers([TestSharedTransformer()], usage_info=usage_info)
+            return self.bs_manager.get_transformed_fingerprint(
+                transformers,
+                starting_block_usage_key=starting_block_usage_key,
+            )
+
+    def test_get_transformed_fingerprint(self):
+        # There is no fingerprint until the collected structure is in the cache.
+        self.assertIsNone(self.get_fingerprint('a'))
+        with mock_registered_transformers(self.registered_transformers + [TestSharedTransformer()]):
+            self.bs_manager.get_collected()
+
+        fingerprint = self.get_fingerprint('a')
+        self.assertIsNotNone(fingerprint)
+        self.assertEquals(self.get_fingerprint('a'), fingerprint)
+        self.assertNotEquals(self.get_fingerprint('b'), fingerprint)
+        self.assertNotEquals(self.get_fingerprint('a', starting_block_usage_key=1), fingerprint)
+        self.assertIsNone(self.get_fingerprint('a', starting_block_usage_key=100))
+
+    def test_get_transformed_fingerprint_usage_specific(self):
+        # TestTransformer1 does not return an equivalence key.
+        with mock_registered_transformers(self.registered_transformers):
+            self.bs_manager.get_collected()
+            self.assertIsNone(self.bs_manager.get_transformed_fingerprint(self.transformers))
+
     def test_get_transformed_with_nonexistent_starting_block(self):
         with mock_registered_transformers(self.registered_transformers):
             with self.assertRaises(UsageKeyNotInBlockStructure):
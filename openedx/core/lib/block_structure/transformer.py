@@ -128,6 +128,39 @@ class BlockStructureTransformer(object):
         """
         raise NotImplementedError
 
+    def transform_equivalence_key(self, usage_info, block_structure):  # pylint: disable=unused-argument
+        """
+        Returns a value identifying the class of usages for which the
+        transform method transforms the given block_structure in the
+        same way, or None if the transform is specific to the given
+        usage_info.
+
+        For example, a transformer that only removes blocks hidden
+        from non-staff users can return whether the user has staff
+        access, since all staff users and all non-staff users get the
+        same result.
+
+        When all transformers applied to a block structure return a
+        value, the transformed block structure may be cached and shared
+        by all usages with equal values.  So the value must capture all
+        of the usage-specific inputs of the transform and must be built
+        from primitive types (strings, numbers, booleans, None and
+        tuples of them) so that its repr is stable.
+
+        This method is called on the collected block_structure, before
+        any transformer is applied to it.  The default implementation
+        returns None.
+
+        Arguments:
+            usage_info (any negotiated type) - See the description in
+                the transform method.
+
+            block_structure (BlockStructureBlockData) - A block
+                structure, with already collected data for the
+                transformer, that is about to be transformed.
+        """
+        return None
+
 
 class FilteringTransformerMixin(BlockStructureTransformer):
     """
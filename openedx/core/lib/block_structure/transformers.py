@@ -82,6 +82,23 @@ class BlockStructureTransformers(object):
         # Collect all fields that were requested by the transformers.
         block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
 
+    def get_equivalence_key(self, block_structure):
+        """
+        Returns a value identifying the class of usages for which the
+        transformers in this collection transform the given collected
+        block structure in the same way, or None if any transformer's
+        transform is specific to this collection's usage_info.
+
+        See BlockStructureTransformer.transform_equivalence_key.
+        """
+        equivalence_key = []
+        for transformer in self._transformers['supports_filter'] + self._transformers['no_filter']:
+            transformer_key = transformer.transform_equivalence_key(self.usage_info, block_structure)
+            if transformer_key is None:
+                return None
+            equivalence_key.append((transformer.name(), transformer.VERSION, transformer_key))
+        return tuple(equivalence_key)
+
     @classmethod
     def is_collected_outdated(cls, block_structure):
         """
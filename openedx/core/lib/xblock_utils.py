@@ -253,6 +253,22 @@ def replace_static_urls(data_dir, block, view, frag, context, course_id=None, st
     ))
 
 
+def replace_urls(data_dir, block, view, frag, context, course_id=None, static_asset_path='', jump_to_id_base_url=None):  # pylint: disable=unused-argument
+    """
+    Updates the supplied module with a new get_html function that wraps
+    the old get_html function and substitutes the urls replaced by
+    `replace_static_urls`, `replace_course_urls` and `replace_jump_to_id_urls`,
+    in a single pass over the content.
+    """
+    return wrap_fragment(frag, static_replace.replace_urls(
+        frag.content,
+        data_dir,
+        course_id,
+        static_asset_path=static_asset_path,
+        jump_to_id_base_url=jump_to_id_base_url
+    ))
+
+
 def grade_histogram(module_id):
     '''
     Print out a histogram of grades on a given problem in staff member debug info.
@@ -264,16 +280,27 @@ def grade_histogram(module_id):
     from django.db import connection
     cursor = connection.cursor()
 
-    query = """\
-        SELECT courseware_studentmodule.grade,
-        COUNT(courseware_studentmodule.student_id)
-        FROM courseware_studentmodule
-        WHERE courseware_studentmodule.module_id=%s
-        GROUP BY courseware_studentmodule.grade"""
+    if settings.FEATURES.get('ENABLE_GRADE_DISTRIBUTION_TABLE') and module_id.block_type == 'problem':
+        # Read the counts maintained as grades change (only for problems).
+        query = """\
+            SELECT courseware_problemgradecount.grade,
+            SUM(courseware_problemgradecount.student_count)
+            FROM courseware_problemgradecount
+            WHERE courseware_problemgradecount.module_id=%s
+            GROUP BY courseware_problemgradecount.grade
+            HAVING SUM(courseware_problemgradecount.student_count) > 0"""
+    else:
+        query = """\
+            SELECT courseware_studentmodule.grade,
+            COUNT(courseware_studentmodule.student_id)
+            FROM courseware_studentmodule
+            WHERE courseware_studentmodule.module_id=%s
+            GROUP BY courseware_studentmodule.grade"""
     # Passing module_id this way prevents sql-injection.
     cursor.execute(query, [module_id.to_deprecated_string()])
 
-    grades = list(cursor.fetchall())
+    # SUM() may return a decimal, which json can't serialize.
+    grades = [(grade, int(count)) for grade, count in cursor.fetchall()]
     grades.sort(key=lambda x: x[0])  # Add ORDER BY to sql query?
     if len(grades) >= 1 and grades[0][0] is None:
         return []